@@ -0,0 +1,357 @@
+"""
+Benchmark suite of the cleaning and DB paths on synthetic SBA loans
+
+Usage:
+    python -m benchmarks.run --rows 10000 100000 1000000
+    python -m benchmarks.run --rows 10000000 --cases streaming.clean_csv parallel.clean_csv
+    python -m benchmarks.run --rows 100000 --db --output bench.jsonl
+
+Every case runs in its own spawned process, so its peak RSS isn't inflated by earlier cases.
+Results are printed as a table and appended as JSON lines to --output
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Union
+
+import polars as pl
+
+from benchmarks.synthetic import SyntheticLoanGenerator
+from pipeline.constants import Constants
+from pipeline.helpers.cleaning import DataCleaningService
+from pipeline.helpers.commons.utils import Utils
+from pipeline.helpers.streaming import CsvStreamingService
+
+BENCHMARK_TABLE = "benchmark_loans"
+
+def _peak_rss_mb() -> float:
+    """
+    Returns:
+        float: peak resident set size of the current process in MiB
+    """
+
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # bytes on macOS, KiB elsewhere
+    return peak_rss / (1024 * 1024) if sys.platform == "darwin" else peak_rss / 1024
+
+def _read_raw(source_path: str) -> pl.DataFrame:
+    """
+    Params:
+        source_path (str): raw CSV path
+
+    Returns:
+        pl.DataFrame: raw string columns named after Constants, read the same way as the pipeline reads them
+    """
+
+    return pl.concat(CsvStreamingService().iter_chunks(source_path))
+
+def _rule_case(column: str) -> Callable[[dict], Callable[[], int]]:
+    """
+    Params:
+        column (str): column of the DataCleaningService frame rule to benchmark
+
+    Returns:
+        callable: case setup evaluating the rule's cleaned value and checks on the whole frame
+    """
+
+    def setup(context: dict) -> Callable[[], int]:
+        df = _read_raw(context["source_path"])
+        rule = next(rule for rule in DataCleaningService()._frame_rules(df.schema) if rule[0] == column)
+        _, value, checks = rule
+        expressions = ([value.alias(column)] if value is not None else []) + [
+            condition.alias(f"check_{i}") for i, (condition, _) in enumerate(checks)
+        ]
+        return lambda: df.lazy().select(expressions).collect().height
+
+    return setup
+
+def _inspect_frame_case(context: dict) -> Callable[[], int]:
+    df = _read_raw(context["source_path"])
+    return lambda: DataCleaningService().inspect_frame(df).height
+
+def _inspect_row_case(context: dict) -> Callable[[], int]:
+    rows = _read_raw(context["source_path"]).head(context["scalar_row_limit"]).to_dicts()
+
+    def run() -> int:
+        cleaning_service = DataCleaningService()
+        for row in rows:
+            cleaning_service.inspect_row(row)
+        return len(rows)
+
+    return run
+
+def _parse_amount_case(context: dict) -> Callable[[], int]:
+    df = _read_raw(context["source_path"]).head(context["scalar_row_limit"])
+    amounts = [amount for column in Constants.AMOUNT_COLUMNS for amount in df.get_column(column).to_list()]
+
+    def run() -> int:
+        for amount in amounts:
+            if amount is not None:
+                Utils.parse_amount_to_cents(amount)
+        return df.height
+
+    return run
+
+def _amount_expr_case(context: dict) -> Callable[[], int]:
+    df = _read_raw(context["source_path"])
+    return lambda: df.select(*[Utils.amount_to_cents_expr(column) for column in Constants.AMOUNT_COLUMNS]).height
+
+def _streaming_clean_case(context: dict) -> Callable[[], int]:
+    destination_path = os.path.join(context["work_dir"], "streaming_cleaned.csv")
+    return lambda: CsvStreamingService().clean_csv(context["source_path"], destination_path)
+
+def _parallel_clean_case(context: dict) -> Callable[[], int]:
+    from pipeline.helpers.parallel import ParallelCleaningService
+
+    destination_path = os.path.join(context["work_dir"], "parallel_cleaned.csv")
+    return lambda: ParallelCleaningService().clean_csv(context["source_path"], destination_path)
+
+def _db_load_case(context: dict) -> Callable[[], int]:
+    from pipeline.helpers.db.bulk_loader import BulkLoader
+    from pipeline.helpers.db.connection import Connection
+
+    loader = BulkLoader(Connection().connection)
+    return lambda: sum(report.rows for report in loader.load_csv(context["cleaned_path"], BENCHMARK_TABLE))
+
+def _db_fetch_data_case(context: dict) -> Callable[[], int]:
+    from pipeline.helpers.db.connection import Connection
+    from pipeline.helpers.db.db_service import DbService
+
+    cursor = Connection().cursor
+    return lambda: len(json.loads(DbService.fetch_data(cursor, f"SELECT * FROM {BENCHMARK_TABLE}")))
+
+def _db_fetch_frame_case(context: dict) -> Callable[[], int]:
+    from pipeline.helpers.db.connection import Connection
+    from pipeline.helpers.db.db_service import DbService
+
+    cursor = Connection().cursor
+    return lambda: DbService.fetch_frame(cursor, f"SELECT * FROM {BENCHMARK_TABLE}").height
+
+def _db_stream_data_case(context: dict) -> Callable[[], int]:
+    from pipeline.helpers.db.connection import Connection
+    from pipeline.helpers.db.db_service import DbService
+
+    connection = Connection().connection
+    return lambda: sum(1 for _ in DbService.stream_data(connection, f"SELECT * FROM {BENCHMARK_TABLE}"))
+
+# name -> (setup returning the timed callable, holds the whole dataset in memory)
+CASES: Dict[str, tuple] = {
+    **{f"rule.{column}": (_rule_case(column), True) for column in Constants.COLUMNS},
+    "cleaning.inspect_frame": (_inspect_frame_case, True),
+    "cleaning.inspect_row": (_inspect_row_case, True),
+    "utils.parse_amount_to_cents": (_parse_amount_case, True),
+    "utils.amount_to_cents_expr": (_amount_expr_case, True),
+    "streaming.clean_csv": (_streaming_clean_case, False),
+    "parallel.clean_csv": (_parallel_clean_case, False),
+}
+DB_CASES: Dict[str, tuple] = {
+    "db.bulk_load": (_db_load_case, False),
+    "db.fetch_data": (_db_fetch_data_case, True),
+    "db.fetch_frame": (_db_fetch_frame_case, True),
+    "db.stream_data": (_db_stream_data_case, False),
+}
+
+def _run_case(name: str, context: dict) -> dict:
+    """
+    Run one case, called in a fresh process
+
+    Params:
+        name (str): case name
+        context (dict): paths and limits shared by the cases
+
+    Returns:
+        dict: processed rows, seconds, rows per second and peak RSS of the case
+    """
+
+    setup, _ = {**CASES, **DB_CASES}[name]
+    run = setup(context)
+    setup_rss_mb = _peak_rss_mb()
+
+    started_at = time.perf_counter()
+    rows = run()
+    seconds = time.perf_counter() - started_at
+
+    return {
+        "case": name,
+        "rows": rows,
+        "seconds": round(seconds, 4),
+        "rows_per_second": round(rows / seconds, 1) if seconds > 0 else 0.0,
+        "setup_rss_mb": round(setup_rss_mb, 1),
+        "peak_rss_mb": round(_peak_rss_mb(), 1),
+    }
+
+def _run_isolated(name: str, context: dict) -> dict:
+    """
+    Params:
+        name (str): case name
+        context (dict): paths and limits shared by the cases
+
+    Returns:
+        dict: result of _run_case, measured in a spawned process
+    """
+
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as executor:
+        return executor.submit(_run_case, name, context).result()
+
+def _prepare_db_table(cleaned_path: str):
+    """
+    (Re)create the benchmark table with one text column per cleaned column,
+    so the benchmark doesn't depend on the production DDL
+
+    Params:
+        cleaned_path (str): cleaned CSV whose header gives the columns
+    """
+
+    from psycopg2 import sql
+
+    from pipeline.helpers.db.connection import Connection
+
+    columns = pl.read_csv(cleaned_path, n_rows=0).columns
+    connection = Connection().connection
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql.SQL("DROP TABLE IF EXISTS {}").format(sql.Identifier(BENCHMARK_TABLE)))
+        cursor.execute(
+            sql.SQL("CREATE UNLOGGED TABLE {} ({})").format(
+                sql.Identifier(BENCHMARK_TABLE),
+                sql.SQL(", ").join(
+                    sql.SQL("{} text PRIMARY KEY" if column == Constants.LOAN_ID else "{} text").format(sql.Identifier(column))
+                    for column in columns
+                )
+            )
+        )
+    connection.commit()
+
+def _drop_db_table():
+    from psycopg2 import sql
+
+    from pipeline.helpers.db.connection import Connection
+
+    connection = Connection().connection
+    with connection.cursor() as cursor:
+        cursor.execute(sql.SQL("DROP TABLE IF EXISTS {}").format(sql.Identifier(BENCHMARK_TABLE)))
+    connection.commit()
+
+def run_benchmarks(
+    scales: List[int],
+    case_names: Union[List[str], None] = None,
+    include_db: bool = False,
+    seed: int = 0,
+    in_memory_row_limit: int = 2_000_000,
+    scalar_row_limit: int = 100_000
+) -> List[dict]:
+    """
+    Params:
+        scales (list of int): number of generated rows of each run
+        case_names (list of str or None, optional): cases to run, defaults to every case
+        include_db (bool, optional): also run the DB cases against the database configured in the environment
+        seed (int, optional): seed of the synthetic data
+        in_memory_row_limit (int, optional): cases holding the whole dataset in memory are skipped above this scale
+        scalar_row_limit (int, optional): row cap of the row by row cases
+
+    Returns:
+        list of dict: one result per case and scale
+    """
+
+    available_cases = {**CASES, **(DB_CASES if include_db else {})}
+    case_names = case_names or list(available_cases)
+    unknown_cases = [name for name in case_names if name not in available_cases]
+    if unknown_cases:
+        raise ValueError(f"unknown benchmark cases: {unknown_cases}")
+
+    results = []
+
+    for rows in scales:
+        with tempfile.TemporaryDirectory(prefix="sba-benchmark-") as work_dir:
+            context = {
+                "source_path": os.path.join(work_dir, "raw.csv"),
+                "cleaned_path": os.path.join(work_dir, "cleaned.csv"),
+                "work_dir": work_dir,
+                "scalar_row_limit": scalar_row_limit,
+            }
+            SyntheticLoanGenerator(seed).write_csv(context["source_path"], rows)
+
+            if any(name in DB_CASES for name in case_names):
+                CsvStreamingService().clean_csv(context["source_path"], context["cleaned_path"])
+                _prepare_db_table(context["cleaned_path"])
+
+            try:
+                for name in case_names:
+                    _, in_memory = available_cases[name]
+                    if in_memory and rows > in_memory_row_limit:
+                        result = {"case": name, "skipped": f"in memory case above {in_memory_row_limit} rows"}
+                    else:
+                        result = _run_isolated(name, context)
+
+                    result["scale"] = rows
+                    results.append(result)
+                    # progress, the table is printed once every scale ran
+                    print(json.dumps(result), file=sys.stderr)
+            finally:
+                if any(name in DB_CASES for name in case_names):
+                    _drop_db_table()
+
+    return results
+
+def _format_table(results: List[dict]) -> str:
+    """
+    Params:
+        results (list of dict): benchmark results
+
+    Returns:
+        str: results as an aligned text table
+    """
+
+    header = f"{'case':<34}{'scale':>12}{'rows':>12}{'seconds':>10}{'rows/sec':>14}{'setup MiB':>11}{'peak MiB':>10}"
+    lines = [header, "-" * len(header)]
+
+    for result in results:
+        if "skipped" in result:
+            lines.append(f"{result['case']:<34}{result['scale']:>12}  skipped: {result['skipped']}")
+            continue
+        lines.append(
+            f"{result['case']:<34}{result['scale']:>12}{result['rows']:>12}{result['seconds']:>10.3f}"
+            f"{result['rows_per_second']:>14,.0f}{result['setup_rss_mb']:>11.1f}{result['peak_rss_mb']:>10.1f}"
+        )
+    return "\n".join(lines)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the SBA loans pipeline on synthetic data")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000], help="scales to run, in rows")
+    parser.add_argument("--cases", nargs="+", help="cases to run, defaults to every case")
+    parser.add_argument("--db", action="store_true", help="also run the DB cases, uses the DB_* environment settings")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--in-memory-row-limit", type=int, default=2_000_000)
+    parser.add_argument("--scalar-row-limit", type=int, default=100_000)
+    parser.add_argument("--output", help="JSON lines file the results are appended to")
+    parser.add_argument("--list", action="store_true", help="list the available cases and exit")
+    args = parser.parse_args()
+
+    if args.list:
+        print("\n".join([*CASES, *DB_CASES]))
+        return
+
+    results = run_benchmarks(
+        args.rows,
+        args.cases,
+        args.db,
+        args.seed,
+        args.in_memory_row_limit,
+        args.scalar_row_limit
+    )
+    print(_format_table(results))
+
+    if args.output:
+        with open(args.output, "a") as output:
+            for result in results:
+                output.write(json.dumps({**result, "polars_version": pl.__version__, "seed": args.seed}) + "\n")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,331 @@
+from typing import BinaryIO, Iterator, Union
+
+import numpy as np
+import polars as pl
+
+from pipeline.constants import Constants
+from pipeline.helpers.commons.reference_tables import ReferenceTables
+from pipeline.helpers.commons.utils import Utils
+from pipeline.helpers.loan_ids import LoanIdService
+
+class SyntheticLoanGenerator:
+    """
+    Deterministic generator of raw SBA loans in the layout of SBAnational.csv
+
+    Rows are generated in fixed size blocks, each seeded from (seed, block index),
+    so the same seed and row count always give the same file regardless of how it is consumed.
+    Null, invalid and bad code rates follow the counts observed in notebook/EDA.ipynb
+    """
+
+    BLOCK_ROWS = 100_000
+
+    # headers as they appear in the SBA extract, the pipeline lowercases them
+    RAW_HEADERS = {
+        Constants.LOAN_ID: "LoanNr_ChkDgt",
+        Constants.DEBTOR_NAME: "Name",
+        Constants.DEBTOR_ORIGIN_CITY: "City",
+        Constants.DEBTOR_ORIGIN_STATE: "State",
+        Constants.DEBTOR_ORIGIN_ZIP_CODE: "Zip",
+        Constants.GUARANTOR_BANK_NAME: "Bank",
+        Constants.GUARANTOR_BANK_STATE: "BankState",
+        Constants.NAICS_CODE: "NAICS",
+        Constants.LOAN_APPROVAL_DATE: "ApprovalDate",
+        Constants.LOAN_APPROVAL_FY: "ApprovalFY",
+        Constants.TERM_DURATION: "Term",
+        Constants.DEBTOR_EMPLOYEE_NUMBER: "NoEmp",
+        Constants.DEBTOR_NEW_OR_EXIST: "NewExist",
+        Constants.NUMBER_NEW_JOB_CREATED: "CreateJob",
+        Constants.NUMBER_JOB_RETAINED: "RetainedJob",
+        Constants.DEBTOR_FRANCHISE_CODE: "FranchiseCode",
+        Constants.DEBTOR_URBAN_RURAL_INFO: "UrbanRural",
+        Constants.REV_LINE_CREDIT: "RevLineCr",
+        Constants.LOW_DOC_PROGRAM: "LowDoc",
+        Constants.CHARGED_OFF_DATE: "ChgOffDate",
+        Constants.DISBURSEMENT_DATE: "DisbursementDate",
+        Constants.DISBURESEMENT_GROSS: "DisbursementGross",
+        Constants.OUTSTANDING_BALANCE: "BalanceGross",
+        Constants.LOAN_STATUS: "MIS_Status",
+        Constants.CREDIT_CHARGED_OFF_AMOUNT: "ChgOffPrinGr",
+        Constants.BANK_APPROVED_CREDIT_AMOUNT: "GrAppv",
+        Constants.SBA_APPROVED_CREDIT_AMOUNT: "SBA_Appv",
+    }
+
+    # share of rows per defect, from the 899,164 rows of the real extract
+    RATES = {
+        "missing_name": 3.3e-6,
+        "missing_city": 3.3e-5,
+        "short_city": 9.6e-5,
+        "missing_state": 1.6e-5,
+        "invalid_zip": 4.7e-4,
+        "missing_bank": 1.7e-3,
+        "missing_bank_state": 1.7e-3,
+        "invalid_naics": 0.225,
+        "missing_approval_fy": 2.0e-5,
+        "zero_term": 9.0e-4,
+        "zero_new_exist": 1.1e-3,
+        "missing_new_exist": 1.5e-4,
+        "undefined_urban_rural": 0.36,
+        "missing_rev_line": 5.0e-3,
+        "bad_rev_line": 0.31,
+        "missing_low_doc": 2.9e-3,
+        "bad_low_doc": 3.0e-3,
+        "missing_disbursement_date": 2.6e-3,
+        "missing_status": 2.2e-3,
+        "charged_off": 0.175,
+    }
+
+    STATES = [
+        "AL", "AK", "AZ", "AR", "CA", "CO", "CT", "DE", "DC", "FL", "GA", "HI", "ID", "IL", "IN", "IA", "KS",
+        "KY", "LA", "ME", "MD", "MA", "MI", "MN", "MS", "MO", "MT", "NE", "NV", "NH", "NJ", "NM", "NY", "NC",
+        "ND", "OH", "OK", "OR", "PA", "RI", "SC", "SD", "TN", "TX", "UT", "VT", "VA", "WA", "WV", "WI", "WY",
+    ]
+    CITIES = [
+        "EVANSVILLE", "NEW PARIS", "BLOOMINGTON", "BROKEN ARROW", "ORLANDO", "COLUMBUS", "SPRINGFIELD",
+        "LOS ANGELES", "HOUSTON", "DANBURY", "MARLTON", "DOVER", "TROY", "CAMBRIDGE", "RYE", "LEE", "JAL",
+        "SALT LAKE CITY", "PORTLAND", "MINNEAPOLIS", "SAN DIEGO", "DENVER", "PHOENIX", "ATLANTA",
+    ]
+    SHORT_CITIES = ["CT", "`", "B", "ES", "KC", "NY", "CA", "AN", "S"]
+    NAME_WORDS = [
+        "ABC", "HOBBYCRAFT", "LANDMARK", "BAR", "GRILLE", "WHITLOCK", "PACKAGING", "CITY", "CONSTRUCTION",
+        "DOLLAR", "DAYS", "ONE", "STOP", "CLEANERS", "SUNTREE", "DENTAL", "AUTO", "REPAIR", "BAKERY", "CAFE",
+    ]
+    NAME_SUFFIXES = ["INC.", "LLC", "CORP", "CORPORATION", "(THE)", "CO.", ""]
+    BANKS = [
+        "FIFTH THIRD BANK", "1ST SOURCE BANK", "GRANT COUNTY STATE BANK", "1ST NATL BK & TR CO OF BROKEN",
+        "FLORIDA BUS. DEVEL CORP", "BANK OF AMERICA NATL ASSOC", "WELLS FARGO BANK NATL ASSOC",
+        "JPMORGAN CHASE BANK NATL ASSOC", "U.S. BANK NATIONAL ASSOCIATION", "CITIZENS BANK NATL ASSOC",
+    ]
+    NAICS_CODES = [
+        "451120", "722410", "621210", "811111", "238220", "722211", "541110", "448140", "531210", "236115",
+    ]
+    BAD_REV_LINE_CODES = ["0", "0", "0", "T", "1", "R", "`", "2", "C", "3", "."]
+    BAD_LOW_DOC_CODES = ["C", "1", "S", "R", "A", "0"]
+
+    # approval dates between 1962 and 2014, days since 1970-01-01
+    FIRST_APPROVAL_DAY = -2922
+    LAST_APPROVAL_DAY = 16435
+
+    def __init__(self, seed: int = 0):
+        """
+        Params:
+            seed (int, optional): seed of the generated data
+        """
+
+        self.seed = seed
+
+    def _choice(self, rng: np.random.Generator, values: list, rows: int) -> pl.Series:
+        """
+        Params:
+            rng (np.random.Generator): block generator
+            values (list): values to draw from
+            rows (int): number of draws
+
+        Returns:
+            pl.Series: uniformly drawn values
+        """
+
+        return pl.Series(values, dtype=pl.String).gather(rng.integers(0, len(values), rows))
+
+    @staticmethod
+    def _zip_prefixes_by_state() -> dict:
+        """
+        Returns:
+            dict: state -> its 3 digit zip prefixes, from the bundled reference tables
+        """
+
+        prefixes_df = (
+            ReferenceTables().zip_prefix_states.to_frame("key")
+                .select(pl.col("key").str.slice(3).alias("state"), pl.col("key").str.slice(0, 3).alias("prefix"))
+                .group_by("state", maintain_order=True)
+                .agg("prefix")
+        )
+        return dict(zip(prefixes_df.get_column("state").to_list(), prefixes_df.get_column("prefix").to_list()))
+
+    def _generate_block(self, block_index: int, rows: int) -> pl.DataFrame:
+        """
+        Params:
+            block_index (int): index of the block, seeds its generator together with self.seed
+            rows (int): number of rows, at most BLOCK_ROWS
+
+        Returns:
+            pl.DataFrame: raw string columns named after Constants
+        """
+
+        rng = np.random.default_rng([self.seed, block_index])
+
+        def defect(rate_name: str) -> pl.Series:
+            return pl.Series(rng.random(rows) < self.RATES[rate_name])
+
+        row_numbers = np.arange(block_index * self.BLOCK_ROWS, block_index * self.BLOCK_ROWS + rows, dtype=np.int64)
+        approval_days = rng.integers(self.FIRST_APPROVAL_DAY, self.LAST_APPROVAL_DAY, rows)
+        disbursement_days = approval_days + rng.integers(0, 365, rows)
+        charged_off_days = disbursement_days + rng.integers(180, 3650, rows)
+        # approved amounts are log-normal around $70k, rounded to the thousand, between $1k and $5M
+        approved_cents = np.clip(np.round(rng.lognormal(11.2, 1.1, rows), -3), 1_000, 5_000_000).astype(np.int64) * 100
+        status_draw = rng.random(rows)
+
+        df = pl.DataFrame({
+            "row_number": row_numbers,
+            "name_first_word": self._choice(rng, self.NAME_WORDS, rows),
+            "name_second_word": self._choice(rng, self.NAME_WORDS, rows),
+            "name_suffix": self._choice(rng, self.NAME_SUFFIXES, rows),
+            "city": self._choice(rng, self.CITIES, rows),
+            "short_city": self._choice(rng, self.SHORT_CITIES, rows),
+            "state": self._choice(rng, self.STATES, rows),
+            "zip_prefix_draw": pl.Series(rng.random(rows)),
+            "zip_suffix": pl.Series(rng.integers(0, 100, rows)),
+            "invalid_zip_value": pl.Series(np.where(rng.random(rows) < 0.8, 0, rng.integers(1, 999, rows))).cast(pl.String),
+            "bank": self._choice(rng, self.BANKS, rows),
+            "bank_state": self._choice(rng, self.STATES, rows),
+            "naics": self._choice(rng, self.NAICS_CODES, rows),
+            "approval_date": pl.Series(approval_days, dtype=pl.Int32).cast(pl.Date),
+            "disbursement_date": pl.Series(disbursement_days, dtype=pl.Int32).cast(pl.Date),
+            "charged_off_date": pl.Series(charged_off_days, dtype=pl.Int32).cast(pl.Date),
+            "term": pl.Series(rng.choice([60, 84, 120, 180, 240, 300], rows) + rng.integers(-12, 12, rows)),
+            "noemp": pl.Series(rng.geometric(0.15, rows) - 1),
+            "new_exist": pl.Series(rng.choice([1, 2], rows, p=[0.72, 0.28])),
+            "create_job": pl.Series(rng.geometric(0.4, rows) - 1),
+            "retained_job": pl.Series(rng.geometric(0.2, rows) - 1),
+            "franchise_code": pl.Series(np.where(rng.random(rows) < 0.95, rng.integers(0, 2, rows), rng.integers(10_000, 90_000, rows))),
+            "urban_rural": pl.Series(rng.choice([1, 2], rows, p=[0.82, 0.18])),
+            "rev_line": self._choice(rng, ["N", "N", "Y"], rows),
+            "bad_rev_line": self._choice(rng, self.BAD_REV_LINE_CODES, rows),
+            "low_doc": pl.Series(np.where(rng.random(rows) < 0.88, "N", "Y")),
+            "bad_low_doc": self._choice(rng, self.BAD_LOW_DOC_CODES, rows),
+            "approved_cents": pl.Series(approved_cents),
+            "sba_share": pl.Series(rng.choice([0.5, 0.75, 0.8, 0.85], rows)),
+            "charged_off": pl.Series(status_draw < self.RATES["charged_off"]),
+            "missing_status": pl.Series(status_draw > 1 - self.RATES["missing_status"]),
+            "charged_off_share": pl.Series(rng.random(rows)),
+            **{
+                f"is_{rate_name}": defect(rate_name)
+                for rate_name in self.RATES
+                if rate_name != "charged_off" and rate_name != "missing_status"
+            },
+        })
+
+        def null_when(rate_name: str, value: pl.Expr) -> pl.Expr:
+            return pl.when(pl.col(f"is_{rate_name}")).then(pl.lit(None, dtype=pl.String)).otherwise(value)
+
+        # a prefix of the state, zips are stored as integers upstream, so leading zeros are lost
+        zip_prefixes = pl.col("state").replace_strict(self._zip_prefixes_by_state(), return_dtype=pl.List(pl.String))
+        zip_code = (
+            zip_prefixes.list.get((pl.col("zip_prefix_draw") * zip_prefixes.list.len()).cast(pl.Int64))
+                .cast(pl.Int64) * 100 + pl.col("zip_suffix")
+        ).cast(pl.String)
+
+        charged_off = pl.col("charged_off")
+        approved_cents_col = pl.col("approved_cents")
+        charged_off_cents = (approved_cents_col.cast(pl.Float64) * pl.col("charged_off_share") * 0.9).cast(pl.Int64)
+
+        # 7 digit loan number followed by its 3 digit check value, past 9 million rows the loan numbers
+        # outgrow 7 digits and get 000
+        loan_number = (pl.col("row_number") + 1_000_000).cast(pl.String)
+        check_digits = LoanIdService().expected_check_digit(pl.concat_str(loan_number, pl.lit("000"))).fill_null(0)
+
+        return df.select(
+            pl.concat_str(loan_number, check_digits.cast(pl.String).str.zfill(3)).alias(Constants.LOAN_ID),
+            null_when(
+                "missing_name",
+                pl.concat_str("name_first_word", "name_second_word", "name_suffix", separator=" ").str.strip_chars()
+            ).alias(Constants.DEBTOR_NAME),
+            null_when(
+                "missing_city",
+                pl.when(pl.col("is_short_city")).then(pl.col("short_city")).otherwise(pl.col("city"))
+            ).alias(Constants.DEBTOR_ORIGIN_CITY),
+            null_when("missing_state", pl.col("state")).alias(Constants.DEBTOR_ORIGIN_STATE),
+            pl.when(pl.col("is_invalid_zip")).then(pl.col("invalid_zip_value")).otherwise(zip_code).alias(Constants.DEBTOR_ORIGIN_ZIP_CODE),
+            null_when("missing_bank", pl.col("bank")).alias(Constants.GUARANTOR_BANK_NAME),
+            null_when("missing_bank_state", pl.col("bank_state")).alias(Constants.GUARANTOR_BANK_STATE),
+            pl.when(pl.col("is_invalid_naics")).then(pl.lit("0")).otherwise(pl.col("naics")).alias(Constants.NAICS_CODE),
+            pl.col("approval_date").dt.strftime(Constants.RAW_DATE_FORMAT).alias(Constants.LOAN_APPROVAL_DATE),
+            null_when(
+                "missing_approval_fy",
+                (pl.col("approval_date").dt.year() + (pl.col("approval_date").dt.month() >= 10).cast(pl.Int32)).cast(pl.String)
+            ).alias(Constants.LOAN_APPROVAL_FY),
+            pl.when(pl.col("is_zero_term")).then(pl.lit("0")).otherwise(pl.col("term").clip(1).cast(pl.String)).alias(Constants.TERM_DURATION),
+            pl.col("noemp").cast(pl.String).alias(Constants.DEBTOR_EMPLOYEE_NUMBER),
+            null_when(
+                "missing_new_exist",
+                pl.when(pl.col("is_zero_new_exist")).then(pl.lit("0")).otherwise(pl.col("new_exist").cast(pl.String))
+            ).alias(Constants.DEBTOR_NEW_OR_EXIST),
+            pl.col("create_job").cast(pl.String).alias(Constants.NUMBER_NEW_JOB_CREATED),
+            pl.col("retained_job").cast(pl.String).alias(Constants.NUMBER_JOB_RETAINED),
+            pl.col("franchise_code").cast(pl.String).alias(Constants.DEBTOR_FRANCHISE_CODE),
+            pl.when(pl.col("is_undefined_urban_rural")).then(pl.lit("0")).otherwise(pl.col("urban_rural").cast(pl.String)).alias(Constants.DEBTOR_URBAN_RURAL_INFO),
+            null_when(
+                "missing_rev_line",
+                pl.when(pl.col("is_bad_rev_line")).then(pl.col("bad_rev_line")).otherwise(pl.col("rev_line"))
+            ).alias(Constants.REV_LINE_CREDIT),
+            null_when(
+                "missing_low_doc",
+                pl.when(pl.col("is_bad_low_doc")).then(pl.col("bad_low_doc")).otherwise(pl.col("low_doc"))
+            ).alias(Constants.LOW_DOC_PROGRAM),
+            pl.when(charged_off).then(pl.col("charged_off_date").dt.strftime(Constants.RAW_DATE_FORMAT)).alias(Constants.CHARGED_OFF_DATE),
+            null_when(
+                "missing_disbursement_date",
+                pl.col("disbursement_date").dt.strftime(Constants.RAW_DATE_FORMAT)
+            ).alias(Constants.DISBURSEMENT_DATE),
+            Utils.format_cents_expr(approved_cents_col).alias(Constants.DISBURESEMENT_GROSS),
+            Utils.format_cents_expr(pl.lit(0, dtype=pl.Int64)).alias(Constants.OUTSTANDING_BALANCE),
+            pl.when(pl.col("missing_status"))
+                .then(pl.lit(None, dtype=pl.String))
+                .when(charged_off)
+                .then(pl.lit("CHGOFF"))
+                .otherwise(pl.lit("P I F"))
+                .alias(Constants.LOAN_STATUS),
+            Utils.format_cents_expr(pl.when(charged_off).then(charged_off_cents).otherwise(0)).alias(Constants.CREDIT_CHARGED_OFF_AMOUNT),
+            Utils.format_cents_expr(approved_cents_col).alias(Constants.BANK_APPROVED_CREDIT_AMOUNT),
+            Utils.format_cents_expr(
+                (approved_cents_col.cast(pl.Float64) * pl.col("sba_share")).cast(pl.Int64) // 100 * 100
+            ).alias(Constants.SBA_APPROVED_CREDIT_AMOUNT),
+        )
+
+    def iter_frames(self, rows: int) -> Iterator[pl.DataFrame]:
+        """
+        Params:
+            rows (int): total number of rows
+
+        Returns:
+            iterator of pl.DataFrame: blocks of at most BLOCK_ROWS raw rows named after Constants
+        """
+
+        for block_index, block_start in enumerate(range(0, rows, self.BLOCK_ROWS)):
+            yield self._generate_block(block_index, min(self.BLOCK_ROWS, rows - block_start))
+
+    def generate_frame(self, rows: int) -> pl.DataFrame:
+        """
+        Params:
+            rows (int): number of rows
+
+        Returns:
+            pl.DataFrame: raw rows named after Constants, as the pipeline sees them once read
+        """
+
+        frames = list(self.iter_frames(rows))
+        return pl.concat(frames) if frames else self._generate_block(0, 0)
+
+    def write_csv(self, destination: Union[str, BinaryIO], rows: int) -> int:
+        """
+        Write a raw CSV with the SBAnational.csv headers block by block, so memory stays bounded at any scale
+
+        Params:
+            destination (str or BinaryIO): CSV path or writable binary file
+            rows (int): number of rows
+
+        Returns:
+            int: number of written rows
+        """
+
+        if isinstance(destination, str):
+            with open(destination, "wb") as destination_file:
+                return self.write_csv(destination_file, rows)
+
+        written_rows = 0
+        for block in self.iter_frames(rows):
+            block.rename(self.RAW_HEADERS).write_csv(destination, include_header=written_rows == 0)
+            written_rows += block.height
+
+        if written_rows == 0:
+            pl.DataFrame(schema={header: pl.String for header in self.RAW_HEADERS.values()}).write_csv(destination)
+        return written_rows
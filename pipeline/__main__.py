@@ -0,0 +1,331 @@
+"""
+Command line entry point of the SBA loans pipeline
+
+Usage:
+    python -m pipeline clean notebook/dataset/SBAnational.csv cleaned.csv --mode parallel
+    python -m pipeline load cleaned.csv --table loans
+    python -m pipeline query "SELECT state, count(*) FROM loans GROUP BY state" --format table
+    python -m pipeline rollup state --table loans --limit 10
+    python -m pipeline banks notebook/dataset/SBAnational.csv bank_lookup.parquet
+    python -m pipeline loan-ids notebook/dataset/SBAnational.csv --workers 4 --duplicates conflicts.csv
+    python -m pipeline categories notebook/dataset/SBAnational.csv --dictionary categories.json
+    python -m pipeline import-time --budget-ms 500
+    python -m pipeline --metrics prometheus clean notebook/dataset/SBAnational.csv cleaned.csv
+
+Only argparse is imported up front, every subcommand imports what it needs when it runs,
+so --help and small jobs don't pay for polars, pydantic or psycopg2
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from typing import List, Union
+
+CLEAN_MODES = ["streaming", "parallel", "two-tier", "incremental"]
+
+# modules whose import time is tracked by the import-time subcommand
+IMPORT_TIME_MODULES = [
+    "pipeline.__main__",
+    "pipeline.constants",
+    "pipeline.helpers.cleaning",
+    "pipeline.helpers.streaming",
+    "pipeline.helpers.parallel",
+    "pipeline.helpers.two_tier",
+    "pipeline.helpers.incremental",
+    "pipeline.helpers.dataset_cache",
+    "pipeline.helpers.bank_canonicalizer",
+    "pipeline.helpers.loan_ids",
+    "pipeline.helpers.categorical_encoder",
+    "pipeline.helpers.db.connection",
+    "pipeline.helpers.db.db_service",
+    "pipeline.helpers.db.bulk_loader",
+    "pipeline.helpers.db.rollups",
+    "pipeline.helpers.db.async_db_service",
+]
+
+def _clean(args: argparse.Namespace) -> int:
+    started_at = time.perf_counter()
+
+    if args.mode == "parallel":
+        from pipeline.helpers.parallel import ParallelCleaningService
+
+        cleaned_rows = ParallelCleaningService(args.workers, args.memory_limit_mb).clean_csv(
+            args.source, args.destination, sort_by_loan_id=args.sort
+        )
+        summary = {"cleaned_rows": cleaned_rows}
+    elif args.mode == "two-tier":
+        from pipeline.helpers.two_tier import TwoTierCleaningService
+
+        cleaning_service = TwoTierCleaningService(memory_limit_mb=args.memory_limit_mb)
+        cleaned_rows = cleaning_service.clean_csv(
+            args.source, args.destination, sort_by_loan_id=args.sort, quarantine_path=args.quarantine
+        )
+        summary = {
+            "cleaned_rows": cleaned_rows,
+            "fast_rows": cleaning_service.fast_rows,
+            "slow_rows": cleaning_service.slow_rows,
+            "quarantined_rows": cleaning_service.quarantined_rows,
+        }
+    elif args.mode == "incremental":
+        from pipeline.helpers.incremental import IncrementalCleaningService
+
+        report = IncrementalCleaningService(memory_limit_mb=args.memory_limit_mb).clean_csv(
+            args.source, args.destination, sort_by_loan_id=args.sort, state_path=args.state
+        )
+        summary = report.model_dump()
+    else:
+        from pipeline.helpers.streaming import CsvStreamingService
+
+        cleaned_rows = CsvStreamingService(memory_limit_mb=args.memory_limit_mb).clean_csv(
+            args.source, args.destination, sort_by_loan_id=args.sort
+        )
+        summary = {"cleaned_rows": cleaned_rows}
+
+    summary["seconds"] = round(time.perf_counter() - started_at, 3)
+    print(json.dumps(summary), file=sys.stderr)
+    return 0
+
+def _load(args: argparse.Namespace) -> int:
+    from pipeline.helpers.db.bulk_loader import BulkLoader
+    from pipeline.helpers.db.rollups import RollupManager
+
+    rollup_manager = RollupManager(args.rollups or None) if args.rollups is not None else None
+    reports = BulkLoader(batch_size=args.batch_size, rollup_manager=rollup_manager).load_csv(
+        args.source,
+        args.table,
+        upsert=not args.no_upsert,
+        conflict_columns=args.conflict_columns,
+        memory_limit_mb=args.memory_limit_mb
+    )
+
+    for report in reports:
+        print(report.model_dump_json(), file=sys.stderr)
+    print(json.dumps({"loaded_rows": sum(report.rows for report in reports), "batches": len(reports)}), file=sys.stderr)
+    return 0
+
+def _query(args: argparse.Namespace) -> int:
+    from pipeline.helpers.db.connection import Connection
+    from pipeline.helpers.db.db_service import DbService
+
+    query_str = args.sql if args.sql != "-" else sys.stdin.read()
+    cursor = Connection().cursor
+
+    if args.format == "json":
+        output = DbService.fetch_data(cursor, query_str)
+    else:
+        import polars as pl
+
+        fetched_df = DbService.fetch_frame(cursor, query_str)
+        if args.format == "csv":
+            output = fetched_df.write_csv()
+        else:
+            with pl.Config(tbl_rows=-1, tbl_cols=-1):
+                output = str(fetched_df)
+
+    if args.output:
+        with open(args.output, "w") as output_file:
+            output_file.write(output)
+    else:
+        sys.stdout.write(output if output.endswith("\n") else f"{output}\n")
+    return 0
+
+def _rollup(args: argparse.Namespace) -> int:
+    from pipeline.helpers.db.connection import Connection
+    from pipeline.helpers.db.db_service import DbService
+    from pipeline.helpers.db.rollups import RollupManager
+
+    connection = Connection()
+    if args.rebuild:
+        RollupManager([args.rollup]).rebuild(connection.cursor, args.table)
+        connection.connection.commit()
+
+    sys.stdout.write(DbService.fetch_rollup(connection.cursor, args.rollup, args.table, args.limit) + "\n")
+    return 0
+
+def _banks(args: argparse.Namespace) -> int:
+    from pipeline.helpers.bank_canonicalizer import BankNameCanonicalizer
+
+    canonicalizer = BankNameCanonicalizer(args.threshold)
+    report = canonicalizer.build_from_csv(args.source)
+    canonicalizer.save(args.lookup)
+
+    print(report.model_dump_json(), file=sys.stderr)
+    return 0
+
+def _loan_ids(args: argparse.Namespace) -> int:
+    from pipeline.helpers.loan_ids import LoanIdService
+
+    report = LoanIdService(memory_limit_mb=args.memory_limit_mb).check_csv(
+        args.source, workers=args.workers, duplicates_path=args.duplicates
+    )
+
+    print(report.model_dump_json(), file=sys.stderr)
+    return 0
+
+def _categories(args: argparse.Namespace) -> int:
+    from pipeline.helpers.categorical_encoder import CategoricalEncoder
+    from pipeline.helpers.streaming import CsvStreamingService
+
+    categorical_encoder = CategoricalEncoder(dictionary_path=args.dictionary)
+    chunks = CsvStreamingService(memory_limit_mb=args.memory_limit_mb).iter_chunks(args.source)
+    if args.dictionary:
+        with categorical_encoder.locked():
+            report = categorical_encoder.memory_report(chunks)
+            categorical_encoder.save()
+    else:
+        report = categorical_encoder.memory_report(chunks)
+
+    for column_report in report.columns:
+        print(
+            f"{column_report.column:<16}{column_report.categories:>10} categories"
+            f"{column_report.string_bytes / 1024 ** 2:>10.1f} MB -> {column_report.encoded_bytes / 1024 ** 2:.1f} MB"
+        )
+    print(report.model_dump_json(), file=sys.stderr)
+    return 0
+
+def measure_import_time(module: str) -> float:
+    """
+    Params:
+        module (str): module to import in a fresh interpreter
+
+    Returns:
+        float: cumulative import time of the module in milliseconds, as reported by -X importtime
+    """
+
+    completed_process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    )
+
+    # "import time: self [us] | cumulative | imported package", the module itself is reported last
+    for line in reversed(completed_process.stderr.splitlines()):
+        fields = [field.strip() for field in line.split("|")]
+        if len(fields) == 3 and fields[2] == module:
+            return int(fields[1]) / 1000
+    raise RuntimeError(f"no import time reported for {module}")
+
+def _import_time(args: argparse.Namespace) -> int:
+    modules = args.modules or IMPORT_TIME_MODULES
+    results = [{"module": module, "milliseconds": round(measure_import_time(module), 1)} for module in modules]
+
+    for result in results:
+        print(f"{result['module']:<40}{result['milliseconds']:>10.1f} ms")
+
+    if args.output:
+        with open(args.output, "a") as output_file:
+            for result in results:
+                output_file.write(json.dumps({**result, "measured_at": time.time()}) + "\n")
+
+    if args.budget_ms is not None:
+        over_budget = [result for result in results if result["milliseconds"] > args.budget_ms]
+        for result in over_budget:
+            print(f"{result['module']} is over the {args.budget_ms} ms budget", file=sys.stderr)
+        return 1 if over_budget else 0
+    return 0
+
+def build_parser() -> argparse.ArgumentParser:
+    """
+    Returns:
+        argparse.ArgumentParser: parser of every subcommand
+    """
+
+    parser = argparse.ArgumentParser(prog="python -m pipeline", description="SBA loans cleaning and loading pipeline")
+    parser.add_argument(
+        "--metrics",
+        choices=["json", "prometheus"],
+        help="instrument the command and print its metrics to stderr, parallel mode workers aren't instrumented"
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    clean_parser = subparsers.add_parser("clean", help="clean a raw SBA loans CSV")
+    clean_parser.add_argument("source", help="raw CSV path")
+    clean_parser.add_argument("destination", help="cleaned CSV path")
+    clean_parser.add_argument("--mode", choices=CLEAN_MODES, default="streaming")
+    clean_parser.add_argument("--memory-limit-mb", type=int, default=256, help="memory ceiling of one chunk")
+    clean_parser.add_argument("--workers", type=int, help="parallel mode: number of processes, defaults to the CPU count")
+    clean_parser.add_argument("--sort", action="store_true", help="sort the cleaned rows by loan id")
+    clean_parser.add_argument("--quarantine", help="two-tier mode: quarantine CSV path")
+    clean_parser.add_argument("--state", help="incremental mode: state parquet path")
+    clean_parser.set_defaults(handler=_clean)
+
+    load_parser = subparsers.add_parser("load", help="bulk load a cleaned CSV into Postgres")
+    load_parser.add_argument("source", help="cleaned CSV path")
+    load_parser.add_argument("--table", required=True, help="target table")
+    load_parser.add_argument("--no-upsert", action="store_true", help="copy straight into the table instead of merging")
+    load_parser.add_argument("--conflict-columns", nargs="+", help="unique key used by the upsert")
+    load_parser.add_argument("--batch-size", type=int, default=100_000)
+    load_parser.add_argument("--memory-limit-mb", type=int, default=256)
+    load_parser.add_argument(
+        "--rollups",
+        nargs="*",
+        help="update these rollup tables with each batch, every rollup when no name is given"
+    )
+    load_parser.set_defaults(handler=_load)
+
+    query_parser = subparsers.add_parser("query", help="run a query against Postgres")
+    query_parser.add_argument("sql", help="query to run, - reads it from stdin")
+    query_parser.add_argument("--format", choices=["json", "csv", "table"], default="json")
+    query_parser.add_argument("--output", help="output path, defaults to stdout")
+    query_parser.set_defaults(handler=_query)
+
+    rollup_parser = subparsers.add_parser("rollup", help="read a rollup table, ex: charge-off rate by state")
+    rollup_parser.add_argument("rollup", help="state, bank, naics_sector, approval_fy or nulls")
+    rollup_parser.add_argument("--table", default="loans", help="loans table the rollup belongs to")
+    rollup_parser.add_argument("--limit", type=int, help="maximum number of groups, largest groups first")
+    rollup_parser.add_argument("--rebuild", action="store_true", help="recompute the rollup from the loans table first")
+    rollup_parser.set_defaults(handler=_rollup)
+
+    banks_parser = subparsers.add_parser("banks", help="build the bank name canonicalization lookup table")
+    banks_parser.add_argument("source", help="raw or cleaned CSV path")
+    banks_parser.add_argument("lookup", help="lookup table parquet path")
+    banks_parser.add_argument("--threshold", type=float, default=0.8, help="trigram Jaccard similarity of two variants")
+    banks_parser.set_defaults(handler=_banks)
+
+    loan_ids_parser = subparsers.add_parser("loan-ids", help="check the loan id check digits and duplicates of a raw CSV")
+    loan_ids_parser.add_argument("source", help="raw CSV path")
+    loan_ids_parser.add_argument("--workers", type=int, default=1, help="processes indexing byte ranges of the file")
+    loan_ids_parser.add_argument("--memory-limit-mb", type=int, default=256)
+    loan_ids_parser.add_argument("--duplicates", help="CSV the rows of the conflicting loan ids are written to")
+    loan_ids_parser.set_defaults(handler=_loan_ids)
+
+    categories_parser = subparsers.add_parser(
+        "categories",
+        help="build the categorical dictionaries of a raw CSV and report the memory they save"
+    )
+    categories_parser.add_argument("source", help="raw CSV path")
+    categories_parser.add_argument("--dictionary", help="dictionary JSON file, extended when it exists")
+    categories_parser.add_argument("--memory-limit-mb", type=int, default=256)
+    categories_parser.set_defaults(handler=_categories)
+
+    import_time_parser = subparsers.add_parser("import-time", help="measure the import time of the pipeline modules")
+    import_time_parser.add_argument("modules", nargs="*", help="modules to measure, defaults to every pipeline module")
+    import_time_parser.add_argument("--budget-ms", type=float, help="exit with 1 when a module takes longer to import")
+    import_time_parser.add_argument("--output", help="JSON lines file the measurements are appended to")
+    import_time_parser.set_defaults(handler=_import_time)
+
+    return parser
+
+def main(argv: Union[List[str], None] = None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.metrics is None:
+        return args.handler(args)
+
+    from pipeline.helpers.commons.instrumentation import Instrumentation
+
+    instrumentation = Instrumentation()
+    instrumentation.enable()
+    try:
+        return args.handler(args)
+    finally:
+        instrumentation.disable()
+        metrics = instrumentation.to_json() if args.metrics == "json" else instrumentation.to_prometheus()
+        sys.stderr.write(metrics if metrics.endswith("\n") else f"{metrics}\n")
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,8 @@
 class Constants:
     RAW_DATE_FORMAT = "%d-%b-%y"
     CLEAN_DATE_FORMAT = "%Y-%m-%d"
+    # two digit years parsed past this year belong to the previous century
+    RAW_DATE_CENTURY_PIVOT = 2030
 
     # constants for column names
     LOAN_ID = "loannr_chkdgt"
@@ -18,6 +20,7 @@ class Constants:
     LOW_DOC_PROGRAM = "lowdoc"
     GUARANTOR_BANK_NAME = "bank"
     GUARANTOR_BANK_STATE = "bankstate" 
+    GUARANTOR_BANK_CANONICAL_NAME = "bank_canonical"
     LOAN_APPROVAL_DATE = "approvaldate"	
     LOAN_APPROVAL_FY = "approvalfy"
     TERM_DURATION = "term"
@@ -33,5 +36,70 @@ class Constants:
     IS_DATA_VERIFICATION_NEEDED = "needs_to_verify"
     DATA_VERIFICATION_REASONS = "verify_reasons"
 
+    # raw dataset column order
+    COLUMNS = [
+        LOAN_ID,
+        DEBTOR_NAME,
+        DEBTOR_ORIGIN_CITY,
+        DEBTOR_ORIGIN_STATE,
+        DEBTOR_ORIGIN_ZIP_CODE,
+        GUARANTOR_BANK_NAME,
+        GUARANTOR_BANK_STATE,
+        NAICS_CODE,
+        LOAN_APPROVAL_DATE,
+        LOAN_APPROVAL_FY,
+        TERM_DURATION,
+        DEBTOR_EMPLOYEE_NUMBER,
+        DEBTOR_NEW_OR_EXIST,
+        NUMBER_NEW_JOB_CREATED,
+        NUMBER_JOB_RETAINED,
+        DEBTOR_FRANCHISE_CODE,
+        DEBTOR_URBAN_RURAL_INFO,
+        REV_LINE_CREDIT,
+        LOW_DOC_PROGRAM,
+        CHARGED_OFF_DATE,
+        DISBURSEMENT_DATE,
+        DISBURESEMENT_GROSS,
+        OUTSTANDING_BALANCE,
+        LOAN_STATUS,
+        CREDIT_CHARGED_OFF_AMOUNT,
+        BANK_APPROVED_CREDIT_AMOUNT,
+        SBA_APPROVED_CREDIT_AMOUNT,
+    ]
+
+    DATE_COLUMNS = [LOAN_APPROVAL_DATE, CHARGED_OFF_DATE, DISBURSEMENT_DATE]
+    INTEGER_COLUMNS = [
+        LOAN_APPROVAL_FY,
+        TERM_DURATION,
+        DEBTOR_EMPLOYEE_NUMBER,
+        DEBTOR_NEW_OR_EXIST,
+        NUMBER_NEW_JOB_CREATED,
+        NUMBER_JOB_RETAINED,
+        DEBTOR_FRANCHISE_CODE,
+        DEBTOR_URBAN_RURAL_INFO,
+    ]
+    AMOUNT_COLUMNS = [
+        DISBURESEMENT_GROSS,
+        OUTSTANDING_BALANCE,
+        CREDIT_CHARGED_OFF_AMOUNT,
+        BANK_APPROVED_CREDIT_AMOUNT,
+        SBA_APPROVED_CREDIT_AMOUNT,
+    ]
+
+    # low cardinality text columns, dictionary encoded by CategoricalEncoder
+    CATEGORICAL_COLUMNS = [
+        DEBTOR_ORIGIN_STATE,
+        GUARANTOR_BANK_STATE,
+        DEBTOR_ORIGIN_CITY,
+        GUARANTOR_BANK_NAME,
+        LOW_DOC_PROGRAM,
+        REV_LINE_CREDIT,
+        LOAN_STATUS,
+        DEBTOR_URBAN_RURAL_INFO,
+    ]
+
     VALID_REVOLVING_CREDIT_CODES = ["Y", "N"]
-    VALID_LOW_DOC_CODES = ["Y", "N"]
\ No newline at end of file
+    VALID_LOW_DOC_CODES = ["Y", "N"]
+    CHARGED_OFF_STATUS = "CHGOFF"
+    # raw "P I F" is rewritten to this value by the cleaning
+    PAID_IN_FULL_STATUS = "PIF"
\ No newline at end of file
@@ -0,0 +1,365 @@
+import math
+import os
+from typing import Iterable, Union
+
+import polars as pl
+
+from pipeline.constants import Constants
+from pipeline.models.bank_canonicalization_report import BankCanonicalizationReport
+
+class BankNameCanonicalizer:
+    """
+    Map the spelling variants of a lender to one canonical name, per bankstate
+
+    Building the lookup table:
+    1. every distinct name is normalized into a key: upper case, no punctuation, abbreviations
+       expanded (NATL BK -> NATIONAL BANK) and legal form suffixes dropped (N.A., INC, ...).
+       Names sharing a key are the same lender
+    2. keys are split into character trigrams and only compared within their bankstate.
+       Candidate pairs come from prefix filtering: trigrams are ordered rarest first and a key only
+       indexes its first |key| - ceil(threshold * |key|) + 1 trigrams, any pair reaching the Jaccard
+       threshold shares one of them. Common trigrams like "BAN" never produce candidates,
+       so the work stays far below the all pairs comparison
+    3. candidates reaching the trigram Jaccard threshold are merged with union-find, and each
+       cluster takes the raw name with the most loans as its canonical name
+
+    The lookup table maps (bankstate, key) to the canonical name, so new batches are canonicalized
+    with one hash join on their normalized names, variants never seen before included
+
+    Usage:
+        canonicalizer = BankNameCanonicalizer()
+        report = canonicalizer.build_from_csv("notebook/dataset/SBAnational.csv")
+        canonicalizer.save("bank_lookup.parquet")
+        df = canonicalizer.apply(df)  # adds bank_canonical
+    """
+
+    KEY_COLUMN = "bank_key"
+    LOANS_COLUMN = "loans"
+
+    # whole word abbreviations of the SBA extract, names are truncated to 30 characters upstream
+    ABBREVIATIONS = {
+        "1ST": "FIRST",
+        "2ND": "SECOND",
+        "3RD": "THIRD",
+        "ASSN": "ASSOCIATION",
+        "ASSOC": "ASSOCIATION",
+        "BK": "BANK",
+        "BNK": "BANK",
+        "BUS": "BUSINESS",
+        "CO": "COMPANY",
+        "CORP": "CORPORATION",
+        "CMNTY": "COMMUNITY",
+        "CNTY": "COUNTY",
+        "CTY": "COUNTY",
+        "DEV": "DEVELOPMENT",
+        "DEVEL": "DEVELOPMENT",
+        "FED": "FEDERAL",
+        "FIN": "FINANCIAL",
+        "FINL": "FINANCIAL",
+        "MTG": "MORTGAGE",
+        "NATL": "NATIONAL",
+        "SAV": "SAVINGS",
+        "SVGS": "SAVINGS",
+        "TR": "TRUST",
+        "TRST": "TRUST",
+    }
+    # legal form words that don't identify the lender
+    DROPPED_WORDS = ["THE", "NA", "INC", "INCORPORATED", "LLC"]
+
+    def __init__(self, threshold: float = 0.8, lookup: Union[pl.DataFrame, None] = None):
+        """
+        Params:
+            threshold (float, optional): trigram Jaccard similarity from which two keys are the same lender
+            lookup (pl.DataFrame or None, optional): lookup table of a previous build
+        """
+
+        if not 0 < threshold <= 1:
+            raise ValueError("threshold must be in (0, 1]")
+
+        self.threshold = threshold
+        self.lookup = lookup
+
+    @classmethod
+    def normalize_expr(cls, bank: pl.Expr) -> pl.Expr:
+        """
+        Params:
+            bank (pl.Expr): raw bank names
+
+        Returns:
+            pl.Expr: lookup keys of the names, null for null or empty names
+        """
+
+        key = (
+            bank.cast(pl.String)
+                .str.to_uppercase()
+                .str.replace_all("&", " AND ", literal=True)
+                # U.S. -> US before the other punctuation becomes spaces
+                .str.replace_all(r"[.']", "")
+                .str.replace_all(r"[^A-Z0-9]+", " ")
+        )
+        for abbreviation, expansion in cls.ABBREVIATIONS.items():
+            key = key.str.replace_all(rf"\b{abbreviation}\b", expansion)
+
+        key = (
+            key.str.replace_all(rf"\b(?:{'|'.join(cls.DROPPED_WORDS)})\b", " ")
+                .str.replace_all(r"\b(?:NATIONAL ASSOCIATION|N A)\s*$", " ")
+                .str.replace_all(r"\s+", " ")
+                .str.strip_chars()
+        )
+        return pl.when(key.str.len_chars().gt(0)).then(key)
+
+    def _trigrams(self, keys_df: pl.DataFrame) -> pl.DataFrame:
+        """
+        Params:
+            keys_df (pl.DataFrame): node id, bankstate and key of each distinct key
+
+        Returns:
+            pl.DataFrame: node id, bankstate and trigram, one row per distinct trigram of a key
+        """
+
+        padded_key = pl.concat_str(pl.lit(" "), pl.col(self.KEY_COLUMN), pl.lit(" "))
+
+        return (
+            keys_df.lazy()
+                .select(
+                    "node",
+                    Constants.GUARANTOR_BANK_STATE,
+                    padded_key.alias("padded_key"),
+                    pl.int_ranges(0, padded_key.str.len_chars() - 2).alias("position"),
+                )
+                .explode("position")
+                .select("node", Constants.GUARANTOR_BANK_STATE, pl.col("padded_key").str.slice(pl.col("position"), 3).alias("trigram"))
+                .unique(["node", "trigram"])
+                .collect()
+        )
+
+    def _candidate_pairs(self, trigrams_df: pl.DataFrame) -> pl.DataFrame:
+        """
+        Params:
+            trigrams_df (pl.DataFrame): output of _trigrams
+
+        Returns:
+            pl.DataFrame: node_a < node_b pairs of the same bankstate sharing a prefix trigram
+        """
+
+        block = [Constants.GUARANTOR_BANK_STATE, "trigram"]
+        trigram_count = pl.len().over("node")
+        prefix_length = trigram_count - (trigram_count.cast(pl.Float64) * self.threshold).ceil().cast(pl.UInt32) + 1
+        # global order: rarest trigram of the bankstate first, ties broken on the trigram itself
+        rank = pl.struct("frequency", "trigram").rank("ordinal").over("node")
+
+        prefix_df = (
+            trigrams_df
+                .with_columns(pl.len().over(block).alias("frequency"))
+                .filter(rank.le(prefix_length))
+                .select("node", *block)
+        )
+
+        return (
+            prefix_df.join(prefix_df, on=block, suffix="_b", nulls_equal=True)
+                .filter(pl.col("node").lt(pl.col("node_b")))
+                .select(pl.col("node").alias("node_a"), "node_b")
+                .unique()
+        )
+
+    def _matched_pairs(self, trigrams_df: pl.DataFrame, candidates_df: pl.DataFrame) -> pl.DataFrame:
+        """
+        Params:
+            trigrams_df (pl.DataFrame): output of _trigrams
+            candidates_df (pl.DataFrame): output of _candidate_pairs
+
+        Returns:
+            pl.DataFrame: candidate pairs whose trigram Jaccard similarity reaches the threshold
+        """
+
+        node_trigrams = trigrams_df.select("node", "trigram")
+        sizes = node_trigrams.group_by("node").len("size")
+
+        shared_df = (
+            candidates_df
+                .join(node_trigrams, left_on="node_a", right_on="node")
+                .join(node_trigrams, left_on=["node_b", "trigram"], right_on=["node", "trigram"])
+                .group_by("node_a", "node_b")
+                .len("shared")
+        )
+
+        return (
+            shared_df
+                .join(sizes.rename({"node": "node_a", "size": "size_a"}), on="node_a")
+                .join(sizes.rename({"node": "node_b", "size": "size_b"}), on="node_b")
+                .filter(
+                    (pl.col("shared") / (pl.col("size_a") + pl.col("size_b") - pl.col("shared"))).ge(self.threshold)
+                )
+                .select("node_a", "node_b")
+        )
+
+    @staticmethod
+    def _clusters(nodes: int, pairs: Iterable[tuple]) -> list:
+        """
+        Params:
+            nodes (int): number of nodes, ids are 0 to nodes - 1
+            pairs (iterable of tuple): (node_a, node_b) pairs to merge
+
+        Returns:
+            list of int: cluster root of each node
+        """
+
+        parents = list(range(nodes))
+
+        def find(node: int) -> int:
+            while parents[node] != node:
+                # path halving
+                parents[node] = parents[parents[node]]
+                node = parents[node]
+            return node
+
+        for node_a, node_b in pairs:
+            root_a, root_b = find(node_a), find(node_b)
+            if root_a != root_b:
+                parents[max(root_a, root_b)] = min(root_a, root_b)
+
+        return [find(node) for node in range(nodes)]
+
+    def build(self, names_df: pl.DataFrame) -> BankCanonicalizationReport:
+        """
+        Build the lookup table from the distinct names of a dataset
+
+        Params:
+            names_df (pl.DataFrame): bank and bankstate columns, one row per loan or already counted
+                with a loans column
+
+        Returns:
+            BankCanonicalizationReport: sizes of the index and of the clusters
+        """
+
+        if self.LOANS_COLUMN not in names_df.columns:
+            names_df = names_df.with_columns(pl.lit(1, dtype=pl.UInt32).alias(self.LOANS_COLUMN))
+
+        state = Constants.GUARANTOR_BANK_STATE
+        bank = Constants.GUARANTOR_BANK_NAME
+
+        raw_names_df = (
+            names_df
+                .filter(pl.col(bank).is_not_null())
+                .group_by(state, bank)
+                .agg(pl.col(self.LOANS_COLUMN).sum())
+                .with_columns(self.normalize_expr(pl.col(bank)).alias(self.KEY_COLUMN))
+                .filter(pl.col(self.KEY_COLUMN).is_not_null())
+        )
+        keys_df = (
+            raw_names_df
+                .group_by(state, self.KEY_COLUMN)
+                .agg(pl.col(self.LOANS_COLUMN).sum())
+                .sort(state, self.KEY_COLUMN, nulls_last=True)
+                .with_row_index("node")
+        )
+
+        trigrams_df = self._trigrams(keys_df)
+        candidates_df = self._candidate_pairs(trigrams_df)
+        matched_df = self._matched_pairs(trigrams_df, candidates_df)
+
+        keys_df = keys_df.with_columns(
+            pl.Series("cluster", self._clusters(keys_df.height, matched_df.iter_rows()), dtype=pl.UInt32)
+        )
+
+        # the most used spelling of each cluster, ties go to the alphabetically first one
+        canonical_df = (
+            raw_names_df
+                .join(keys_df.select(state, self.KEY_COLUMN, "cluster"), on=[state, self.KEY_COLUMN], nulls_equal=True)
+                .sort(self.LOANS_COLUMN, bank, descending=[True, False])
+                .group_by("cluster")
+                .agg(pl.col(bank).first().alias(Constants.GUARANTOR_BANK_CANONICAL_NAME))
+        )
+
+        self.lookup = (
+            keys_df
+                .join(canonical_df, on="cluster")
+                .select(state, self.KEY_COLUMN, Constants.GUARANTOR_BANK_CANONICAL_NAME)
+                .sort(state, self.KEY_COLUMN, nulls_last=True)
+        )
+
+        keys_per_state = keys_df.group_by(state).len().get_column("len")
+        return BankCanonicalizationReport(
+            distinct_names=raw_names_df.height,
+            distinct_keys=keys_df.height,
+            clusters=keys_df.get_column("cluster").n_unique(),
+            candidate_pairs=candidates_df.height,
+            matched_pairs=matched_df.height,
+            all_pairs=int((keys_per_state * (keys_per_state - 1) // 2).sum())
+        )
+
+    def build_from_csv(self, source_path: str) -> BankCanonicalizationReport:
+        """
+        Params:
+            source_path (str): raw or cleaned loans CSV, only bank and bankstate are read
+
+        Returns:
+            BankCanonicalizationReport: sizes of the index and of the clusters
+        """
+
+        source_lf = pl.scan_csv(source_path, infer_schema=False)
+        source_lf = source_lf.rename({column: column.lower() for column in source_lf.collect_schema().names()})
+
+        return self.build(
+            source_lf
+                .group_by(Constants.GUARANTOR_BANK_STATE, Constants.GUARANTOR_BANK_NAME)
+                .agg(pl.len().alias(self.LOANS_COLUMN))
+                .collect()
+        )
+
+    def apply(self, df: pl.DataFrame) -> pl.DataFrame:
+        """
+        Params:
+            df (pl.DataFrame): loans with bank and bankstate columns
+
+        Returns:
+            pl.DataFrame: df with a bank_canonical column, names missing from the lookup table keep their raw name
+        """
+
+        if self.lookup is None:
+            raise ValueError("build or load a lookup table first")
+
+        state = Constants.GUARANTOR_BANK_STATE
+        bank = Constants.GUARANTOR_BANK_NAME
+
+        # distinct names only are normalized, then broadcast back with hash joins
+        names_df = (
+            df.select(state, bank)
+                .unique()
+                .with_columns(self.normalize_expr(pl.col(bank)).alias(self.KEY_COLUMN))
+                .join(self.lookup, on=[state, self.KEY_COLUMN], how="left", nulls_equal=True)
+                .select(state, bank, Constants.GUARANTOR_BANK_CANONICAL_NAME)
+        )
+
+        return (
+            df.join(names_df, on=[state, bank], how="left", nulls_equal=True, maintain_order="left")
+                .with_columns(
+                    pl.coalesce(Constants.GUARANTOR_BANK_CANONICAL_NAME, bank).alias(Constants.GUARANTOR_BANK_CANONICAL_NAME)
+                )
+        )
+
+    def save(self, lookup_path: str):
+        """
+        Params:
+            lookup_path (str): parquet path of the lookup table
+        """
+
+        if self.lookup is None:
+            raise ValueError("build a lookup table first")
+
+        temporary_path = f"{lookup_path}.{os.getpid()}.tmp"
+        self.lookup.write_parquet(temporary_path)
+        os.replace(temporary_path, lookup_path)
+
+    @classmethod
+    def load(cls, lookup_path: str, threshold: float = 0.8) -> "BankNameCanonicalizer":
+        """
+        Params:
+            lookup_path (str): parquet path written by save
+            threshold (float, optional): threshold of later builds
+
+        Returns:
+            BankNameCanonicalizer: canonicalizer ready to apply the lookup table
+        """
+
+        return cls(threshold, pl.read_parquet(lookup_path))
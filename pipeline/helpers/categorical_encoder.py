@@ -0,0 +1,296 @@
+import json
+import os
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Union
+
+import polars as pl
+
+from pipeline.constants import Constants
+from pipeline.models.categorical_memory_report import CategoricalMemoryReport, ColumnMemoryModel
+
+class CategoricalEncoder:
+    """
+    Dictionary encode low cardinality text columns as pl.Enum, with dictionaries shared across chunks and shards
+
+    Each column keeps an append-only dictionary: values are added in sorted order the first time a chunk
+    holds them and never move afterwards, so a code means the same value in every chunk encoded by the
+    same encoder, and frames encoded at different times only differ by the values appended since.
+    Shards encoded by separate processes agree once their dictionaries are merged with merge, or when
+    they share one dictionary file built beforehand
+
+    An encoded column holds one small integer per row plus one copy of each distinct value, and
+    group-bys and joins on it hash the integers instead of the strings
+
+    Processes sharing a dictionary file update it inside locked(), which reloads the file under an
+    exclusive lock, otherwise the last save drops the values appended by the others
+
+    Usage:
+        encoder = CategoricalEncoder(dictionary_path="categories.json")
+        with encoder.locked():
+            encoded_chunks = [encoder.encode(chunk) for chunk in chunks]
+            encoder.save()
+        df = encoder.align(encoded_chunks)  # every chunk cast to the final dictionaries
+    """
+
+    def __init__(
+        self,
+        columns: Union[List[str], None] = None,
+        dictionary_path: Union[str, None] = None
+    ):
+        """
+        Params:
+            columns (list of str or None, optional): columns to encode, defaults to Constants.CATEGORICAL_COLUMNS
+            dictionary_path (str or None, optional): JSON file the dictionaries are read from, when it exists,
+                and saved to
+        """
+
+        self.columns = columns or list(Constants.CATEGORICAL_COLUMNS)
+        self.dictionary_path = dictionary_path
+        self.dictionaries = {column: [] for column in self.columns}
+        self._known_values = {column: set() for column in self.columns}
+
+        self.reload()
+
+    def reload(self):
+        """
+        Read the dictionary file again, values appended to it since keep their codes and
+        values only this encoder holds are appended after them
+        """
+
+        if self.dictionary_path is None or not os.path.exists(self.dictionary_path):
+            return
+
+        with open(self.dictionary_path) as dictionary_file:
+            saved_dictionaries = json.load(dictionary_file)
+
+        for column in self.columns:
+            own_values = self.dictionaries[column]
+            self.dictionaries[column] = list(saved_dictionaries.get(column, []))
+            self._known_values[column] = set(self.dictionaries[column])
+            self._append(column, own_values)
+
+    @contextmanager
+    def locked(self) -> Iterator["CategoricalEncoder"]:
+        """
+        Hold an exclusive lock on the dictionary file, reloaded first, so processes updating it run one
+        after the other. Encode and save inside the block. The lock is advisory and needs fcntl (POSIX),
+        elsewhere the block runs unlocked
+
+        Returns:
+            CategoricalEncoder: this encoder, with the dictionaries read under the lock
+        """
+
+        if self.dictionary_path is None:
+            raise ValueError("dictionary_path is required")
+
+        try:
+            import fcntl
+        except ImportError:
+            fcntl = None
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.dictionary_path)), exist_ok=True)
+
+        # a separate lock file, the dictionary file itself is swapped by save
+        with open(f"{self.dictionary_path}.lock", "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                self.reload()
+                yield self
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def dtype(self, column: str) -> pl.Enum:
+        """
+        Params:
+            column (str): encoded column
+
+        Returns:
+            pl.Enum: current dtype of the column
+        """
+
+        return pl.Enum(self.dictionaries[column])
+
+    def _append(self, column: str, values: Iterable[str]) -> int:
+        """
+        Params:
+            column (str): encoded column
+            values (iterable of str): values to add, in the order they get their codes
+
+        Returns:
+            int: number of values added to the dictionary
+        """
+
+        new_values = [value for value in values if value not in self._known_values[column]]
+        self.dictionaries[column].extend(new_values)
+        self._known_values[column].update(new_values)
+        return len(new_values)
+
+    def update(self, df: pl.DataFrame) -> int:
+        """
+        Params:
+            df (pl.DataFrame): frame whose new values are added to the dictionaries
+
+        Returns:
+            int: number of values added across the columns
+        """
+
+        added_values = 0
+        for column in self.columns:
+            if column not in df.columns:
+                continue
+
+            values = df.get_column(column).cast(pl.String).drop_nulls().unique().sort()
+            added_values += self._append(column, values.to_list())
+        return added_values
+
+    def merge(self, encoders: Iterable["CategoricalEncoder"]) -> int:
+        """
+        Append the values of other encoders, ex: one per shard, in the given order
+
+        Params:
+            encoders (iterable of CategoricalEncoder): encoders whose dictionaries are merged into this one
+
+        Returns:
+            int: number of values added across the columns
+        """
+
+        added_values = 0
+        for encoder in encoders:
+            for column in self.columns:
+                added_values += self._append(column, encoder.dictionaries.get(column, []))
+        return added_values
+
+    def encode(self, df: pl.DataFrame, update: bool = True) -> pl.DataFrame:
+        """
+        Params:
+            df (pl.DataFrame): frame with the categorical columns, as strings or any castable dtype
+            update (bool, optional): add the new values to the dictionaries first,
+                otherwise a value missing from a dictionary raises
+
+        Returns:
+            pl.DataFrame: df with the categorical columns as pl.Enum
+        """
+
+        if update:
+            self.update(df)
+
+        return df.with_columns(
+            pl.col(column).cast(pl.String).cast(self.dtype(column))
+            for column in self.columns
+            if column in df.columns
+        )
+
+    def encode_chunks(self, chunks: Iterator[pl.DataFrame]) -> Iterator[pl.DataFrame]:
+        """
+        Params:
+            chunks (iterator of pl.DataFrame): frames to encode, ex: CsvStreamingService.iter_chunks
+
+        Returns:
+            iterator of pl.DataFrame: encoded chunks, each with the dictionaries as they were after it
+        """
+
+        for chunk in chunks:
+            yield self.encode(chunk)
+
+    def align(self, frames: List[pl.DataFrame]) -> pl.DataFrame:
+        """
+        Params:
+            frames (list of pl.DataFrame): frames encoded by this encoder, possibly with older dictionaries
+
+        Returns:
+            pl.DataFrame: frames concatenated with the current dictionaries, codes are kept as they are
+        """
+
+        return pl.concat(
+            frame.with_columns(
+                pl.col(column).cast(self.dtype(column))
+                for column in self.columns
+                if column in frame.columns
+            )
+            for frame in frames
+        )
+
+    @staticmethod
+    def decode(df: pl.DataFrame) -> pl.DataFrame:
+        """
+        Params:
+            df (pl.DataFrame): encoded frame
+
+        Returns:
+            pl.DataFrame: df with every pl.Enum column back to strings
+        """
+
+        return df.with_columns(
+            pl.col(column).cast(pl.String)
+            for column, dtype in df.schema.items()
+            if isinstance(dtype, pl.Enum)
+        )
+
+    def save(self, dictionary_path: Union[str, None] = None):
+        """
+        Write the dictionaries as they are, call it inside locked() when other processes share the file
+
+        Params:
+            dictionary_path (str or None, optional): JSON file to write, defaults to the constructor's one
+        """
+
+        dictionary_path = dictionary_path or self.dictionary_path
+        if dictionary_path is None:
+            raise ValueError("dictionary_path is required")
+
+        directory = os.path.dirname(os.path.abspath(dictionary_path))
+        os.makedirs(directory, exist_ok=True)
+
+        temporary_path = f"{dictionary_path}.{os.getpid()}.tmp"
+        with open(temporary_path, "w") as dictionary_file:
+            json.dump(self.dictionaries, dictionary_file)
+        os.replace(temporary_path, dictionary_path)
+
+    def memory_report(self, chunks: Iterable[pl.DataFrame]) -> CategoricalMemoryReport:
+        """
+        Measure the categorical columns as strings and encoded, chunk by chunk, so the dataset is never
+        held in memory. The dictionaries are updated with the values of the chunks
+
+        Params:
+            chunks (iterable of pl.DataFrame): raw frames
+
+        Returns:
+            CategoricalMemoryReport: per column bytes, the shared dictionaries are counted once
+        """
+
+        rows = 0
+        string_bytes: Dict[str, int] = {column: 0 for column in self.columns}
+        code_bytes: Dict[str, int] = {column: 0 for column in self.columns}
+        measured_columns = set()
+
+        for chunk in chunks:
+            rows += chunk.height
+            encoded_chunk = self.encode(chunk)
+
+            for column in self.columns:
+                if column not in chunk.columns:
+                    continue
+
+                measured_columns.add(column)
+                string_bytes[column] += chunk.get_column(column).cast(pl.String).estimated_size()
+                code_bytes[column] += encoded_chunk.get_column(column).to_physical().estimated_size()
+
+        column_reports = [
+            ColumnMemoryModel(
+                column=column,
+                categories=len(self.dictionaries[column]),
+                string_bytes=string_bytes[column],
+                encoded_bytes=code_bytes[column] + pl.Series(self.dictionaries[column], dtype=pl.String).estimated_size()
+            )
+            for column in self.columns
+            if column in measured_columns
+        ]
+
+        return CategoricalMemoryReport(
+            rows=rows,
+            columns=column_reports,
+            string_bytes=sum(column_report.string_bytes for column_report in column_reports),
+            encoded_bytes=sum(column_report.encoded_bytes for column_report in column_reports)
+        )
@@ -1,11 +1,31 @@
-from datetime import datetime
-from typing import Union
+from datetime import date, datetime
+from typing import Callable, List, Tuple, Union
+
+import polars as pl
 
 from pipeline.constants import Constants
+from pipeline.helpers.commons.date_normalizer import DateNormalizer
+from pipeline.helpers.commons.reference_tables import ReferenceTables
 from pipeline.helpers.commons.utils import Utils
-from pipeline.models.inspection_result import InspectionResultModel
+from pipeline.models.inspection_result import InspectionResultBatch, InspectionResultModel, InspectionResultRow
+from pipeline.models.verify_reason import VerifyReasonRegistry
 
 class DataCleaningService:
+    # shared across services so every chunk and rule reuses the same conversions
+    date_normalizer = DateNormalizer()
+    reference_tables = ReferenceTables()
+
+    # bump whenever a rule changes its output, invalidates incremental cleaning states
+    RULES_VERSION = 3
+
+    def __init__(self, result_batch: Union[InspectionResultBatch, None] = None):
+        """
+        Params:
+            result_batch (InspectionResultBatch or None, optional): when given, inspect_* methods append
+                their results into the batch and return row views instead of InspectionResultModel
+        """
+        self.result_batch = result_batch
+
     def _is_value_null(self, value: Union[int, str, float, None]) -> bool:
         """
         Params:
@@ -16,12 +36,33 @@ class DataCleaningService:
         """
         return value is None
 
+    def _format_raw_date(self, date_str: str) -> Union[str, None]:
+        """
+        Params:
+            date_str (str): date string in Constants.RAW_DATE_FORMAT
+
+        Returns:
+            str or None: date string in Constants.CLEAN_DATE_FORMAT, None if the date can't be parsed
+        """
+        return self.date_normalizer.format_raw_date(date_str)
+
+    def _derive_fiscal_year(self, clean_date_str: str) -> Union[int, None]:
+        """
+        Params:
+            clean_date_str (str): date string in Constants.CLEAN_DATE_FORMAT
+
+        Returns:
+            int or None: fiscal year of the date, None if the date can't be parsed
+        """
+        return self.date_normalizer.fiscal_year(clean_date_str)
+
     def _generate_inspection_results(
         self,
+        field_to_inspect: str,
         actual_value: Union[str, int, float, None], 
         verify_reasons: Union[str, None] = None,
         new_value_to_assign: Union[str, int, float, None] = None
-    ) -> InspectionResultModel:
+    ) -> Union[InspectionResultModel, InspectionResultRow]:
         """
         Params
         ------
@@ -35,22 +76,27 @@ class DataCleaningService:
                 new value to assign
 
         Returns:
-            InspectionResultModel: inspection results model
+            InspectionResultModel: inspection results model,
+                or InspectionResultRow view when the service fills a result batch
         """
+        if self.result_batch is not None:
+            index = self.result_batch.append(field_to_inspect, actual_value, verify_reasons, new_value_to_assign)
+            return InspectionResultRow(self.result_batch, index)
+
         response_dict = {}
 
         if verify_reasons is None:
             response_dict["needs_to_verify"] = False
         else:
             response_dict["needs_to_verify"] = True
-            response_dict["verify_reasons"] = verify_reasons
+            response_dict["verify_reason"] = verify_reasons
         
         response_dict["actual_value"] = actual_value
 
         if new_value_to_assign is not None:
             response_dict["value_to_assign"] = new_value_to_assign
 
-        return self.InspectionResultModel(**response_dict)
+        return InspectionResultModel(**response_dict)
     
     def inspect_loan_id(self, loan_id: Union[str, None]) -> InspectionResultModel:
         """
@@ -62,8 +108,8 @@ class DataCleaningService:
         """
 
         if self._is_value_null(loan_id):
-            return self._generate_inspection_results(loan_id, f"missing value on {Constants.LOAN_ID}")
-        return self._generate_inspection_results(loan_id)
+            return self._generate_inspection_results(Constants.LOAN_ID, loan_id, f"missing value on {Constants.LOAN_ID}")
+        return self._generate_inspection_results(Constants.LOAN_ID, loan_id)
 
     def inspect_debtor_name(self, name: Union[str, None]) -> InspectionResultModel:
         """
@@ -75,9 +121,9 @@ class DataCleaningService:
         """
 
         if self._is_value_null(name):
-            return self._generate_inspection_results(name, f"missing value on {Constants.DEBTOR_NAME}")
+            return self._generate_inspection_results(Constants.DEBTOR_NAME, name, f"missing value on {Constants.DEBTOR_NAME}")
         
-        return self._generate_inspection_results(name)
+        return self._generate_inspection_results(Constants.DEBTOR_NAME, name)
     
     def inspect_debtor_state(self, state: Union[str, None]) -> InspectionResultModel:
         """
@@ -89,9 +135,11 @@ class DataCleaningService:
         """
 
         if self._is_value_null(state):
-            return self._generate_inspection_results(state, f"missing value on {Constants.DEBTOR_ORIGIN_STATE}")
+            return self._generate_inspection_results(Constants.DEBTOR_ORIGIN_STATE, state, f"missing value on {Constants.DEBTOR_ORIGIN_STATE}")
+        if state not in self.reference_tables.state_code_set:
+            return self._generate_inspection_results(Constants.DEBTOR_ORIGIN_STATE, state, f"unknown {Constants.DEBTOR_ORIGIN_STATE}")
         
-        return self._generate_inspection_results(state)
+        return self._generate_inspection_results(Constants.DEBTOR_ORIGIN_STATE, state)
     
     def inspect_zip(self, zip_code: Union[str, None]) -> InspectionResultModel:
         """
@@ -103,12 +151,12 @@ class DataCleaningService:
         """
 
         if self._is_value_null(zip_code):
-            return self._generate_inspection_results(zip_code, f"missing value on {Constants.DEBTOR_ORIGIN_ZIP_CODE}")
+            return self._generate_inspection_results(Constants.DEBTOR_ORIGIN_ZIP_CODE, zip_code, f"missing value on {Constants.DEBTOR_ORIGIN_ZIP_CODE}")
         else:
             if len(zip_code) <= 3:
-                return self._generate_inspection_results(zip, f"invalid {Constants.DEBTOR_ORIGIN_ZIP_CODE}", "invalid")
+                return self._generate_inspection_results(Constants.DEBTOR_ORIGIN_ZIP_CODE, zip_code, f"invalid {Constants.DEBTOR_ORIGIN_ZIP_CODE}", "invalid")
 
-        return self._generate_inspection_results(zip)
+        return self._generate_inspection_results(Constants.DEBTOR_ORIGIN_ZIP_CODE, zip_code)
 
     def inspect_city(self, city: Union[str, None]) -> InspectionResultModel:
         """
@@ -120,12 +168,12 @@ class DataCleaningService:
         """
 
         if self._is_value_null(city):
-            return self._generate_inspection_results(city, f"missing value on {Constants.DEBTOR_ORIGIN_CITY}")
+            return self._generate_inspection_results(Constants.DEBTOR_ORIGIN_CITY, city, f"missing value on {Constants.DEBTOR_ORIGIN_CITY}")
         else:
             if len(city) <= 2:
-                return self._generate_inspection_results(city, f"invalid {Constants.DEBTOR_ORIGIN_CITY}", "invalid")
+                return self._generate_inspection_results(Constants.DEBTOR_ORIGIN_CITY, city, f"invalid {Constants.DEBTOR_ORIGIN_CITY}", "invalid")
 
-        return self._generate_inspection_results(city)
+        return self._generate_inspection_results(Constants.DEBTOR_ORIGIN_CITY, city)
 
     def inspect_bank_name(self, bank_name: Union[str, None]) -> InspectionResultModel:
         """
@@ -137,8 +185,8 @@ class DataCleaningService:
         """
 
         if self._is_value_null(bank_name):
-            return self._generate_inspection_results(bank_name, f"missing value on {Constants.GUARANTOR_BANK_NAME}")
-        return self._generate_inspection_results(bank_name)
+            return self._generate_inspection_results(Constants.GUARANTOR_BANK_NAME, bank_name, f"missing value on {Constants.GUARANTOR_BANK_NAME}")
+        return self._generate_inspection_results(Constants.GUARANTOR_BANK_NAME, bank_name)
     
     def inspect_bank_state(self, bank_state: Union[str, None]) -> InspectionResultModel:
         """
@@ -150,8 +198,10 @@ class DataCleaningService:
         """
 
         if self._is_value_null(bank_state):
-            return self._generate_inspection_results(bank_state, f"missing value on {Constants.GUARANTOR_BANK_STATE}")
-        return self._generate_inspection_results(bank_state)
+            return self._generate_inspection_results(Constants.GUARANTOR_BANK_STATE, bank_state, f"missing value on {Constants.GUARANTOR_BANK_STATE}")
+        if bank_state not in self.reference_tables.state_code_set:
+            return self._generate_inspection_results(Constants.GUARANTOR_BANK_STATE, bank_state, f"unknown {Constants.GUARANTOR_BANK_STATE}")
+        return self._generate_inspection_results(Constants.GUARANTOR_BANK_STATE, bank_state)
     
     def inspect_naics(self, naics: Union[str, None]) -> InspectionResultModel:
         """
@@ -163,12 +213,14 @@ class DataCleaningService:
         """
 
         if self._is_value_null(naics):
-            return self._generate_inspection_results(naics, f"missing value on {Constants.NAICS_CODE}")
+            return self._generate_inspection_results(Constants.NAICS_CODE, naics, f"missing value on {Constants.NAICS_CODE}")
         else:
             if len(naics) < 6:
-                return self._generate_inspection_results(naics, f"invalid {Constants.NAICS_CODE}", "invalid")
+                return self._generate_inspection_results(Constants.NAICS_CODE, naics, f"invalid {Constants.NAICS_CODE}", "invalid")
+            if naics not in self.reference_tables.naics_code_set:
+                return self._generate_inspection_results(Constants.NAICS_CODE, naics, f"unknown {Constants.NAICS_CODE}")
 
-        return self._generate_inspection_results(naics)
+        return self._generate_inspection_results(Constants.NAICS_CODE, naics)
 
     def inspect_approval_date(self, approval_date: Union[str, None]) -> InspectionResultModel:
         """
@@ -180,12 +232,13 @@ class DataCleaningService:
         """
 
         if self._is_value_null(approval_date):
-            return self._generate_inspection_results(approval_date, f"missing value on {Constants.LOAN_APPROVAL_DATE}")
+            return self._generate_inspection_results(Constants.LOAN_APPROVAL_DATE, approval_date, f"missing value on {Constants.LOAN_APPROVAL_DATE}")
 
-        formatted_date = datetime.strptime(approval_date, Constants.RAW_DATE_FORMAT)
-        formatted_date_string = datetime.strftime(formatted_date, Constants.CLEAN_DATE_FORMAT)
+        formatted_date_string = self._format_raw_date(approval_date)
+        if formatted_date_string is None:
+            return self._generate_inspection_results(Constants.LOAN_APPROVAL_DATE, approval_date, f"invalid {Constants.LOAN_APPROVAL_DATE}", "invalid")
         
-        return self._generate_inspection_results(approval_date, new_value_to_assign=formatted_date_string)
+        return self._generate_inspection_results(Constants.LOAN_APPROVAL_DATE, approval_date, new_value_to_assign=formatted_date_string)
 
     def inspect_approval_fiscal_year(
         self, 
@@ -202,25 +255,17 @@ class DataCleaningService:
         """
 
         if self._is_value_null(fiscal_year):
+            new_fiscal_year = None
             if (approval_date_str):
-                approval_date = datetime.strptime(approval_date_str, format = Constants.CLEAN_DATE_FORMAT)
-                month_of_date = approval_date.month
-                year_of_date = approval_date.year
-                new_fiscal_year = None
-
-                # Fiscal year of Y1998 
-                # defined in Oct, 1997 through Sep, 1998
-                if (month_of_date >= 10):
-                    new_fiscal_year = year_of_date - 1
-                else:
-                    new_fiscal_year = year_of_date
+                new_fiscal_year = self._derive_fiscal_year(approval_date_str)
             return self._generate_inspection_results(
+                Constants.LOAN_APPROVAL_FY,
                 fiscal_year, 
                 f"missing value on {Constants.LOAN_APPROVAL_FY}", 
                 new_fiscal_year
             )
         else:
-            return self._generate_inspection_results(fiscal_year)
+            return self._generate_inspection_results(Constants.LOAN_APPROVAL_FY, fiscal_year)
         
     def inspect_term_period(self, term: Union[int, None]) -> InspectionResultModel:
         """
@@ -232,11 +277,11 @@ class DataCleaningService:
         """
 
         if self._is_value_null(term):
-            return self._generate_inspection_results(term, f"missing value on {Constants.TERM_DURATION}")
+            return self._generate_inspection_results(Constants.TERM_DURATION, term, f"missing value on {Constants.TERM_DURATION}")
         else:
             if term == 0:
-                return self._generate_inspection_results(term, f"has 0 {Constants.TERM_DURATION}")
-            return self._generate_inspection_results(term)
+                return self._generate_inspection_results(Constants.TERM_DURATION, term, f"has 0 {Constants.TERM_DURATION}")
+            return self._generate_inspection_results(Constants.TERM_DURATION, term)
 
     def inspect_no_emp(self, employee_number: Union[int, None]) -> InspectionResultModel:
         """
@@ -248,8 +293,8 @@ class DataCleaningService:
         """
 
         if self._is_value_null(employee_number):
-            return self._generate_inspection_results(employee_number, f"missing value on {Constants.DEBTOR_EMPLOYEE_NUMBER}")
-        return self._generate_inspection_results(employee_number)
+            return self._generate_inspection_results(Constants.DEBTOR_EMPLOYEE_NUMBER, employee_number, f"missing value on {Constants.DEBTOR_EMPLOYEE_NUMBER}")
+        return self._generate_inspection_results(Constants.DEBTOR_EMPLOYEE_NUMBER, employee_number)
     
     def inspect_new_exist_bussiness(self, new_or_exist: Union[bool, None]) -> InspectionResultModel:
         """
@@ -261,8 +306,8 @@ class DataCleaningService:
         """
 
         if self._is_value_null(new_or_exist):
-            return self._generate_inspection_results(new_or_exist, f"missing value on {Constants.DEBTOR_NEW_OR_EXIST}")
-        return self._generate_inspection_results(new_or_exist)
+            return self._generate_inspection_results(Constants.DEBTOR_NEW_OR_EXIST, new_or_exist, f"missing value on {Constants.DEBTOR_NEW_OR_EXIST}")
+        return self._generate_inspection_results(Constants.DEBTOR_NEW_OR_EXIST, new_or_exist)
     
     def inspect_number_new_job_created(self, num_new_job_created: Union[int, None]) -> InspectionResultModel:
         """
@@ -275,10 +320,11 @@ class DataCleaningService:
 
         if self._is_value_null(num_new_job_created):
             return self._generate_inspection_results(
+                Constants.NUMBER_NEW_JOB_CREATED,
                 num_new_job_created,
                 f"missing value on {Constants.NUMBER_NEW_JOB_CREATED}"
             )
-        return self._generate_inspection_results(num_new_job_created)
+        return self._generate_inspection_results(Constants.NUMBER_NEW_JOB_CREATED, num_new_job_created)
     
     def inspect_number_job_reatined(self, num_job_retained: Union[int, None]) -> InspectionResultModel:
         """
@@ -291,10 +337,11 @@ class DataCleaningService:
 
         if self._is_value_null(num_job_retained):
             return self._generate_inspection_results(
+                Constants.NUMBER_JOB_RETAINED,
                 num_job_retained,
                 f"missing value on {Constants.NUMBER_JOB_RETAINED}"
             )
-        return self._generate_inspection_results(num_job_retained)
+        return self._generate_inspection_results(Constants.NUMBER_JOB_RETAINED, num_job_retained)
     
     def inspect_franchise_code(self, franchise_code: Union[int, None]) -> InspectionResultModel:
         """
@@ -307,15 +354,16 @@ class DataCleaningService:
         """
 
         if self._is_value_null(franchise_code):
-            return self._generate_inspection_results(franchise_code, f"missing value on {Constants.DEBTOR_FRANCHISE_CODE}")
+            return self._generate_inspection_results(Constants.DEBTOR_FRANCHISE_CODE, franchise_code, f"missing value on {Constants.DEBTOR_FRANCHISE_CODE}")
         else:
             if (franchise_code == 0 or franchise_code == 1):
                 return self._generate_inspection_results(
+                    Constants.DEBTOR_FRANCHISE_CODE,
                     franchise_code,
                     f"doesn't have {Constants.DEBTOR_FRANCHISE_CODE}",
                     None
                 )
-            return self._generate_inspection_results(franchise_code)
+            return self._generate_inspection_results(Constants.DEBTOR_FRANCHISE_CODE, franchise_code)
     
     def inspect_urban_rural_code(self, urban_rural_code: Union[int, None]) -> InspectionResultModel:
         """
@@ -332,15 +380,18 @@ class DataCleaningService:
 
         if self._is_value_null(urban_rural_code):
             return self._generate_inspection_results(
+                Constants.DEBTOR_URBAN_RURAL_INFO,
                 urban_rural_code,
                 f"missing value on {Constants.DEBTOR_URBAN_RURAL_INFO}"
             )
         else:
             if urban_rural_code == 0:
-                return self._generate_inspection_results(urban_rural_code, "undefined")
-            elif urban_rural_code == 1:
-                return self._generate_inspection_results(urban_rural_code, "urban")
-            return self._generate_inspection_results(urban_rural_code, "rural")
+                return self._generate_inspection_results(
+                    Constants.DEBTOR_URBAN_RURAL_INFO,
+                    urban_rural_code,
+                    f"undefined {Constants.DEBTOR_URBAN_RURAL_INFO}"
+                )
+            return self._generate_inspection_results(Constants.DEBTOR_URBAN_RURAL_INFO, urban_rural_code)
     
     def inspect_rev_line_credit(self, rev_line_credit_code: Union[str, None]) -> InspectionResultModel:
         """
@@ -357,14 +408,16 @@ class DataCleaningService:
 
         if self._is_value_null(rev_line_credit_code):
             return self._generate_inspection_results(
+                Constants.REV_LINE_CREDIT,
                 rev_line_credit_code,
-                f"missing value on {Constants.REV_LINE_CREDIT}"
+                f"missing value on {Constants.REV_LINE_CREDIT}",
                 "invalid"
             )
         else:
             if rev_line_credit_code.upper() in Constants.VALID_REVOLVING_CREDIT_CODES:
-                return self._generate_inspection_results(rev_line_credit_code)
+                return self._generate_inspection_results(Constants.REV_LINE_CREDIT, rev_line_credit_code)
             return self._generate_inspection_results(
+                Constants.REV_LINE_CREDIT,
                 rev_line_credit_code,
                 f"invalid {Constants.REV_LINE_CREDIT}",
                 "invalid"
@@ -385,14 +438,16 @@ class DataCleaningService:
 
         if self._is_value_null(low_doc_code):
             return self._generate_inspection_results(
+                Constants.LOW_DOC_PROGRAM,
                 low_doc_code,
                 f"missing value on {Constants.LOW_DOC_PROGRAM}",
                 "invalid"
             )
         else:
             if low_doc_code.upper() in Constants.VALID_LOW_DOC_CODES:
-                return self._generate_inspection_results(low_doc_code)
+                return self._generate_inspection_results(Constants.LOW_DOC_PROGRAM, low_doc_code)
             return self._generate_inspection_results(
+                Constants.LOW_DOC_PROGRAM,
                 low_doc_code,
                 f"invalid {Constants.LOW_DOC_PROGRAM}",
                 "invalid"
@@ -409,14 +464,21 @@ class DataCleaningService:
 
         if self._is_value_null(charge_off_date_str):
             return self._generate_inspection_results(
+                Constants.CHARGED_OFF_DATE,
                 charge_off_date_str,
                 f"missing value on {Constants.CHARGED_OFF_DATE}"
             )
         
-        formatted_date = datetime.strptime(charge_off_date_str, Constants.RAW_DATE_FORMAT)
-        formatted_date_string = datetime.strftime(formatted_date, Constants.CLEAN_DATE_FORMAT)
+        formatted_date_string = self._format_raw_date(charge_off_date_str)
+        if formatted_date_string is None:
+            return self._generate_inspection_results(
+                Constants.CHARGED_OFF_DATE,
+                charge_off_date_str,
+                f"invalid {Constants.CHARGED_OFF_DATE}",
+                "invalid"
+            )
 
-        return self._generate_inspection_results(charge_off_date_str, formatted_date_string)
+        return self._generate_inspection_results(Constants.CHARGED_OFF_DATE, charge_off_date_str, new_value_to_assign=formatted_date_string)
     
     def inspect_disbursement_date(self, disbursement_date_str: Union[str, None]) -> InspectionResultModel:
         """
@@ -429,14 +491,21 @@ class DataCleaningService:
 
         if self._is_value_null(disbursement_date_str):
             return self._generate_inspection_results(
+                Constants.DISBURSEMENT_DATE,
                 disbursement_date_str,
                 f"missing value on {Constants.DISBURSEMENT_DATE}"
             )
         
-        formatted_date = datetime.strptime(disbursement_date_str, Constants.RAW_DATE_FORMAT)
-        formatted_date_string = datetime.strftime(formatted_date, Constants.CLEAN_DATE_FORMAT)
+        formatted_date_string = self._format_raw_date(disbursement_date_str)
+        if formatted_date_string is None:
+            return self._generate_inspection_results(
+                Constants.DISBURSEMENT_DATE,
+                disbursement_date_str,
+                f"invalid {Constants.DISBURSEMENT_DATE}",
+                "invalid"
+            )
 
-        return self._generate_inspection_results(disbursement_date_str, formatted_date_string)
+        return self._generate_inspection_results(Constants.DISBURSEMENT_DATE, disbursement_date_str, new_value_to_assign=formatted_date_string)
     
     def inspect_disbursement_gross(self, disbursement_gross_str: Union[str, None]) -> InspectionResultModel:
         """
@@ -449,12 +518,16 @@ class DataCleaningService:
 
         if self._is_value_null(disbursement_gross_str):
             return self._generate_inspection_results(
+                Constants.DISBURESEMENT_GROSS,
                 disbursement_gross_str,
                 f"missing value on {Constants.DISBURESEMENT_GROSS}"
             )
         
-        extracted_amount = Utils.extract_number_from_amount_string(disbursement_gross_str)
-        return self._generate_inspection_results(disbursement_gross_str, extracted_amount)
+        extracted_amount = Utils.parse_amount_to_cents(disbursement_gross_str)
+        if extracted_amount is None:
+            return self._generate_inspection_results(Constants.DISBURESEMENT_GROSS, disbursement_gross_str, f"invalid {Constants.DISBURESEMENT_GROSS}")
+
+        return self._generate_inspection_results(Constants.DISBURESEMENT_GROSS, disbursement_gross_str, new_value_to_assign=extracted_amount)
     
     def inspect_balance_gross(self, balance_gross_str: Union[str, None]) -> InspectionResultModel:
         """
@@ -467,12 +540,16 @@ class DataCleaningService:
 
         if self._is_value_null(balance_gross_str):
             return self._generate_inspection_results(
+                Constants.OUTSTANDING_BALANCE,
                 balance_gross_str,
                 f"missing value on {Constants.OUTSTANDING_BALANCE}"
             )
         
-        extracted_amount = Utils.extract_number_from_amount_string(balance_gross_str)
-        return self._generate_inspection_results(balance_gross_str, extracted_amount)
+        extracted_amount = Utils.parse_amount_to_cents(balance_gross_str)
+        if extracted_amount is None:
+            return self._generate_inspection_results(Constants.OUTSTANDING_BALANCE, balance_gross_str, f"invalid {Constants.OUTSTANDING_BALANCE}")
+
+        return self._generate_inspection_results(Constants.OUTSTANDING_BALANCE, balance_gross_str, new_value_to_assign=extracted_amount)
     
     def inspect_charged_off_amount(self, charge_off_str: Union[str, None]) -> InspectionResultModel:
         """
@@ -485,12 +562,16 @@ class DataCleaningService:
 
         if self._is_value_null(charge_off_str):
             return self._generate_inspection_results(
+                Constants.CREDIT_CHARGED_OFF_AMOUNT,
                 charge_off_str,
                 f"missing value on {Constants.CREDIT_CHARGED_OFF_AMOUNT}"
             )
         
-        extracted_amount = Utils.extract_number_from_amount_string(charge_off_str)
-        return self._generate_inspection_results(charge_off_str, extracted_amount)
+        extracted_amount = Utils.parse_amount_to_cents(charge_off_str)
+        if extracted_amount is None:
+            return self._generate_inspection_results(Constants.CREDIT_CHARGED_OFF_AMOUNT, charge_off_str, f"invalid {Constants.CREDIT_CHARGED_OFF_AMOUNT}")
+
+        return self._generate_inspection_results(Constants.CREDIT_CHARGED_OFF_AMOUNT, charge_off_str, new_value_to_assign=extracted_amount)
     
     def inspect_bank_loan_approved(self, loan_approved_str: Union[str, None]) -> InspectionResultModel:
         """
@@ -503,12 +584,16 @@ class DataCleaningService:
 
         if self._is_value_null(loan_approved_str):
             return self._generate_inspection_results(
+                Constants.BANK_APPROVED_CREDIT_AMOUNT,
                 loan_approved_str,
                 f"missing value on {Constants.BANK_APPROVED_CREDIT_AMOUNT}"
             )
         
-        extracted_amount = Utils.extract_number_from_amount_string(loan_approved_str)
-        return self._generate_inspection_results(loan_approved_str, extracted_amount)
+        extracted_amount = Utils.parse_amount_to_cents(loan_approved_str)
+        if extracted_amount is None:
+            return self._generate_inspection_results(Constants.BANK_APPROVED_CREDIT_AMOUNT, loan_approved_str, f"invalid {Constants.BANK_APPROVED_CREDIT_AMOUNT}")
+
+        return self._generate_inspection_results(Constants.BANK_APPROVED_CREDIT_AMOUNT, loan_approved_str, new_value_to_assign=extracted_amount)
     
     def inspect_sba_loan_approved(self, loan_approved_str: Union[str, None]) -> InspectionResultModel:
         """
@@ -521,12 +606,16 @@ class DataCleaningService:
 
         if self._is_value_null(loan_approved_str):
             return self._generate_inspection_results(
+                Constants.SBA_APPROVED_CREDIT_AMOUNT,
                 loan_approved_str,
                 f"missing value on {Constants.SBA_APPROVED_CREDIT_AMOUNT}"
             )
         
-        extracted_amount = Utils.extract_number_from_amount_string(loan_approved_str)
-        return self._generate_inspection_results(loan_approved_str, extracted_amount)
+        extracted_amount = Utils.parse_amount_to_cents(loan_approved_str)
+        if extracted_amount is None:
+            return self._generate_inspection_results(Constants.SBA_APPROVED_CREDIT_AMOUNT, loan_approved_str, f"invalid {Constants.SBA_APPROVED_CREDIT_AMOUNT}")
+
+        return self._generate_inspection_results(Constants.SBA_APPROVED_CREDIT_AMOUNT, loan_approved_str, new_value_to_assign=extracted_amount)
     
     def inspect_loan_status(self, loan_status: Union[str, None]) -> InspectionResultModel:
         """
@@ -541,10 +630,467 @@ class DataCleaningService:
         """
 
         if self._is_value_null(loan_status):
-            return self._generate_inspection_results(loan_status, f"missing value on {Constants.LOAN_STATUS}")
+            return self._generate_inspection_results(Constants.LOAN_STATUS, loan_status, f"missing value on {Constants.LOAN_STATUS}")
         
         formatted_loan_status = loan_status
         if formatted_loan_status.lower() == "p i f":
-            formatted_loan_status = "PIF"
+            formatted_loan_status = Constants.PAID_IN_FULL_STATUS
+
+        return self._generate_inspection_results(Constants.LOAN_STATUS, loan_status, new_value_to_assign=formatted_loan_status)
+
+    def _row_rules(self) -> List[Tuple[str, Callable]]:
+        """
+        Returns:
+            list: (column, inspect_* method) in the column order of the raw dataset,
+                except the fiscal year which depends on the cleaned approval date
+        """
+        return [
+            (Constants.LOAN_ID, self.inspect_loan_id),
+            (Constants.DEBTOR_NAME, self.inspect_debtor_name),
+            (Constants.DEBTOR_ORIGIN_CITY, self.inspect_city),
+            (Constants.DEBTOR_ORIGIN_STATE, self.inspect_debtor_state),
+            (Constants.DEBTOR_ORIGIN_ZIP_CODE, self.inspect_zip),
+            (Constants.GUARANTOR_BANK_NAME, self.inspect_bank_name),
+            (Constants.GUARANTOR_BANK_STATE, self.inspect_bank_state),
+            (Constants.NAICS_CODE, self.inspect_naics),
+            (Constants.LOAN_APPROVAL_DATE, self.inspect_approval_date),
+            (Constants.TERM_DURATION, self.inspect_term_period),
+            (Constants.DEBTOR_EMPLOYEE_NUMBER, self.inspect_no_emp),
+            (Constants.DEBTOR_NEW_OR_EXIST, self.inspect_new_exist_bussiness),
+            (Constants.NUMBER_NEW_JOB_CREATED, self.inspect_number_new_job_created),
+            (Constants.NUMBER_JOB_RETAINED, self.inspect_number_job_reatined),
+            (Constants.DEBTOR_FRANCHISE_CODE, self.inspect_franchise_code),
+            (Constants.DEBTOR_URBAN_RURAL_INFO, self.inspect_urban_rural_code),
+            (Constants.REV_LINE_CREDIT, self.inspect_rev_line_credit),
+            (Constants.LOW_DOC_PROGRAM, self.inspect_low_doc),
+            (Constants.CHARGED_OFF_DATE, self.inspect_charge_off_date),
+            (Constants.DISBURSEMENT_DATE, self.inspect_disbursement_date),
+            (Constants.DISBURESEMENT_GROSS, self.inspect_disbursement_gross),
+            (Constants.OUTSTANDING_BALANCE, self.inspect_balance_gross),
+            (Constants.LOAN_STATUS, self.inspect_loan_status),
+            (Constants.CREDIT_CHARGED_OFF_AMOUNT, self.inspect_charged_off_amount),
+            (Constants.BANK_APPROVED_CREDIT_AMOUNT, self.inspect_bank_loan_approved),
+            (Constants.SBA_APPROVED_CREDIT_AMOUNT, self.inspect_sba_loan_approved),
+        ]
+
+    def _row_cleaned_date(self, value: Union[str, None]) -> Union[date, None]:
+        """
+        Params:
+            value (str or None): cleaned date string in Constants.CLEAN_DATE_FORMAT, or "invalid"
+
+        Returns:
+            date or None: parsed date, None if the value isn't a valid cleaned date
+        """
+        try:
+            return datetime.strptime(value, Constants.CLEAN_DATE_FORMAT).date()
+        except (TypeError, ValueError):
+            return None
+
+    def _row_cleaned_integer(self, value: Union[str, int, None]) -> Union[int, None]:
+        """
+        Params:
+            value (str | int | None): integer value, amounts already converted into cents
+
+        Returns:
+            int or None: integer value, None if the value isn't an integer
+        """
+        if isinstance(value, bool):
+            return None
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            return None
+
+    def _row_cross_field_reasons(self, cleaned_row: dict) -> List[str]:
+        """
+        Scalar counterpart of _frame_cross_field_rules, checks are skipped when a value is missing or invalid
+
+        Params:
+            cleaned_row (dict): row with the values cleaned by the inspect_* methods
+
+        Returns:
+            list of str: verify reasons of the violated cross-field rules
+        """
+        reasons = []
+
+        zip_code = cleaned_row.get(Constants.DEBTOR_ORIGIN_ZIP_CODE)
+        state = cleaned_row.get(Constants.DEBTOR_ORIGIN_STATE)
+        approval_date = self._row_cleaned_date(cleaned_row.get(Constants.LOAN_APPROVAL_DATE))
+        approval_fy = self._row_cleaned_integer(cleaned_row.get(Constants.LOAN_APPROVAL_FY))
+        disbursement_date = self._row_cleaned_date(cleaned_row.get(Constants.DISBURSEMENT_DATE))
+        is_charged_off = cleaned_row.get(Constants.LOAN_STATUS) == Constants.CHARGED_OFF_STATUS
+        charged_off_amount = self._row_cleaned_integer(cleaned_row.get(Constants.CREDIT_CHARGED_OFF_AMOUNT))
+        bank_approved_amount = self._row_cleaned_integer(cleaned_row.get(Constants.BANK_APPROVED_CREDIT_AMOUNT))
+        sba_approved_amount = self._row_cleaned_integer(cleaned_row.get(Constants.SBA_APPROVED_CREDIT_AMOUNT))
+
+        if approval_date is not None and approval_fy is not None:
+            if approval_fy != approval_date.year + int(approval_date.month >= 10):
+                reasons.append(f"{Constants.LOAN_APPROVAL_FY} doesn't match {Constants.LOAN_APPROVAL_DATE}")
+        if approval_date is not None and disbursement_date is not None and disbursement_date < approval_date:
+            reasons.append(f"{Constants.DISBURSEMENT_DATE} before {Constants.LOAN_APPROVAL_DATE}")
+        if cleaned_row.get(Constants.LOAN_STATUS) is not None and not is_charged_off:
+            if self._row_cleaned_date(cleaned_row.get(Constants.CHARGED_OFF_DATE)) is not None:
+                reasons.append(f"{Constants.CHARGED_OFF_DATE} without {Constants.CHARGED_OFF_STATUS} {Constants.LOAN_STATUS}")
+            if charged_off_amount is not None and charged_off_amount > 0:
+                reasons.append(
+                    f"{Constants.CREDIT_CHARGED_OFF_AMOUNT} without {Constants.CHARGED_OFF_STATUS} {Constants.LOAN_STATUS}"
+                )
+        if bank_approved_amount is not None and sba_approved_amount is not None and sba_approved_amount > bank_approved_amount:
+            reasons.append(f"{Constants.SBA_APPROVED_CREDIT_AMOUNT} exceeds {Constants.BANK_APPROVED_CREDIT_AMOUNT}")
+        if zip_code not in (None, "invalid") and state in self.reference_tables.state_code_set:
+            if not self.reference_tables.is_zip_prefix_state(zip_code, state):
+                reasons.append(f"{Constants.DEBTOR_ORIGIN_ZIP_CODE} doesn't match {Constants.DEBTOR_ORIGIN_STATE}")
+
+        return reasons
+
+    def inspect_row(self, row: dict) -> dict:
+        """
+        Run every inspect_* method over one row, the scalar counterpart of inspect_frame
+
+        Params:
+            row (dict): loan row keyed by Constants column names, missing columns are skipped
+
+        Returns:
+            dict: row with cleaned values, needs_to_verify and verify_reasons bitmask
+        """
+        cleaned_row = dict(row)
+        verify_reasons = 0
+
+        results = [(column, inspect(row[column])) for column, inspect in self._row_rules() if column in row]
+
+        if Constants.LOAN_APPROVAL_FY in row and Constants.LOAN_APPROVAL_DATE in row:
+            approval_date_result = next(result for column, result in results if column == Constants.LOAN_APPROVAL_DATE)
+            results.append((
+                Constants.LOAN_APPROVAL_FY,
+                self.inspect_approval_fiscal_year(approval_date_result.value_to_assign, row[Constants.LOAN_APPROVAL_FY])
+            ))
+
+        for column, result in results:
+            if result.value_to_assign is not None:
+                cleaned_row[column] = result.value_to_assign
+            if result.needs_to_verify:
+                verify_reasons |= VerifyReasonRegistry.code(result.verify_reason)
+
+        verify_reasons |= VerifyReasonRegistry.encode(self._row_cross_field_reasons(cleaned_row))
+
+        cleaned_row[Constants.DATA_VERIFICATION_REASONS] = verify_reasons
+        cleaned_row[Constants.IS_DATA_VERIFICATION_NEEDED] = verify_reasons > 0
+
+        return cleaned_row
+
+    def _frame_missing_value_check(self, column: str) -> Tuple[pl.Expr, str]:
+        """
+        Params:
+            column (str): column name to inspect
+
+        Returns:
+            tuple: (condition expression, verify reason) of the missing value check
+        """
+        return pl.col(column).is_null(), f"missing value on {column}"
+
+    def _frame_raw_date(self, column: str) -> pl.Expr:
+        """
+        Params:
+            column (str): column holding date strings in Constants.RAW_DATE_FORMAT
+
+        Returns:
+            pl.Expr: date strings in Constants.CLEAN_DATE_FORMAT, null if the date can't be parsed
+        """
+        return pl.col(column).map_batches(self.date_normalizer.format_raw_date_series, return_dtype=pl.String)
+
+    def _frame_date_rule(self, column: str) -> Tuple[str, pl.Expr, List[Tuple[pl.Expr, str]]]:
+        """
+        Frame counterpart of inspect_approval_date, inspect_charge_off_date and inspect_disbursement_date
+
+        Params:
+            column (str): date column name
+
+        Returns:
+            tuple: (column, cleaned value expression, list of (condition, verify reason))
+        """
+        formatted_date = self._frame_raw_date(column)
+        is_invalid = pl.col(column).is_not_null() & formatted_date.is_null()
+
+        return (
+            column,
+            pl.when(is_invalid).then(pl.lit("invalid")).otherwise(formatted_date),
+            [self._frame_missing_value_check(column), (is_invalid, f"invalid {column}")]
+        )
+
+    def _frame_min_length_rule(self, column: str, min_length: int) -> Tuple[str, pl.Expr, List[Tuple[pl.Expr, str]]]:
+        """
+        Frame counterpart of inspect_zip, inspect_city and inspect_naics
+
+        Params:
+            column (str): column name
+            min_length (int): minimum valid length of the value
+
+        Returns:
+            tuple: (column, cleaned value expression, list of (condition, verify reason))
+        """
+        value = pl.col(column).cast(pl.String)
+        is_invalid = value.str.len_chars().lt(min_length)
+
+        return (
+            column,
+            pl.when(is_invalid).then(pl.lit("invalid")).otherwise(value),
+            [self._frame_missing_value_check(column), (is_invalid, f"invalid {column}")]
+        )
+
+    def _frame_state_rule(self, column: str) -> Tuple[str, None, List[Tuple[pl.Expr, str]]]:
+        """
+        Frame counterpart of inspect_debtor_state and inspect_bank_state
+
+        Params:
+            column (str): state column name
+
+        Returns:
+            tuple: (column, None, list of (condition, verify reason))
+        """
+        return (
+            column,
+            None,
+            [
+                self._frame_missing_value_check(column),
+                (self.reference_tables.is_known_state(pl.col(column)).not_(), f"unknown {column}")
+            ]
+        )
+
+    def _frame_naics_rule(self) -> Tuple[str, pl.Expr, List[Tuple[pl.Expr, str]]]:
+        """
+        Frame counterpart of inspect_naics
+
+        Returns:
+            tuple: (column, cleaned value expression, list of (condition, verify reason))
+        """
+        column, value, checks = self._frame_min_length_rule(Constants.NAICS_CODE, 6)
+        naics = pl.col(Constants.NAICS_CODE).cast(pl.String)
+        is_unknown = naics.str.len_chars().ge(6) & self.reference_tables.is_known_naics(naics).not_()
 
-        return self._generate_inspection_results(loan_status, formatted_loan_status)
\ No newline at end of file
+        return column, value, [*checks, (is_unknown, f"unknown {Constants.NAICS_CODE}")]
+
+    def _frame_code_rule(self, column: str, valid_codes: List[str]) -> Tuple[str, pl.Expr, List[Tuple[pl.Expr, str]]]:
+        """
+        Frame counterpart of inspect_rev_line_credit and inspect_low_doc
+
+        Params:
+            column (str): column name
+            valid_codes (list of str): valid upper case codes
+
+        Returns:
+            tuple: (column, cleaned value expression, list of (condition, verify reason))
+        """
+        code = pl.col(column).cast(pl.String)
+        is_invalid = code.is_not_null() & code.str.to_uppercase().is_in(valid_codes).not_()
+
+        return (
+            column,
+            pl.when(code.is_null() | is_invalid).then(pl.lit("invalid")).otherwise(code),
+            [self._frame_missing_value_check(column), (is_invalid, f"invalid {column}")]
+        )
+
+    def _frame_amount_rule(self, column: str) -> Tuple[str, pl.Expr, List[Tuple[pl.Expr, str]]]:
+        """
+        Frame counterpart of the amount inspections, ex: inspect_disbursement_gross
+
+        Params:
+            column (str): amount column name
+
+        Returns:
+            tuple: (column, Int64 cents expression, list of (condition, verify reason))
+        """
+        cents = Utils.amount_to_cents_expr(column)
+
+        return (
+            column,
+            cents,
+            [self._frame_missing_value_check(column), (pl.col(column).is_not_null() & cents.is_null(), f"invalid {column}")]
+        )
+
+    def _frame_rules(self, schema: pl.Schema) -> List[Tuple[str, Union[pl.Expr, None], List[Tuple[pl.Expr, str]]]]:
+        """
+        Columnar version of every inspect_* method, in the column order of the raw dataset
+
+        Params:
+            schema (pl.Schema): schema of the frame to inspect
+
+        Returns:
+            list: (column, cleaned value expression or None, list of (condition, verify reason))
+        """
+        derived_fiscal_year = self._frame_raw_date(Constants.LOAN_APPROVAL_DATE).map_batches(
+            self.date_normalizer.fiscal_year_series,
+            return_dtype=pl.Int64
+        )
+        term = pl.col(Constants.TERM_DURATION).cast(pl.Int64, strict=False)
+        franchise_code = pl.col(Constants.DEBTOR_FRANCHISE_CODE).cast(pl.Int64, strict=False)
+        urban_rural_code = pl.col(Constants.DEBTOR_URBAN_RURAL_INFO).cast(pl.Int64, strict=False)
+        loan_status = pl.col(Constants.LOAN_STATUS).cast(pl.String)
+
+        rules = [
+            (Constants.LOAN_ID, None, [self._frame_missing_value_check(Constants.LOAN_ID)]),
+            (Constants.DEBTOR_NAME, None, [self._frame_missing_value_check(Constants.DEBTOR_NAME)]),
+            self._frame_min_length_rule(Constants.DEBTOR_ORIGIN_CITY, 3),
+            self._frame_state_rule(Constants.DEBTOR_ORIGIN_STATE),
+            self._frame_min_length_rule(Constants.DEBTOR_ORIGIN_ZIP_CODE, 4),
+            (Constants.GUARANTOR_BANK_NAME, None, [self._frame_missing_value_check(Constants.GUARANTOR_BANK_NAME)]),
+            self._frame_state_rule(Constants.GUARANTOR_BANK_STATE),
+            self._frame_naics_rule(),
+            self._frame_date_rule(Constants.LOAN_APPROVAL_DATE),
+            (
+                Constants.LOAN_APPROVAL_FY,
+                pl.coalesce(
+                    pl.col(Constants.LOAN_APPROVAL_FY),
+                    derived_fiscal_year.cast(schema.get(Constants.LOAN_APPROVAL_FY, pl.Int64))
+                ),
+                [self._frame_missing_value_check(Constants.LOAN_APPROVAL_FY)]
+            ),
+            (
+                Constants.TERM_DURATION,
+                None,
+                [
+                    self._frame_missing_value_check(Constants.TERM_DURATION),
+                    (term.eq(0), f"has 0 {Constants.TERM_DURATION}")
+                ]
+            ),
+            (Constants.DEBTOR_EMPLOYEE_NUMBER, None, [self._frame_missing_value_check(Constants.DEBTOR_EMPLOYEE_NUMBER)]),
+            (Constants.DEBTOR_NEW_OR_EXIST, None, [self._frame_missing_value_check(Constants.DEBTOR_NEW_OR_EXIST)]),
+            (Constants.NUMBER_NEW_JOB_CREATED, None, [self._frame_missing_value_check(Constants.NUMBER_NEW_JOB_CREATED)]),
+            (Constants.NUMBER_JOB_RETAINED, None, [self._frame_missing_value_check(Constants.NUMBER_JOB_RETAINED)]),
+            (
+                Constants.DEBTOR_FRANCHISE_CODE,
+                None,
+                [
+                    self._frame_missing_value_check(Constants.DEBTOR_FRANCHISE_CODE),
+                    (franchise_code.is_in([0, 1]), f"doesn't have {Constants.DEBTOR_FRANCHISE_CODE}")
+                ]
+            ),
+            (
+                Constants.DEBTOR_URBAN_RURAL_INFO,
+                None,
+                [
+                    self._frame_missing_value_check(Constants.DEBTOR_URBAN_RURAL_INFO),
+                    (urban_rural_code.eq(0), f"undefined {Constants.DEBTOR_URBAN_RURAL_INFO}")
+                ]
+            ),
+            self._frame_code_rule(Constants.REV_LINE_CREDIT, Constants.VALID_REVOLVING_CREDIT_CODES),
+            self._frame_code_rule(Constants.LOW_DOC_PROGRAM, Constants.VALID_LOW_DOC_CODES),
+            self._frame_date_rule(Constants.CHARGED_OFF_DATE),
+            self._frame_date_rule(Constants.DISBURSEMENT_DATE),
+            self._frame_amount_rule(Constants.DISBURESEMENT_GROSS),
+            self._frame_amount_rule(Constants.OUTSTANDING_BALANCE),
+            (
+                Constants.LOAN_STATUS,
+                pl.when(loan_status.str.to_lowercase().eq("p i f"))
+                    .then(pl.lit(Constants.PAID_IN_FULL_STATUS))
+                    .otherwise(loan_status),
+                [self._frame_missing_value_check(Constants.LOAN_STATUS)]
+            ),
+            self._frame_amount_rule(Constants.CREDIT_CHARGED_OFF_AMOUNT),
+            self._frame_amount_rule(Constants.BANK_APPROVED_CREDIT_AMOUNT),
+            self._frame_amount_rule(Constants.SBA_APPROVED_CREDIT_AMOUNT),
+        ]
+
+        # fiscal year is derived from the approval date, so it needs both columns
+        required_columns = {Constants.LOAN_APPROVAL_FY: [Constants.LOAN_APPROVAL_DATE]}
+
+        return [
+            rule for rule in rules
+            if rule[0] in schema and all(column in schema for column in required_columns.get(rule[0], []))
+        ]
+
+    def _frame_cross_field_rules(self, schema: pl.Schema) -> List[Tuple[pl.Expr, str]]:
+        """
+        Rules spanning several columns, evaluated over the cleaned columns. A rule doesn't flag rows
+        where one of its values is missing or invalid, those are already flagged by the single column rules
+
+        Params:
+            schema (pl.Schema): schema of the frame to inspect
+
+        Returns:
+            list: (condition, verify reason) of the rules whose columns are all in the frame
+        """
+        approval_date = pl.col(Constants.LOAN_APPROVAL_DATE).str.to_date(Constants.CLEAN_DATE_FORMAT, strict=False)
+        disbursement_date = pl.col(Constants.DISBURSEMENT_DATE).str.to_date(Constants.CLEAN_DATE_FORMAT, strict=False)
+        charge_off_date = pl.col(Constants.CHARGED_OFF_DATE).str.to_date(Constants.CLEAN_DATE_FORMAT, strict=False)
+        # fiscal year Y runs from October Y-1 through September Y
+        approval_date_fiscal_year = approval_date.dt.year().cast(pl.Int64) + approval_date.dt.month().ge(10).cast(pl.Int64)
+        loan_status = pl.col(Constants.LOAN_STATUS).cast(pl.String)
+        is_not_charged_off = loan_status.ne(Constants.CHARGED_OFF_STATUS)
+
+        rules = [
+            (
+                [Constants.LOAN_APPROVAL_FY, Constants.LOAN_APPROVAL_DATE],
+                pl.col(Constants.LOAN_APPROVAL_FY).cast(pl.Int64, strict=False).ne(approval_date_fiscal_year),
+                f"{Constants.LOAN_APPROVAL_FY} doesn't match {Constants.LOAN_APPROVAL_DATE}"
+            ),
+            (
+                [Constants.DISBURSEMENT_DATE, Constants.LOAN_APPROVAL_DATE],
+                disbursement_date.lt(approval_date),
+                f"{Constants.DISBURSEMENT_DATE} before {Constants.LOAN_APPROVAL_DATE}"
+            ),
+            (
+                [Constants.CHARGED_OFF_DATE, Constants.LOAN_STATUS],
+                charge_off_date.is_not_null() & is_not_charged_off,
+                f"{Constants.CHARGED_OFF_DATE} without {Constants.CHARGED_OFF_STATUS} {Constants.LOAN_STATUS}"
+            ),
+            (
+                [Constants.CREDIT_CHARGED_OFF_AMOUNT, Constants.LOAN_STATUS],
+                pl.col(Constants.CREDIT_CHARGED_OFF_AMOUNT).gt(0) & is_not_charged_off,
+                f"{Constants.CREDIT_CHARGED_OFF_AMOUNT} without {Constants.CHARGED_OFF_STATUS} {Constants.LOAN_STATUS}"
+            ),
+            (
+                [Constants.SBA_APPROVED_CREDIT_AMOUNT, Constants.BANK_APPROVED_CREDIT_AMOUNT],
+                pl.col(Constants.SBA_APPROVED_CREDIT_AMOUNT).gt(pl.col(Constants.BANK_APPROVED_CREDIT_AMOUNT)),
+                f"{Constants.SBA_APPROVED_CREDIT_AMOUNT} exceeds {Constants.BANK_APPROVED_CREDIT_AMOUNT}"
+            ),
+            (
+                [Constants.DEBTOR_ORIGIN_ZIP_CODE, Constants.DEBTOR_ORIGIN_STATE],
+                pl.col(Constants.DEBTOR_ORIGIN_ZIP_CODE).cast(pl.String).ne("invalid")
+                    & self.reference_tables.is_known_state(pl.col(Constants.DEBTOR_ORIGIN_STATE))
+                    & self.reference_tables.is_zip_in_state(
+                        pl.col(Constants.DEBTOR_ORIGIN_ZIP_CODE),
+                        pl.col(Constants.DEBTOR_ORIGIN_STATE)
+                    ).not_(),
+                f"{Constants.DEBTOR_ORIGIN_ZIP_CODE} doesn't match {Constants.DEBTOR_ORIGIN_STATE}"
+            ),
+        ]
+
+        return [
+            (condition, reason) for columns, condition, reason in rules
+            if all(column in schema for column in columns)
+        ]
+
+    def inspect_frame(self, df: pl.DataFrame) -> pl.DataFrame:
+        """
+        Run every inspect_* rule over the whole frame as columnar expressions in one pass
+
+        Params:
+            df (pl.DataFrame): loans frame with Constants column names, missing columns are skipped
+
+        Returns:
+            pl.DataFrame: frame with cleaned columns, needs_to_verify column and verify_reasons
+                bitmask column, see VerifyReasonRegistry to decode or filter it
+        """
+        rules = self._frame_rules(df.schema)
+
+        verify_reasons = VerifyReasonRegistry.mask_expr(check for _, _, checks in rules for check in checks)
+
+        # cross-field rules read the cleaned columns, their bits are added once those are computed
+        cross_field_reasons = VerifyReasonRegistry.mask_expr(
+            self._frame_cross_field_rules(df.schema),
+            base=pl.col(Constants.DATA_VERIFICATION_REASONS)
+        )
+
+        # lazy so the parsing shared by the cleaned values and the checks runs once
+        return (
+            df.lazy()
+                .with_columns(
+                    *[value.alias(column) for column, value, _ in rules if value is not None],
+                    verify_reasons.alias(Constants.DATA_VERIFICATION_REASONS)
+                )
+                .with_columns(cross_field_reasons.alias(Constants.DATA_VERIFICATION_REASONS))
+                .with_columns(
+                    pl.col(Constants.DATA_VERIFICATION_REASONS).gt(0).alias(Constants.IS_DATA_VERIFICATION_NEEDED)
+                )
+                .collect()
+        )
\ No newline at end of file
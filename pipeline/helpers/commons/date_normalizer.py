@@ -0,0 +1,135 @@
+from datetime import datetime
+from functools import lru_cache
+from typing import Union
+
+import polars as pl
+
+from pipeline.constants import Constants
+
+class DateNormalizer:
+    """
+    Bounded cache of date conversions
+
+    The dataset holds only a few thousand distinct date strings, so every distinct value
+    is converted once and the results are broadcast back over the rows
+    """
+
+    def __init__(self, maxsize: int = 16384):
+        """
+        Params:
+            maxsize (int, optional): maximum number of cached values per conversion
+        """
+
+        self.maxsize = maxsize
+        self.format_raw_date = lru_cache(maxsize=maxsize)(self._format_raw_date)
+        self.fiscal_year = lru_cache(maxsize=maxsize)(self._fiscal_year)
+
+    @staticmethod
+    def _format_raw_date(date_str: str) -> Union[str, None]:
+        """
+        Params:
+            date_str (str): date string in Constants.RAW_DATE_FORMAT
+
+        Returns:
+            str or None: date string in Constants.CLEAN_DATE_FORMAT, None if the date can't be parsed
+        """
+
+        try:
+            formatted_date = datetime.strptime(date_str, Constants.RAW_DATE_FORMAT)
+        except ValueError:
+            return None
+
+        # %y maps 00-68 to 2000-2068, but approvals go back to the 1960s
+        if formatted_date.year > Constants.RAW_DATE_CENTURY_PIVOT:
+            formatted_date = formatted_date.replace(year=formatted_date.year - 100)
+
+        return datetime.strftime(formatted_date, Constants.CLEAN_DATE_FORMAT)
+
+    @staticmethod
+    def _fiscal_year(clean_date_str: str) -> Union[int, None]:
+        """
+        Params:
+            clean_date_str (str): date string in Constants.CLEAN_DATE_FORMAT
+
+        Returns:
+            int or None: fiscal year of the date, None if the date can't be parsed
+        """
+
+        try:
+            date = datetime.strptime(clean_date_str, Constants.CLEAN_DATE_FORMAT)
+        except ValueError:
+            return None
+
+        # Fiscal year of Y1998 
+        # defined in Oct, 1997 through Sep, 1998
+        if date.month >= 10:
+            return date.year + 1
+        return date.year
+
+    def _broadcast(self, series: pl.Series, convert, return_dtype: pl.DataType) -> pl.Series:
+        """
+        Params:
+            series (pl.Series): values to convert
+            convert (callable): cached conversion of one value
+            return_dtype (pl.DataType): dtype of the converted series
+
+        Returns:
+            pl.Series: converted series, null where the conversion failed
+        """
+
+        series = series.cast(pl.String)
+        distinct_values = series.drop_nulls().unique()
+        converted_values = pl.Series([convert(value) for value in distinct_values], dtype=return_dtype)
+
+        return series.replace_strict(distinct_values, converted_values, default=None, return_dtype=return_dtype)
+
+    def format_raw_date_series(self, series: pl.Series) -> pl.Series:
+        """
+        Params:
+            series (pl.Series): date strings in Constants.RAW_DATE_FORMAT
+
+        Returns:
+            pl.Series: date strings in Constants.CLEAN_DATE_FORMAT, null if the date can't be parsed
+        """
+
+        return self._broadcast(series, self.format_raw_date, pl.String)
+
+    def fiscal_year_series(self, series: pl.Series) -> pl.Series:
+        """
+        Params:
+            series (pl.Series): date strings in Constants.CLEAN_DATE_FORMAT
+
+        Returns:
+            pl.Series: fiscal years, null if the date can't be parsed
+        """
+
+        return self._broadcast(series, self.fiscal_year, pl.Int64)
+
+    def stats(self) -> dict:
+        """
+        Returns:
+            dict: hits, misses, size and hit rate of each conversion cache
+        """
+
+        response_dict = {}
+
+        for name, cached_function in [("format_raw_date", self.format_raw_date), ("fiscal_year", self.fiscal_year)]:
+            cache_info = cached_function.cache_info()
+            lookups = cache_info.hits + cache_info.misses
+
+            response_dict[name] = {
+                "hits": cache_info.hits,
+                "misses": cache_info.misses,
+                "size": cache_info.currsize,
+                "maxsize": cache_info.maxsize,
+                "hit_rate": cache_info.hits / lookups if lookups else 0.0
+            }
+        return response_dict
+
+    def clear(self):
+        """
+        Clear both conversion caches and their statistics
+        """
+
+        self.format_raw_date.cache_clear()
+        self.fiscal_year.cache_clear()
@@ -0,0 +1,310 @@
+import functools
+import json
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Callable, Iterator, List, Tuple, Union
+
+import polars as pl
+
+from pipeline.constants import Constants
+from pipeline.models.verify_reason import VerifyReasonRegistry
+
+_NULL_CONTEXT = nullcontext()
+
+class Instrumentation:
+    """
+    Opt-in profiling of the pipeline: call counts, cumulative time, rows/sec and flag rates
+    per inspect_* rule, per verify reason and per stage (parse, clean, load, fetch)
+
+    enable() wraps the instrumented methods in place and disable() puts the originals back,
+    so a disabled pipeline runs the unwrapped code. Metrics are process local:
+    workers spawned by ParallelCleaningService aren't instrumented
+
+    Usage:
+        instrumentation = Instrumentation()
+        instrumentation.enable()
+        CsvStreamingService().clean_csv(raw_csv_path, cleaned_csv_path)
+        instrumentation.disable()
+        print(instrumentation.to_prometheus())
+    """
+
+    _instance = None
+    _initialized = False
+
+    PROMETHEUS_PREFIX = "sba_pipeline"
+
+    def __new__(cls, *args, **kwargs):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        if not self._initialized:
+            self.enabled = False
+            self._lock = threading.Lock()
+            # (kind, name) -> [calls, seconds, rows, flagged]
+            self._metrics = {}
+            self._originals = []
+            self._initialized = True
+
+    def record(self, kind: str, name: str, seconds: float = 0.0, rows: int = 0, flagged: int = 0, calls: int = 1):
+        """
+        Params:
+            kind (str): metric family, ex: "rule", "reason" or "stage"
+            name (str): metric name within the family
+            seconds (float, optional): time spent
+            rows (int, optional): processed rows
+            flagged (int, optional): rows flagged for verification
+            calls (int, optional): number of calls
+        """
+
+        with self._lock:
+            metric = self._metrics.setdefault((kind, name), [0, 0.0, 0, 0])
+            metric[0] += calls
+            metric[1] += seconds
+            metric[2] += rows
+            metric[3] += flagged
+
+    def stage(self, name: str, rows: int = 0):
+        """
+        Time a block of code as a stage, a no-op when disabled
+
+        Params:
+            name (str): stage name
+            rows (int, optional): rows processed by the block
+
+        Returns:
+            context manager
+        """
+
+        if not self.enabled:
+            return _NULL_CONTEXT
+        return self._timed_stage(name, rows)
+
+    @contextmanager
+    def _timed_stage(self, name: str, rows: int) -> Iterator[None]:
+        started_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record("stage", name, time.perf_counter() - started_at, rows)
+
+    def _record_reasons(self, cleaned_df: pl.DataFrame):
+        """
+        Params:
+            cleaned_df (pl.DataFrame): output of DataCleaningService.inspect_frame
+        """
+
+        mask = pl.col(Constants.DATA_VERIFICATION_REASONS)
+        counts = cleaned_df.select(
+            *[
+                (mask & VerifyReasonRegistry.code(reason)).gt(0).sum().alias(reason)
+                for reason in VerifyReasonRegistry.REASONS
+            ]
+        ).row(0, named=True)
+
+        for reason, flagged in counts.items():
+            self.record("reason", reason, rows=cleaned_df.height, flagged=flagged, calls=0)
+
+    def _wrap(
+        self,
+        function: Callable,
+        kind: str,
+        name: str,
+        measure: Callable[[tuple, object], Tuple[int, int]]
+    ) -> Callable:
+        """
+        Params:
+            function (callable): function to instrument
+            kind (str): metric family
+            name (str): metric name
+            measure (callable): (call args, result) -> (rows, flagged)
+
+        Returns:
+            callable: function recording its calls
+        """
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            started_at = time.perf_counter()
+            result = function(*args, **kwargs)
+            seconds = time.perf_counter() - started_at
+
+            rows, flagged = measure(args, result)
+            self.record(kind, name, seconds, rows, flagged)
+            return result
+
+        return wrapper
+
+    def _wrap_generator(self, function: Callable, kind: str, name: str) -> Callable:
+        """
+        Params:
+            function (callable): generator function to instrument, time is spent while iterating
+
+        Returns:
+            callable: generator function recording the time spent producing its items
+        """
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            iterator = iter(function(*args, **kwargs))
+            seconds = 0.0
+            rows = 0
+
+            try:
+                while True:
+                    started_at = time.perf_counter()
+                    try:
+                        item = next(iterator)
+                    except StopIteration:
+                        seconds += time.perf_counter() - started_at
+                        return
+                    seconds += time.perf_counter() - started_at
+                    rows += 1
+                    yield item
+            finally:
+                self.record(kind, name, seconds, rows)
+
+        return wrapper
+
+    def _targets(self) -> List[Tuple[type, str, Callable]]:
+        """
+        Returns:
+            list: (owner class, attribute name, wrapper factory) of every instrumented method
+        """
+
+        # imported here so importing this module doesn't import the whole pipeline
+        from pipeline.helpers.cleaning import DataCleaningService
+        from pipeline.helpers.db.bulk_loader import BulkLoader
+        from pipeline.helpers.db.db_service import DbService
+        from pipeline.helpers.streaming import CsvStreamingService
+
+        def frame_measure(args: tuple, result: pl.DataFrame) -> Tuple[int, int]:
+            self._record_reasons(result)
+            return result.height, int(result.get_column(Constants.IS_DATA_VERIFICATION_NEEDED).sum())
+
+        targets = [
+            (CsvStreamingService, "_parse_block", lambda f: self._wrap(f, "stage", "parse", lambda args, result: (result.height, 0))),
+            (DataCleaningService, "inspect_frame", lambda f: self._wrap(f, "stage", "clean", frame_measure)),
+            (
+                DataCleaningService,
+                "inspect_row",
+                lambda f: self._wrap(f, "stage", "clean_row", lambda args, result: (1, int(result[Constants.IS_DATA_VERIFICATION_NEEDED])))
+            ),
+            (BulkLoader, "_copy_batch", lambda f: self._wrap(f, "stage", "load", lambda args, result: (args[3].height, 0))),
+            # the query part of fetch_data, before serialization: QueryCache hits aren't fetches, see QueryCache.stats
+            (DbService, "_fetch_rows", lambda f: self._wrap(f, "stage", "fetch_data", lambda args, result: (len(result), 0))),
+            (DbService, "fetch_frame", lambda f: self._wrap(f, "stage", "fetch_frame", lambda args, result: (result.height, 0))),
+            (DbService, "stream_data", lambda f: self._wrap_generator(f, "stage", "stream_data")),
+        ]
+
+        for attribute in vars(DataCleaningService):
+            if attribute.startswith("inspect_") and attribute not in ("inspect_frame", "inspect_row"):
+                targets.append((
+                    DataCleaningService,
+                    attribute,
+                    lambda f, attribute=attribute: self._wrap(
+                        f, "rule", attribute, lambda args, result: (1, int(bool(result.needs_to_verify)))
+                    )
+                ))
+
+        return targets
+
+    def enable(self):
+        """
+        Wrap the instrumented methods, metrics keep accumulating until reset
+        """
+
+        if self.enabled:
+            return
+
+        for owner, attribute, wrap in self._targets():
+            original = owner.__dict__[attribute]
+            if isinstance(original, staticmethod):
+                setattr(owner, attribute, staticmethod(wrap(original.__func__)))
+            else:
+                setattr(owner, attribute, wrap(original))
+            self._originals.append((owner, attribute, original))
+
+        self.enabled = True
+
+    def disable(self):
+        """
+        Put the original methods back, recorded metrics are kept
+        """
+
+        for owner, attribute, original in reversed(self._originals):
+            setattr(owner, attribute, original)
+
+        self._originals = []
+        self.enabled = False
+
+    def reset(self):
+        """
+        Drop every recorded metric
+        """
+
+        with self._lock:
+            self._metrics = {}
+
+    def snapshot(self) -> dict:
+        """
+        Returns:
+            dict: kind -> name -> calls, seconds, rows, flagged, rows_per_second and flag_rate
+        """
+
+        with self._lock:
+            metrics = {key: list(metric) for key, metric in self._metrics.items()}
+
+        response_dict = {}
+        for (kind, name), (calls, seconds, rows, flagged) in sorted(metrics.items()):
+            response_dict.setdefault(kind, {})[name] = {
+                "calls": calls,
+                "seconds": seconds,
+                "rows": rows,
+                "flagged": flagged,
+                "rows_per_second": rows / seconds if seconds > 0 else 0.0,
+                "flag_rate": flagged / rows if rows else 0.0
+            }
+        return response_dict
+
+    def to_json(self, indent: Union[int, None] = 2) -> str:
+        """
+        Params:
+            indent (int or None, optional): JSON indentation
+
+        Returns:
+            str: snapshot as JSON
+        """
+
+        return json.dumps(self.snapshot(), indent=indent)
+
+    def to_prometheus(self) -> str:
+        """
+        Returns:
+            str: snapshot in the Prometheus text exposition format
+        """
+
+        families = [
+            ("calls_total", "counter", "Number of instrumented calls", "calls"),
+            ("seconds_total", "counter", "Cumulative time spent, in seconds", "seconds"),
+            ("rows_total", "counter", "Number of processed rows", "rows"),
+            ("flagged_total", "counter", "Number of rows flagged for verification", "flagged"),
+            ("rows_per_second", "gauge", "Throughput over the recorded time", "rows_per_second"),
+            ("flag_rate", "gauge", "Share of processed rows flagged for verification", "flag_rate"),
+        ]
+        snapshot = self.snapshot()
+        lines = []
+
+        for suffix, metric_type, description, field in families:
+            metric_name = f"{self.PROMETHEUS_PREFIX}_{suffix}"
+            lines.append(f"# HELP {metric_name} {description}")
+            lines.append(f"# TYPE {metric_name} {metric_type}")
+
+            for kind, metrics in snapshot.items():
+                for name, metric in metrics.items():
+                    label = name.replace("\\", "\\\\").replace("\"", "\\\"")
+                    lines.append(f"{metric_name}{{kind=\"{kind}\",name=\"{label}\"}} {metric[field]}")
+
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,200 @@
+import os
+from typing import FrozenSet, Iterable, Union
+
+import polars as pl
+
+REFERENCE_DATA_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    "reference_data"
+)
+
+class ReferenceTables:
+    """
+    Offline reference tables bundled in pipeline/reference_data
+
+    - states.csv: USPS codes of the states, DC, territories and armed forces
+    - zip_prefixes.csv: (3 digit zip prefix, state) pairs of every USPS zip code, a prefix
+      can belong to a few states, ex: 063 is used by CT and NY
+    - naics_codes.csv: 6 digit codes of the 2007, 2012, 2017 and 2022 NAICS editions,
+      the loans span several editions so a code is known when any accepted edition has it
+
+    Each table is kept both as a Series, for the columnar checks (imploded into a single list value for
+    is_in, which hashes it once per chunk), and as a frozenset, for the row by row checks. Tables are read
+    on first use, so building the instance costs nothing
+
+    Usage:
+        reference_tables = ReferenceTables(naics_editions=[2017, 2022])
+        df.filter(reference_tables.is_known_naics(pl.col("naics")).not_())
+    """
+
+    NAICS_EDITIONS = (2007, 2012, 2017, 2022)
+
+    def __init__(self, naics_editions: Union[Iterable[int], None] = None):
+        """
+        Params:
+            naics_editions (iterable of int or None, optional): NAICS editions a code may come from,
+                defaults to every bundled edition
+        """
+
+        self.naics_editions = tuple(naics_editions or self.NAICS_EDITIONS)
+        self._state_codes = None
+        self._zip_prefix_states = None
+        self._naics_codes = None
+        self._state_code_set = None
+        self._zip_prefix_state_set = None
+        self._naics_code_set = None
+
+    @staticmethod
+    def _read(file_name: str) -> pl.DataFrame:
+        """
+        Params:
+            file_name (str): CSV file in the reference data directory
+
+        Returns:
+            pl.DataFrame: table with string columns, so codes keep their leading zeros
+        """
+
+        return pl.read_csv(os.path.join(REFERENCE_DATA_DIR, file_name), infer_schema=False)
+
+    @property
+    def state_codes(self) -> pl.Series:
+        """
+        Returns:
+            pl.Series: valid state codes
+        """
+
+        if self._state_codes is None:
+            self._state_codes = self._read("states.csv").get_column("code")
+        return self._state_codes
+
+    @property
+    def zip_prefix_states(self) -> pl.Series:
+        """
+        Returns:
+            pl.Series: valid "<zip prefix><state>" keys, ex: "100NY"
+        """
+
+        if self._zip_prefix_states is None:
+            self._zip_prefix_states = self._read("zip_prefixes.csv").select(
+                pl.concat_str("prefix", "state").alias("zip_prefix_state")
+            ).get_column("zip_prefix_state")
+        return self._zip_prefix_states
+
+    @property
+    def naics_codes(self) -> pl.Series:
+        """
+        Returns:
+            pl.Series: distinct 6 digit NAICS codes of the accepted editions
+        """
+
+        if self._naics_codes is None:
+            self._naics_codes = (
+                self._read("naics_codes.csv")
+                    .filter(pl.col("edition").cast(pl.Int64).is_in(self.naics_editions))
+                    .get_column("code")
+                    .unique(maintain_order=True)
+            )
+        return self._naics_codes
+
+    @property
+    def state_code_set(self) -> FrozenSet[str]:
+        """
+        Returns:
+            frozenset of str: state_codes, for row by row lookups
+        """
+
+        if self._state_code_set is None:
+            self._state_code_set = frozenset(self.state_codes.to_list())
+        return self._state_code_set
+
+    @property
+    def zip_prefix_state_set(self) -> FrozenSet[str]:
+        """
+        Returns:
+            frozenset of str: zip_prefix_states, for row by row lookups
+        """
+
+        if self._zip_prefix_state_set is None:
+            self._zip_prefix_state_set = frozenset(self.zip_prefix_states.to_list())
+        return self._zip_prefix_state_set
+
+    @property
+    def naics_code_set(self) -> FrozenSet[str]:
+        """
+        Returns:
+            frozenset of str: naics_codes, for row by row lookups
+        """
+
+        if self._naics_code_set is None:
+            self._naics_code_set = frozenset(self.naics_codes.to_list())
+        return self._naics_code_set
+
+    @staticmethod
+    def zip_prefix_expr(zip_code: pl.Expr) -> pl.Expr:
+        """
+        Params:
+            zip_code (pl.Expr): zip codes, possibly stored as integers without their leading zeros
+
+        Returns:
+            pl.Expr: 3 digit zip prefixes
+        """
+
+        return zip_code.cast(pl.String).str.strip_chars().str.zfill(5).str.slice(0, 3)
+
+    @staticmethod
+    def zip_prefix(zip_code: Union[str, int]) -> str:
+        """
+        Params:
+            zip_code (str or int): zip code, possibly stored as an integer without its leading zeros
+
+        Returns:
+            str: 3 digit zip prefix
+        """
+
+        return str(zip_code).strip().zfill(5)[:3]
+
+    def is_known_state(self, state: pl.Expr) -> pl.Expr:
+        """
+        Params:
+            state (pl.Expr): state codes
+
+        Returns:
+            pl.Expr: True for known codes, null for null codes
+        """
+
+        return state.cast(pl.String).is_in(self.state_codes.implode())
+
+    def is_zip_in_state(self, zip_code: pl.Expr, state: pl.Expr) -> pl.Expr:
+        """
+        Params:
+            zip_code (pl.Expr): zip codes
+            state (pl.Expr): state codes
+
+        Returns:
+            pl.Expr: True when the zip prefix is used by the state, null when either value is null
+        """
+
+        return pl.concat_str(self.zip_prefix_expr(zip_code), state.cast(pl.String)).is_in(self.zip_prefix_states.implode())
+
+    def is_known_naics(self, naics: pl.Expr) -> pl.Expr:
+        """
+        Params:
+            naics (pl.Expr): NAICS codes
+
+        Returns:
+            pl.Expr: True for codes of an accepted edition, null for null codes
+        """
+
+        return naics.cast(pl.String).is_in(self.naics_codes.implode())
+
+    def is_zip_prefix_state(self, zip_code: Union[str, int], state: str) -> bool:
+        """
+        Params:
+            zip_code (str or int): zip code
+            state (str): state code
+
+        Returns:
+            bool: True when the zip prefix is used by the state
+        """
+
+        return f"{self.zip_prefix(zip_code)}{state}" in self.zip_prefix_state_set
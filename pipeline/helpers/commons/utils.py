@@ -1,6 +1,12 @@
-from pipeline.models.inspection_result import ExtractedInspectionResult, InspectionResultModel
+import re
+from typing import Union
+
+import polars as pl
 
 class Utils:
+    # digits of an amount once "$", spaces and thousands separators are removed
+    AMOUNT_PATTERN = r"^(-?)(\d+)(?:\.(\d{1,2}))?$"
+
     @staticmethod
     def extract_number_from_amount_string(amount_string: str) -> float:
         """
@@ -15,4 +21,106 @@ class Utils:
         """
 
         replacements = str.maketrans({"$": "", " ": "", ",": ""})
-        return amount_string.translate(replacements)
\ No newline at end of file
+        return float(amount_string.translate(replacements))
+
+    @staticmethod
+    def parse_amount_to_cents(amount_string: str) -> Union[int, None]:
+        """
+        Params
+        ------
+            amount_string: str
+                Ex:
+                - convert '$40,000.00 ' into 4000000
+                - convert '($1,000.50)' into -100050
+
+        Returns:
+            int or None: amount in cents, None if the amount can't be parsed
+        """
+
+        replacements = str.maketrans({"$": "", " ": "", ",": ""})
+        amount_string = amount_string.translate(replacements)
+
+        if amount_string.startswith("(") and amount_string.endswith(")"):
+            amount_string = f"-{amount_string[1:-1]}"
+
+        matched_amount = re.match(Utils.AMOUNT_PATTERN, amount_string)
+        if matched_amount is None:
+            return None
+
+        sign, whole, fraction = matched_amount.groups()
+        cents = int(whole) * 100 + int((fraction or "").ljust(2, "0"))
+
+        # the cleaned columns hold cents as Int64
+        if cents >= 2 ** 63:
+            return None
+
+        return -cents if sign else cents
+
+    @staticmethod
+    def amount_to_cents_expr(column: str) -> pl.Expr:
+        """
+        Vectorized parse_amount_to_cents over a whole column
+
+        Params:
+            column (str): column holding amount strings
+
+        Returns:
+            pl.Expr: Int64 amount in cents, null if the amount can't be parsed
+        """
+
+        amount_string = pl.col(column).cast(pl.String).str.replace_all(r"[$ ,]", "")
+        is_parenthesized = amount_string.str.starts_with("(")
+        signed_amount_string = amount_string.str.strip_prefix("(").str.strip_suffix(")")
+
+        is_valid = (
+            signed_amount_string.str.contains(Utils.AMOUNT_PATTERN)
+            & is_parenthesized.eq(amount_string.str.ends_with(")"))
+            & (is_parenthesized & signed_amount_string.str.starts_with("-")).not_()
+        )
+        cents = (signed_amount_string.cast(pl.Decimal(38, 2), strict=False) * 100).cast(pl.Int64, strict=False)
+
+        return (
+            pl.when(is_valid.not_()).then(pl.lit(None, dtype=pl.Int64))
+                .when(is_parenthesized).then(-cents)
+                .otherwise(cents)
+                .alias(column)
+        )
+
+    @staticmethod
+    def format_cents_expr(cents: pl.Expr) -> pl.Expr:
+        """
+        Inverse of amount_to_cents_expr, renders cents in the format of the SBA extract
+
+        Params:
+            cents (pl.Expr): Int64 amount in cents
+                Ex:
+                - render 6000000 as '$60,000.00 '
+                - render -100050 as '($1,000.50)'
+
+        Returns:
+            pl.Expr: amount string, null where cents is null
+        """
+
+        dollars = cents.abs() // 100
+        fraction = (cents.abs() % 100).cast(pl.String).str.zfill(2)
+
+        # thousands groups, null above the leading one, zero padded below it
+        groups = [(dollars % 1000).cast(pl.String)] + [
+            pl.when(dollars >= 1000 ** i).then((dollars // 1000 ** i % 1000).cast(pl.String))
+            for i in range(1, 7)
+        ]
+        grouped_dollars = pl.concat_str(
+            *[
+                pl.when(dollars >= 1000 ** (i + 1)).then(group.str.zfill(3)).otherwise(group)
+                for i, group in reversed(list(enumerate(groups)))
+            ],
+            separator=",",
+            ignore_nulls=True
+        )
+
+        amount_string = pl.concat_str(pl.lit("$"), grouped_dollars, pl.lit("."), fraction)
+        return (
+            pl.when(cents < 0)
+                .then(pl.concat_str(pl.lit("("), amount_string, pl.lit(")")))
+                .otherwise(pl.concat_str(amount_string, pl.lit(" ")))
+        )
@@ -0,0 +1,276 @@
+import hashlib
+import json
+import os
+import re
+from typing import Dict, Union
+
+import polars as pl
+
+from pipeline.constants import Constants
+from pipeline.helpers.categorical_encoder import CategoricalEncoder
+from pipeline.helpers.commons.date_normalizer import DateNormalizer
+from pipeline.helpers.commons.utils import Utils
+
+class DatasetCache:
+    """
+    Typed Arrow IPC copy of a raw SBA loans CSV, built once and memory mapped afterwards
+
+    The cache file is named after the SHA-256 of the source, so a changed source gets a new cache.
+    It is written uncompressed, so load memory maps it (through pyarrow): reads are zero copy
+    and processes reading the same file share the page cache.
+
+    Columns follow Constants: integer columns become Int64, date columns Date and amount columns
+    Int64 cents. A column is only typed when every raw value renders back to the exact same string,
+    otherwise it stays a string, so load_raw always gives back the CSV values.
+    Categorical columns left as strings are stored as pl.Enum, with the dictionaries of the cache
+    directory (categories.json), so caches of several sources share their codes
+
+    Usage:
+        cache = DatasetCache()
+        df = cache.load("notebook/dataset/SBAnational.csv")        # typed
+        raw_df = cache.load_raw("notebook/dataset/SBAnational.csv")  # strings, for DataCleaningService
+    """
+
+    HASH_BLOCK_SIZE = 1024 * 1024
+    # bump whenever the cache layout changes, caches of other versions are rebuilt
+    CACHE_FORMAT_VERSION = 2
+    DICTIONARY_FILE_NAME = "categories.json"
+
+    def __init__(self, cache_dir: Union[str, None] = None, categorical: bool = True):
+        """
+        Params:
+            cache_dir (str or None, optional): cache directory, defaults to a .cache directory next to each source
+            categorical (bool, optional): dictionary encode Constants.CATEGORICAL_COLUMNS
+        """
+
+        self.cache_dir = cache_dir
+        self.categorical = categorical
+        self.date_normalizer = DateNormalizer()
+
+    def _cache_dir_of(self, source_path: str) -> str:
+        return self.cache_dir or os.path.join(os.path.dirname(os.path.abspath(source_path)), ".cache")
+
+    def source_digest(self, source_path: str) -> str:
+        """
+        SHA-256 of the source. The digest is remembered next to the cache together with the source
+        size and modification time, so an untouched source isn't hashed again
+
+        Params:
+            source_path (str): raw CSV path
+
+        Returns:
+            str: hex digest of the source
+        """
+
+        source_stat = os.stat(source_path)
+        stem = os.path.splitext(os.path.basename(source_path))[0]
+        digest_path = os.path.join(self._cache_dir_of(source_path), f"{stem}.digest.json")
+
+        if os.path.exists(digest_path):
+            with open(digest_path) as digest_file:
+                remembered = json.load(digest_file)
+            if remembered["size"] == source_stat.st_size and remembered["mtime_ns"] == source_stat.st_mtime_ns:
+                return remembered["sha256"]
+
+        sha256 = hashlib.sha256()
+        with open(source_path, "rb") as source:
+            for block in iter(lambda: source.read(self.HASH_BLOCK_SIZE), b""):
+                sha256.update(block)
+
+        os.makedirs(os.path.dirname(digest_path), exist_ok=True)
+        with open(f"{digest_path}.tmp", "w") as digest_file:
+            json.dump(
+                {"size": source_stat.st_size, "mtime_ns": source_stat.st_mtime_ns, "sha256": sha256.hexdigest()},
+                digest_file
+            )
+        os.replace(f"{digest_path}.tmp", digest_path)
+
+        return sha256.hexdigest()
+
+    def cache_path(self, source_path: str) -> str:
+        """
+        Params:
+            source_path (str): raw CSV path
+
+        Returns:
+            str: path of the cache matching the current content of the source
+        """
+
+        stem = os.path.splitext(os.path.basename(source_path))[0]
+        variant = f"v{self.CACHE_FORMAT_VERSION}{'c' if self.categorical else ''}"
+        return os.path.join(
+            self._cache_dir_of(source_path),
+            f"{stem}-{self.source_digest(source_path)[:16]}-{variant}.arrow"
+        )
+
+    def categorical_encoder(self, source_path: str) -> CategoricalEncoder:
+        """
+        Params:
+            source_path (str): raw CSV path
+
+        Returns:
+            CategoricalEncoder: encoder holding the dictionaries shared by the caches of the source's cache directory
+        """
+
+        return CategoricalEncoder(
+            dictionary_path=os.path.join(self._cache_dir_of(source_path), self.DICTIONARY_FILE_NAME)
+        )
+
+    def _typed_exprs(self) -> Dict[str, pl.Expr]:
+        """
+        Returns:
+            dict: column -> expression typing its raw strings
+        """
+
+        typed_exprs = {
+            column: pl.col(column).str.strip_chars().cast(pl.Int64, strict=False)
+            for column in Constants.INTEGER_COLUMNS
+        }
+        typed_exprs.update({
+            column: pl.col(column)
+                .map_batches(self.date_normalizer.format_raw_date_series, return_dtype=pl.String)
+                .str.to_date(Constants.CLEAN_DATE_FORMAT)
+            for column in Constants.DATE_COLUMNS
+        })
+        typed_exprs.update({column: Utils.amount_to_cents_expr(column) for column in Constants.AMOUNT_COLUMNS})
+
+        return typed_exprs
+
+    @staticmethod
+    def _raw_expr(column: str, typed_column: pl.Expr) -> pl.Expr:
+        """
+        Params:
+            column (str): column name
+            typed_column (pl.Expr): typed values of the column
+
+        Returns:
+            pl.Expr: values rendered back as in the raw CSV
+        """
+
+        if column in Constants.DATE_COLUMNS:
+            return typed_column.dt.strftime(Constants.RAW_DATE_FORMAT)
+        if column in Constants.AMOUNT_COLUMNS:
+            return Utils.format_cents_expr(typed_column)
+        return typed_column.cast(pl.String)
+
+    def _scan_source(self, source_path: str) -> pl.LazyFrame:
+        """
+        Params:
+            source_path (str): raw CSV path
+
+        Returns:
+            pl.LazyFrame: raw string columns named after Constants
+        """
+
+        source_lf = pl.scan_csv(source_path, infer_schema=False)
+        return source_lf.rename({column: column.lower() for column in source_lf.collect_schema().names()})
+
+    def build(self, source_path: str, force: bool = False) -> str:
+        """
+        Convert the source into its typed cache, unless the cache already exists
+
+        Params:
+            source_path (str): raw CSV path
+            force (bool, optional): rebuild an existing cache
+
+        Returns:
+            str: cache path
+        """
+
+        cache_path = self.cache_path(source_path)
+        if os.path.exists(cache_path) and not force:
+            return cache_path
+
+        # typed in memory: the date conversions are cached per distinct value over the whole column
+        raw_df = self._scan_source(source_path).collect()
+        typed_df = raw_df.select(
+            expr.alias(column) for column, expr in self._typed_exprs().items() if column in raw_df.columns
+        )
+        rendered_df = typed_df.select(self._raw_expr(column, pl.col(column)).alias(column) for column in typed_df.columns)
+
+        # keep only the typings every raw value survives
+        lossless_columns = [
+            typed_df.get_column(column)
+            for column in typed_df.columns
+            if (raw_df.get_column(column).is_null() | rendered_df.get_column(column).eq(raw_df.get_column(column)).fill_null(False)).all()
+        ]
+
+        cached_df = raw_df.with_columns(lossless_columns)
+
+        if self.categorical:
+            # typed columns, ex: urbanrural as Int64, are already compact
+            categorical_encoder = self.categorical_encoder(source_path)
+            string_columns = [
+                column for column in categorical_encoder.columns
+                if cached_df.schema.get(column) == pl.String
+            ]
+            # locked, so caches built at the same time by other processes don't lose their values
+            with categorical_encoder.locked():
+                cached_df = cached_df.with_columns(categorical_encoder.encode(cached_df.select(string_columns)))
+                categorical_encoder.save()
+
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        temporary_path = f"{cache_path}.{os.getpid()}.tmp"
+        cached_df.write_ipc(temporary_path, compression="uncompressed")
+
+        # atomic, so concurrent builders and readers never see a partial file
+        os.replace(temporary_path, cache_path)
+
+        # older caches of this source only, ex: loans-2021.csv shares the "loans-" prefix of loans.csv
+        stem = os.path.splitext(os.path.basename(source_path))[0]
+        cache_name_pattern = re.compile(rf"{re.escape(stem)}-[0-9a-f]{{16}}(-v[0-9]+c?)?\.arrow")
+        cache_dir = os.path.dirname(cache_path)
+        for file_name in os.listdir(cache_dir):
+            if cache_name_pattern.fullmatch(file_name) and file_name != os.path.basename(cache_path):
+                os.remove(os.path.join(cache_dir, file_name))
+
+        return cache_path
+
+    def scan(self, source_path: str) -> pl.LazyFrame:
+        """
+        Params:
+            source_path (str): raw CSV path
+
+        Returns:
+            pl.LazyFrame: typed loans from the cache, built first if needed, only the queried columns are read
+        """
+
+        return pl.scan_ipc(self.build(source_path))
+
+    def load(self, source_path: str) -> pl.DataFrame:
+        """
+        Params:
+            source_path (str): raw CSV path
+
+        Returns:
+            pl.DataFrame: typed loans memory mapped from the cache, built first if needed.
+                Without pyarrow the cache is read into memory instead
+        """
+
+        cache_path = self.build(source_path)
+
+        try:
+            import pyarrow
+            from pyarrow import ipc
+        except ImportError:
+            return pl.read_ipc(cache_path)
+
+        # zero copy: the frame's buffers point into the mapped file, pages are loaded on access
+        arrow_table = ipc.open_file(pyarrow.memory_map(cache_path)).read_all()
+        return pl.from_arrow(arrow_table, rechunk=False)
+
+    def load_raw(self, source_path: str) -> pl.DataFrame:
+        """
+        Params:
+            source_path (str): raw CSV path
+
+        Returns:
+            pl.DataFrame: string columns equal to the raw CSV values, ready for DataCleaningService.inspect_frame
+        """
+
+        typed_df = self.load(source_path)
+        return typed_df.with_columns(
+            self._raw_expr(column, pl.col(column)).alias(column)
+            for column, dtype in typed_df.schema.items()
+            if dtype != pl.String
+        )
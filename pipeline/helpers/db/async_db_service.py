@@ -0,0 +1,211 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Mapping, Union
+
+import polars as pl
+from psycopg2 import extensions as PsycopgExtension
+
+from pipeline.helpers.db.connection import ConnectionPool
+from pipeline.helpers.db.db_service import DbService
+from pipeline.helpers.db.query_cache import QueryCache
+
+class AsyncDbService:
+    """
+    asyncio counterpart of DbService, runs queries concurrently over a small ConnectionPool
+
+    psycopg2 is blocking, so every query runs on a worker thread holding its own pooled connection.
+    A query that times out or whose task is cancelled is cancelled on the server too,
+    and its connection is rolled back and given back to the pool
+
+    Usage:
+        async with AsyncDbService(max_connections=4) as db:
+            by_state, by_naics = await asyncio.gather(
+                db.fetch_data(by_state_query, timeout_seconds=30),
+                db.fetch_data(by_naics_query, timeout_seconds=30)
+            )
+    """
+
+    def __init__(
+        self,
+        pool: Union[ConnectionPool, None] = None,
+        max_connections: int = 4,
+        default_timeout_seconds: Union[float, None] = None
+    ):
+        """
+        Params:
+            pool (ConnectionPool or None, optional): pool to borrow connections from, one is opened when None
+            max_connections (int, optional): size of the opened pool, ignored when pool is given
+            default_timeout_seconds (float or None, optional): timeout of queries that don't set their own
+        """
+
+        self._owns_pool = pool is None
+        self.pool = pool if pool is not None else ConnectionPool(min_connections=1, max_connections=max_connections)
+        self.default_timeout_seconds = default_timeout_seconds
+
+        # one thread per connection, more threads would only wait on the pool
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.pool.max_connections,
+            thread_name_prefix="async-db"
+        )
+
+    async def __aenter__(self) -> "AsyncDbService":
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.close()
+
+    def _run_query(
+        self,
+        query: Callable[[PsycopgExtension.cursor], object],
+        timeout_seconds: Union[float, None],
+        state: dict
+    ) -> object:
+        """
+        Run the query on a borrowed connection, called on a worker thread
+
+        Params:
+            query (callable): receives a cursor and returns the result
+            timeout_seconds (float or None): also applied on the server as statement_timeout
+            state (dict): shared with the awaiting coroutine, holds the connection and the cancelled event
+
+        Returns:
+            object: result of query
+        """
+
+        with self.pool.connection() as connection:
+            with state["lock"]:
+                if state["cancelled"].is_set():
+                    raise asyncio.CancelledError()
+                state["connection"] = connection
+
+            try:
+                with connection.cursor() as cursor:
+                    if timeout_seconds is not None:
+                        cursor.execute("SET LOCAL statement_timeout = %s", (max(int(timeout_seconds * 1000), 1),))
+                    result = query(cursor)
+                connection.commit()
+            finally:
+                with state["lock"]:
+                    state["connection"] = None
+
+        return result
+
+    async def _submit(
+        self,
+        query: Callable[[PsycopgExtension.cursor], object],
+        timeout_seconds: Union[float, None]
+    ) -> object:
+        """
+        Params:
+            query (callable): receives a cursor and returns the result
+            timeout_seconds (float or None): time allowed for the query, waiting for a connection included
+
+        Returns:
+            object: result of query
+
+        Raises:
+            TimeoutError: the query didn't finish in time, it is cancelled on the server
+        """
+
+        if timeout_seconds is None:
+            timeout_seconds = self.default_timeout_seconds
+
+        state = {"lock": threading.Lock(), "cancelled": threading.Event(), "connection": None}
+        future = asyncio.get_running_loop().run_in_executor(
+            self._executor, self._run_query, query, timeout_seconds, state
+        )
+
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), timeout_seconds)
+        except (asyncio.TimeoutError, asyncio.CancelledError):
+            with state["lock"]:
+                state["cancelled"].set()
+                if state["connection"] is not None:
+                    state["connection"].cancel()
+            # the worker sees QueryCanceledError, rolls back and gives the connection back
+            future.add_done_callback(lambda done_future: done_future.cancelled() or done_future.exception())
+            raise
+
+    async def fetch_data(
+        self,
+        query_str: str,
+        params: Union[tuple, list, dict, None] = None,
+        timeout_seconds: Union[float, None] = None,
+        cache: Union[QueryCache, None] = None
+    ) -> str:
+        """
+        Params:
+            query_str (str): query to execute
+            params (tuple, list, dict or None, optional): query parameters
+            timeout_seconds (float or None, optional): defaults to default_timeout_seconds
+            cache (QueryCache or None, optional): result cache, hits don't borrow a connection
+
+        Returns:
+            str: fetched rows as a JSON list, same as DbService.fetch_data
+        """
+
+        if cache is not None:
+            cached_response = cache.get(QueryCache.make_key(query_str, params))
+            if cached_response is not None:
+                return cached_response
+
+        return await self._submit(
+            lambda cursor: DbService.fetch_data(cursor, query_str, params, cache),
+            timeout_seconds
+        )
+
+    async def fetch_frame(self, query_str: str, timeout_seconds: Union[float, None] = None) -> pl.DataFrame:
+        """
+        Params:
+            query_str (str): SELECT query to execute
+            timeout_seconds (float or None, optional): defaults to default_timeout_seconds
+
+        Returns:
+            pl.DataFrame: fetched rows, typed as in DbService.fetch_frame
+        """
+
+        return await self._submit(lambda cursor: DbService.fetch_frame(cursor, query_str), timeout_seconds)
+
+    async def fetch_many(
+        self,
+        queries: Mapping[str, str],
+        timeout_seconds: Union[float, None] = None,
+        as_frame: bool = False
+    ) -> Dict[str, Union[str, pl.DataFrame]]:
+        """
+        Run every query concurrently, at most as many at once as the pool has connections
+
+        Params:
+            queries (mapping of str to str): name -> query
+            timeout_seconds (float or None, optional): timeout of each query
+            as_frame (bool, optional): fetch polars frames instead of JSON
+
+        Returns:
+            dict: name -> result, the first failure cancels the remaining queries and is raised
+        """
+
+        fetch = self.fetch_frame if as_frame else self.fetch_data
+        tasks = {
+            name: asyncio.ensure_future(fetch(query_str, timeout_seconds=timeout_seconds))
+            for name, query_str in queries.items()
+        }
+
+        try:
+            await asyncio.gather(*tasks.values())
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+            raise
+
+        return {name: task.result() for name, task in tasks.items()}
+
+    def close(self):
+        """
+        Wait for running queries, then close the worker threads and the pool if it was opened here
+        """
+
+        self._executor.shutdown(wait=True)
+        if self._owns_pool:
+            self.pool.close()
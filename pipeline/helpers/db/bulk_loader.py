@@ -0,0 +1,287 @@
+import io
+import time
+from typing import Iterable, Iterator, List, Union
+
+import polars as pl
+from psycopg2 import extensions as PsycopgExtension
+from psycopg2 import sql
+
+from pipeline.constants import Constants
+from pipeline.helpers.db.connection import Connection
+from pipeline.helpers.db.query_cache import QueryCache
+from pipeline.helpers.db.rollups import RollupManager
+from pipeline.helpers.streaming import CsvStreamingService
+from pipeline.models.bulk_load_report import BulkLoadBatchReport
+
+class BulkLoader:
+    """
+    Load cleaned loans into Postgres with COPY ... FROM STDIN instead of row by row INSERTs
+
+    Batches are streamed as CSV. Binary COPY isn't used because its field encoding must match
+    the exact server column types (ex: int4 vs int8), which the cleaned frames don't carry
+    """
+
+    STAGING_ROW_COLUMN = "staging_row_number"
+
+    def __init__(
+        self,
+        connection: Union[PsycopgExtension.connection, None] = None,
+        batch_size: int = 100_000,
+        query_cache: Union[QueryCache, None] = None,
+        rollup_manager: Union[RollupManager, None] = None
+    ):
+        """
+        Params:
+            connection (psycopg2 connection or None, optional): defaults to the Connection singleton's connection
+            batch_size (int, optional): number of rows sent per COPY
+            query_cache (QueryCache or None, optional): cache invalidated for the target table after each committed batch
+            rollup_manager (RollupManager or None, optional): rollup tables updated with each batch, in its transaction
+        """
+
+        if batch_size <= 0:
+            raise ValueError("batch_size must be positive")
+
+        self.connection = connection if connection is not None else Connection().connection
+        self.batch_size = batch_size
+        self.query_cache = query_cache
+        self.rollup_manager = rollup_manager
+
+    def _iter_batches(self, frames: Iterable[pl.DataFrame]) -> Iterator[pl.DataFrame]:
+        """
+        Params:
+            frames (iterable of pl.DataFrame): cleaned frames of any size
+
+        Returns:
+            iterator of pl.DataFrame: frames of batch_size rows, the last one may be smaller
+        """
+
+        pending = []
+        pending_rows = 0
+
+        for frame in frames:
+            while frame.height > 0:
+                taken = frame.head(self.batch_size - pending_rows)
+                frame = frame.slice(taken.height)
+                pending.append(taken)
+                pending_rows += taken.height
+
+                if pending_rows == self.batch_size:
+                    yield pl.concat(pending)
+                    pending = []
+                    pending_rows = 0
+
+        if pending:
+            yield pl.concat(pending)
+
+    def _copy_batch(self, cursor: PsycopgExtension.cursor, table: sql.Composable, batch: pl.DataFrame):
+        """
+        Params:
+            cursor (PsycopgCursor): psycopg2 cursor
+            table (sql.Composable): table identifier to copy into
+            batch (pl.DataFrame): rows to copy
+        """
+
+        buffer = io.BytesIO()
+        batch.write_csv(buffer, include_header=False)
+        buffer.seek(0)
+
+        copy_query = sql.SQL("COPY {} ({}) FROM STDIN WITH (FORMAT csv, HEADER false)").format(
+            table,
+            sql.SQL(", ").join(map(sql.Identifier, batch.columns))
+        )
+        cursor.copy_expert(copy_query.as_string(self.connection), buffer)
+
+    def _deduplicate_staging(
+        self,
+        cursor: PsycopgExtension.cursor,
+        staging: sql.Identifier,
+        conflict_columns: List[str],
+        keep_last: bool
+    ):
+        """
+        Keep one staged row per key: ON CONFLICT DO UPDATE can't update the same row twice in one statement,
+        and the rollups would count every copy
+
+        Params:
+            cursor (PsycopgCursor): psycopg2 cursor
+            staging (sql.Identifier): staging table, numbered by STAGING_ROW_COLUMN
+            conflict_columns (list of str): unique key of the target table
+            keep_last (bool): keep the last row of each key, as DO UPDATE row by row would,
+                otherwise the first one, as DO NOTHING would
+        """
+
+        staging_row = sql.Identifier(self.STAGING_ROW_COLUMN)
+
+        cursor.execute(
+            sql.SQL("DELETE FROM {} AS staged USING {} AS other WHERE {} AND other.{} {} staged.{}").format(
+                staging,
+                staging,
+                sql.SQL(" AND ").join(
+                    sql.SQL("other.{} = staged.{}").format(sql.Identifier(column), sql.Identifier(column))
+                    for column in conflict_columns
+                ),
+                staging_row,
+                sql.SQL(">" if keep_last else "<"),
+                staging_row
+            )
+        )
+
+    def _upsert_batch(
+        self,
+        cursor: PsycopgExtension.cursor,
+        target_table: str,
+        batch: pl.DataFrame,
+        conflict_columns: Union[List[str], None]
+    ):
+        """
+        Copy the batch into a temporary staging table, then merge it into the target table.
+        A key repeated within the batch is merged once, see _deduplicate_staging
+
+        Params:
+            cursor (PsycopgCursor): psycopg2 cursor
+            target_table (str): target table name
+            batch (pl.DataFrame): rows to upsert
+            conflict_columns (list of str or None): unique key of the target table, None inserts every row
+        """
+
+        target = sql.Identifier(target_table)
+        staging = sql.Identifier(f"{target_table}_staging")
+        columns = sql.SQL(", ").join(map(sql.Identifier, batch.columns))
+        updated_columns = [column for column in batch.columns if column not in (conflict_columns or [])]
+
+        cursor.execute(
+            sql.SQL("CREATE TEMP TABLE {} (LIKE {} INCLUDING DEFAULTS) ON COMMIT DROP").format(staging, target)
+        )
+        if conflict_columns is not None:
+            # numbers the rows in COPY order, so repeated keys can be resolved
+            cursor.execute(
+                sql.SQL("ALTER TABLE {} ADD COLUMN {} bigint GENERATED ALWAYS AS IDENTITY").format(
+                    staging,
+                    sql.Identifier(self.STAGING_ROW_COLUMN)
+                )
+            )
+        self._copy_batch(cursor, staging, batch)
+
+        if conflict_columns is None:
+            if self.rollup_manager is not None:
+                self.rollup_manager.apply_batch(cursor, target_table, staging.string, [], RollupManager.APPEND)
+            cursor.execute(sql.SQL("INSERT INTO {} ({}) SELECT {} FROM {}").format(target, columns, columns, staging))
+            return
+
+        self._deduplicate_staging(cursor, staging, conflict_columns, keep_last=bool(updated_columns))
+
+        if self.rollup_manager is not None:
+            self.rollup_manager.apply_batch(
+                cursor,
+                target_table,
+                staging.string,
+                conflict_columns,
+                RollupManager.REPLACE if updated_columns else RollupManager.SKIP
+            )
+
+        if updated_columns:
+            on_conflict = sql.SQL("DO UPDATE SET {}").format(
+                sql.SQL(", ").join(
+                    sql.SQL("{} = EXCLUDED.{}").format(sql.Identifier(column), sql.Identifier(column))
+                    for column in updated_columns
+                )
+            )
+        else:
+            on_conflict = sql.SQL("DO NOTHING")
+
+        cursor.execute(
+            sql.SQL("INSERT INTO {} ({}) SELECT {} FROM {} ON CONFLICT ({}) {}").format(
+                target,
+                columns,
+                columns,
+                staging,
+                sql.SQL(", ").join(map(sql.Identifier, conflict_columns)),
+                on_conflict
+            )
+        )
+
+    def load_frames(
+        self,
+        frames: Iterable[pl.DataFrame],
+        target_table: str,
+        upsert: bool = True,
+        conflict_columns: Union[List[str], None] = None
+    ) -> List[BulkLoadBatchReport]:
+        """
+        Params:
+            frames (iterable of pl.DataFrame): cleaned frames, columns must exist in the target table
+            target_table (str): target table name
+            upsert (bool, optional): merge through a staging table, otherwise copy straight into the target
+            conflict_columns (list of str or None, optional): unique key used by the upsert, defaults to loannr_chkdgt
+
+        Returns:
+            list of BulkLoadBatchReport: throughput of each batch, each batch is committed on its own
+        """
+
+        conflict_columns = conflict_columns or [Constants.LOAN_ID]
+        reports = []
+
+        if self.rollup_manager is not None:
+            try:
+                with self.connection.cursor() as cursor:
+                    self.rollup_manager.create_tables(cursor, target_table)
+                self.connection.commit()
+            except Exception:
+                self.connection.rollback()
+                raise
+
+        for batch_number, batch in enumerate(self._iter_batches(frames), start=1):
+            started_at = time.perf_counter()
+
+            try:
+                with self.connection.cursor() as cursor:
+                    if upsert:
+                        self._upsert_batch(cursor, target_table, batch, conflict_columns)
+                    elif self.rollup_manager is not None:
+                        # staged as well, so the rollups can read the batch before it is inserted
+                        self._upsert_batch(cursor, target_table, batch, None)
+                    else:
+                        self._copy_batch(cursor, sql.Identifier(target_table), batch)
+                self.connection.commit()
+            except Exception:
+                self.connection.rollback()
+                raise
+
+            if self.query_cache is not None:
+                self.query_cache.invalidate(target_table)
+                if self.rollup_manager is not None:
+                    for rollup in self.rollup_manager.rollups:
+                        self.query_cache.invalidate(RollupManager.table_name(target_table, rollup))
+
+            seconds = time.perf_counter() - started_at
+            reports.append(BulkLoadBatchReport(
+                batch_number=batch_number,
+                rows=batch.height,
+                seconds=seconds,
+                rows_per_second=batch.height / seconds if seconds > 0 else 0.0
+            ))
+
+        return reports
+
+    def load_csv(
+        self,
+        cleaned_csv_path: str,
+        target_table: str,
+        upsert: bool = True,
+        conflict_columns: Union[List[str], None] = None,
+        memory_limit_mb: int = 256
+    ) -> List[BulkLoadBatchReport]:
+        """
+        Params:
+            cleaned_csv_path (str): CSV written by the cleaning pipeline
+            target_table (str): target table name
+            upsert (bool, optional): merge through a staging table, otherwise copy straight into the target
+            conflict_columns (list of str or None, optional): unique key used by the upsert, defaults to loannr_chkdgt
+            memory_limit_mb (int, optional): memory ceiling of one read chunk
+
+        Returns:
+            list of BulkLoadBatchReport: throughput of each batch
+        """
+
+        chunks = CsvStreamingService(memory_limit_mb=memory_limit_mb).iter_chunks(cleaned_csv_path)
+        return self.load_frames(chunks, target_table, upsert, conflict_columns)
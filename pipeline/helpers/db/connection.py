@@ -1,7 +1,38 @@
 import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator
 
 from dotenv import load_dotenv
 import psycopg2
+from psycopg2 import extensions as PsycopgExtension
+from psycopg2 import pool as PsycopgPool
+
+_settings_lock = threading.Lock()
+_connection_settings = None
+
+def get_connection_settings() -> dict:
+    """
+    Read the database settings from the environment, .env is loaded only once per process
+
+    Returns:
+        dict: psycopg2.connect keyword arguments
+    """
+
+    global _connection_settings
+
+    with _settings_lock:
+        if _connection_settings is None:
+            load_dotenv()
+            _connection_settings = {
+                "user": os.getenv("DB_USER"),
+                "password": os.getenv("DB_PASS"),
+                "host": os.getenv("DB_HOST"),
+                "database": os.getenv("DB_NAME"),
+                "port": os.getenv("DB_PORT")
+            }
+        return dict(_connection_settings)
 
 class Connection:
     _instance = None
@@ -22,16 +53,8 @@ class Connection:
             port (int): database port
         """
 
-        load_dotenv()
-
         if not self._initialized:
-            self.connection = psycopg2.connect(
-                user = os.getenv("DB_USER"),
-                password = os.getenv("DB_PASS"),
-                host = os.getenv("DB_HOST"),
-                database = os.getenv("DB_NAME"),
-                port = os.getenv("DB_PORT")
-            )
+            self.connection = psycopg2.connect(**get_connection_settings())
 
             self.cursor = self.connection.cursor()
 
@@ -43,4 +66,164 @@ class Connection:
         """
 
         self.cursor.close()
-        self.connection.close()
\ No newline at end of file
+        self.connection.close()
+
+class ConnectionPool:
+    """
+    Thread safe pool of psycopg2 connections, lets loaders and report queries run in parallel
+    instead of sharing the Connection singleton's single cursor
+
+    Usage:
+        pool = ConnectionPool(max_connections=8)
+        with pool.cursor() as cursor:
+            DbService.fetch_data(cursor, query_str)
+    """
+
+    def __init__(
+        self,
+        min_connections: int = 1,
+        max_connections: int = 10,
+        health_check_interval_seconds: float = 30.0,
+        max_retries: int = 3,
+        retry_backoff_seconds: float = 0.5,
+        **connect_kwargs
+    ):
+        """
+        Params:
+            min_connections (int, optional): connections opened up front and kept open
+            max_connections (int, optional): maximum number of borrowed connections at once,
+                borrowers wait when every connection is in use
+            health_check_interval_seconds (float, optional): connections idle longer than this
+                are checked with SELECT 1 before being handed out
+            max_retries (int, optional): reconnect attempts when a connection can't be opened
+            retry_backoff_seconds (float, optional): first wait between reconnect attempts, doubled on each attempt
+            connect_kwargs: psycopg2.connect keyword arguments overriding the environment settings
+        """
+
+        if not 0 <= min_connections <= max_connections:
+            raise ValueError("expected 0 <= min_connections <= max_connections")
+
+        self.max_connections = max_connections
+        self.health_check_interval_seconds = health_check_interval_seconds
+        self.max_retries = max_retries
+        self.retry_backoff_seconds = retry_backoff_seconds
+
+        settings = get_connection_settings()
+        settings.update(connect_kwargs)
+
+        self._pool = PsycopgPool.ThreadedConnectionPool(min_connections, max_connections, **settings)
+        self._available = threading.BoundedSemaphore(max_connections)
+        self._last_used_at = {}
+
+    def _is_healthy(self, connection: PsycopgExtension.connection) -> bool:
+        """
+        Params:
+            connection (psycopg2 connection): connection to check
+
+        Returns:
+            bool: True if the connection is usable
+        """
+
+        if connection.closed:
+            return False
+
+        last_used_at = self._last_used_at.get(id(connection), 0.0)
+        if time.monotonic() - last_used_at < self.health_check_interval_seconds:
+            return True
+
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            connection.rollback()
+        except psycopg2.Error:
+            return False
+        return True
+
+    def _checkout(self) -> PsycopgExtension.connection:
+        """
+        Stale pooled connections, ex: after a server restart, are discarded without using up the
+        reconnect attempts, up to one per pooled connection. Connections that can't be opened, or are
+        broken right after being opened, are retried max_retries times with an exponential backoff
+
+        Returns:
+            psycopg2 connection: healthy connection, broken ones are discarded and reopened
+
+        Raises:
+            psycopg2.OperationalError: no connection could be opened after max_retries attempts
+        """
+
+        failed_attempts = 0
+        stale_discards = 0
+
+        while True:
+            try:
+                connection = self._pool.getconn()
+            except psycopg2.OperationalError:
+                if failed_attempts == self.max_retries:
+                    raise
+                time.sleep(self.retry_backoff_seconds * 2 ** failed_attempts)
+                failed_attempts += 1
+                continue
+
+            if self._is_healthy(connection):
+                return connection
+
+            self._last_used_at.pop(id(connection), None)
+            self._pool.putconn(connection, close=True)
+
+            # more broken connections than the pool can hold: new ones are broken too
+            if stale_discards < self.max_connections:
+                stale_discards += 1
+                continue
+            if failed_attempts == self.max_retries:
+                raise psycopg2.OperationalError("no healthy connection available")
+            time.sleep(self.retry_backoff_seconds * 2 ** failed_attempts)
+            failed_attempts += 1
+
+    @contextmanager
+    def connection(self) -> Iterator[PsycopgExtension.connection]:
+        """
+        Borrow a connection, the open transaction is rolled back if the block raises
+
+        Returns:
+            psycopg2 connection: borrowed connection, given back to the pool on exit
+        """
+
+        self._available.acquire()
+        try:
+            connection = self._checkout()
+            try:
+                yield connection
+            except Exception:
+                if not connection.closed:
+                    connection.rollback()
+                raise
+            finally:
+                if connection.closed:
+                    self._last_used_at.pop(id(connection), None)
+                else:
+                    self._last_used_at[id(connection)] = time.monotonic()
+                self._pool.putconn(connection, close=bool(connection.closed))
+        finally:
+            self._available.release()
+
+    @contextmanager
+    def cursor(self) -> Iterator[PsycopgExtension.cursor]:
+        """
+        Borrow a connection and open a cursor on it, the transaction is committed on success
+
+        Returns:
+            psycopg2 cursor: cursor scoped to the block
+        """
+
+        with self.connection() as connection:
+            with connection.cursor() as cursor:
+                yield cursor
+            connection.commit()
+
+    def close(self):
+        """
+        Close every pooled connection
+        """
+
+        self._pool.closeall()
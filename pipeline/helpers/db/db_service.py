@@ -1,23 +1,58 @@
+import io
 import json
+import uuid
 from decimal import Decimal
+from typing import TYPE_CHECKING, Iterator, Union
 
 from psycopg2 import extensions as PsycopgExtension
+from psycopg2 import sql
+
+from pipeline.helpers.db.query_cache import QueryCache
+from pipeline.helpers.db.rollups import RollupManager
+
+# polars is only needed by fetch_frame, it is imported there so fetch_data callers don't pay for it
+if TYPE_CHECKING:
+    import polars as pl
 
 class DbService:
+    # postgres type oids mapped to polars dtypes in _cast_column
+    BOOLEAN_TYPE_OID = 16
+    NUMERIC_TYPE_OID = 1700
+    DATE_TYPE_OID = 1082
+    TIMESTAMP_TYPE_OID = 1114
+    TIMESTAMPTZ_TYPE_OID = 1184
+
+    @staticmethod
+    def _json_default(value: object) -> Union[float, str]:
+        """
+        Params:
+            value (object): value json can't serialize, ex: Decimal or date
+
+        Returns:
+            float | str: serializable value
+        """
+
+        return float(value) if isinstance(value, Decimal) else str(value)
+
     @staticmethod
-    def fetch_data(cursor: PsycopgExtension.cursor, query_str: str) -> list:
+    def _fetch_rows(
+        cursor: PsycopgExtension.cursor,
+        query_str: str,
+        params: Union[tuple, list, dict, None] = None
+    ) -> list:
         """
         Params:
             cursor (PsycopgCursor): psycopg2 cursor
             query_str (str): query to execute
+            params (tuple, list, dict or None, optional): query parameters
 
         Returns:
-            list: list of fetched object
+            list: fetched rows as dicts keyed by column name
         """
 
         response_to_return = []
 
-        cursor.execute(query_str)
+        cursor.execute(query_str, params)
         response_rows = cursor.fetchall()
         response_columns = [desc[0] for desc in cursor.description]
 
@@ -29,7 +64,228 @@ class DbService:
                     response_dict[response_columns[i]] = datum
                 
                 response_to_return.append(response_dict)
-        return json.dumps(
+        return response_to_return
+
+    @staticmethod
+    def fetch_data(
+        cursor: PsycopgExtension.cursor,
+        query_str: str,
+        params: Union[tuple, list, dict, None] = None,
+        cache: Union[QueryCache, None] = None
+    ) -> list:
+        """
+        Params:
+            cursor (PsycopgCursor): psycopg2 cursor
+            query_str (str): query to execute
+            params (tuple, list, dict or None, optional): query parameters
+            cache (QueryCache or None, optional): result cache, the query is sent only on a miss
+
+        Returns:
+            list: list of fetched object
+        """
+
+        if cache is not None:
+            cache_key = QueryCache.make_key(query_str, params)
+            cached_response = cache.get(cache_key)
+
+            if cached_response is not None:
+                return cached_response
+
+        response_to_return = DbService._fetch_rows(cursor, query_str, params)
+        response_json = json.dumps(
             response_to_return, 
-            default=lambda o: float(o) if isinstance(o, Decimal) else str(o)
-        )
\ No newline at end of file
+            default=DbService._json_default
+        )
+
+        if cache is not None:
+            cache.put(cache_key, response_json)
+        return response_json
+
+    @staticmethod
+    def fetch_rollup(
+        cursor: PsycopgExtension.cursor,
+        rollup: str,
+        target_table: str = "loans",
+        limit: Union[int, None] = None,
+        cache: Union[QueryCache, None] = None
+    ) -> list:
+        """
+        Answer a group-by question from its rollup table instead of scanning the loans table,
+        ex: charge-off rate by state. The rollup must be maintained by BulkLoader or RollupManager.rebuild
+
+        Params:
+            cursor (PsycopgCursor): psycopg2 cursor
+            rollup (str): rollup name, one of RollupManager.GROUP_EXPRESSIONS
+            target_table (str, optional): loans table the rollup belongs to
+            limit (int or None, optional): maximum number of groups, largest groups first
+            cache (QueryCache or None, optional): result cache
+
+        Returns:
+            list: groups with their measures and rates, largest groups first
+        """
+
+        if rollup not in RollupManager.GROUP_EXPRESSIONS:
+            raise ValueError(f"unknown rollup: {rollup}")
+
+        measures = RollupManager.measures(rollup)
+        rates = [
+            sql.SQL("{}::float8 / nullif(loans, 0) AS {}").format(sql.Identifier(measure), sql.Identifier(rate))
+            for rate, measure in RollupManager.RATE_MEASURES.items()
+            if measure in measures
+        ]
+        group_columns = list(RollupManager.GROUP_EXPRESSIONS[rollup])
+
+        query = sql.SQL("SELECT {} FROM {} ORDER BY loans DESC, {}{}").format(
+            sql.SQL(", ").join([sql.Identifier(column) for column in group_columns + list(measures)] + rates),
+            sql.Identifier(RollupManager.table_name(target_table, rollup)),
+            sql.SQL(", ").join(map(sql.Identifier, group_columns)),
+            sql.SQL(" LIMIT {}").format(sql.Literal(limit)) if limit is not None else sql.SQL("")
+        )
+
+        return DbService.fetch_data(cursor, query.as_string(cursor.connection), cache=cache)
+
+    @staticmethod
+    def stream_data(
+        connection: PsycopgExtension.connection,
+        query_str: str,
+        batch_size: int = 10_000
+    ) -> Iterator[dict]:
+        """
+        Stream the query result through a server-side cursor, so only one batch is held in memory
+
+        Params:
+            connection (PsycopgConnection): psycopg2 connection, the cursor lives in its open transaction
+            query_str (str): query to execute
+            batch_size (int, optional): rows fetched per round trip
+
+        Returns:
+            iterator of dict: fetched rows, the first one is yielded as soon as the first batch arrives
+        """
+
+        cursor = connection.cursor(name=f"stream_{uuid.uuid4().hex}")
+        cursor.itersize = batch_size
+
+        try:
+            cursor.execute(query_str)
+
+            response_columns = None
+            while True:
+                response_rows = cursor.fetchmany(batch_size)
+                if not response_rows:
+                    break
+
+                if response_columns is None:
+                    response_columns = [desc[0] for desc in cursor.description]
+
+                for row in response_rows:
+                    yield dict(zip(response_columns, row))
+        finally:
+            cursor.close()
+
+    @staticmethod
+    def stream_ndjson(
+        connection: PsycopgExtension.connection,
+        query_str: str,
+        batch_size: int = 10_000
+    ) -> Iterator[str]:
+        """
+        Params:
+            connection (PsycopgConnection): psycopg2 connection
+            query_str (str): query to execute
+            batch_size (int, optional): rows fetched per round trip and per yielded chunk
+
+        Returns:
+            iterator of str: newline delimited JSON chunks of at most batch_size rows
+        """
+
+        lines = []
+        for row in DbService.stream_data(connection, query_str, batch_size):
+            lines.append(json.dumps(row, default=DbService._json_default))
+
+            if len(lines) == batch_size:
+                yield "\n".join(lines) + "\n"
+                lines = []
+
+        if lines:
+            yield "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _cast_column(column: "pl.Expr", type_code: int, precision: Union[int, None], scale: Union[int, None]) -> "pl.Expr":
+        """
+        Params:
+            column (pl.Expr): text column as written by COPY
+            type_code (int): postgres type oid of the column
+            precision (int or None): numeric precision, None when the numeric isn't constrained
+            scale (int or None): numeric scale, None when the numeric isn't constrained
+
+        Returns:
+            pl.Expr: column cast to its native polars dtype, text columns are kept as strings
+        """
+
+        import polars as pl
+
+        polars_dtype_by_type_oid = {
+            20: pl.Int64,
+            21: pl.Int16,
+            23: pl.Int32,
+            700: pl.Float32,
+            701: pl.Float64,
+        }
+
+        if type_code == DbService.BOOLEAN_TYPE_OID:
+            return column.eq("t")
+        if type_code in polars_dtype_by_type_oid:
+            return column.cast(polars_dtype_by_type_oid[type_code])
+        if type_code == DbService.NUMERIC_TYPE_OID:
+            if precision is not None and scale is not None and precision <= 38:
+                return column.cast(pl.Decimal(precision, scale))
+            return column.cast(pl.Float64)
+        if type_code == DbService.DATE_TYPE_OID:
+            return column.str.to_date("%Y-%m-%d")
+        if type_code == DbService.TIMESTAMP_TYPE_OID:
+            return column.str.to_datetime(time_unit="us")
+        if type_code == DbService.TIMESTAMPTZ_TYPE_OID:
+            return column.str.to_datetime("%Y-%m-%d %H:%M:%S%.f%#z", time_unit="us", time_zone="UTC")
+        return column
+
+    @staticmethod
+    def fetch_frame(cursor: PsycopgExtension.cursor, query_str: str) -> "pl.DataFrame":
+        """
+        Fetch the query result straight into a typed polars frame through COPY (query) TO STDOUT,
+        skipping the dict and JSON round trip of fetch_data. Use .to_arrow() on the result for an Arrow table
+
+        Params:
+            cursor (PsycopgCursor): psycopg2 cursor
+            query_str (str): SELECT query to execute
+
+        Returns:
+            pl.DataFrame: fetched rows, NUMERIC as Decimal (Float64 when unconstrained), DATE as Date
+        """
+
+        import polars as pl
+
+        query = sql.SQL(query_str.strip().rstrip(";"))
+
+        # describe the result without fetching it
+        cursor.execute(sql.SQL("SELECT * FROM ({}) AS fetched LIMIT 0").format(query))
+        columns = cursor.description
+
+        buffer = io.BytesIO()
+        cursor.copy_expert(
+            sql.SQL("COPY ({}) TO STDOUT WITH (FORMAT csv, HEADER false)").format(query).as_string(cursor.connection),
+            buffer
+        )
+        buffer.seek(0)
+
+        column_names = [column.name for column in columns]
+        text_schema = {name: pl.String for name in column_names}
+
+        if buffer.getbuffer().nbytes == 0:
+            fetched_df = pl.DataFrame(schema=text_schema)
+        else:
+            fetched_df = pl.read_csv(buffer, has_header=False, new_columns=column_names, schema=text_schema)
+
+        return fetched_df.with_columns(
+            DbService._cast_column(pl.col(column.name), column.type_code, column.precision, column.scale).alias(column.name)
+            for column in columns
+        )
@@ -0,0 +1,233 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Hashable, Tuple, Union
+
+class QueryCache:
+    """
+    Bounded in-memory cache of query results, keyed on the normalized query text and its parameters
+
+    Entries are evicted least recently used first once the byte budget is exceeded, and expire
+    after ttl_seconds. Loaders call invalidate when they write, so cached aggregates never outlive the data
+
+    Usage:
+        cache = QueryCache(max_bytes=64 * 1024 * 1024, ttl_seconds=300)
+        DbService.fetch_data(cursor, query_str, cache=cache)
+        BulkLoader(query_cache=cache).load_csv(cleaned_csv_path, "loans")
+    """
+
+    WHITESPACE_PATTERN = re.compile(r"\s+")
+    STRING_LITERAL_PATTERN = re.compile(r"('(?:[^']|'')*')")
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, ttl_seconds: Union[float, None] = 300.0):
+        """
+        Params:
+            max_bytes (int, optional): memory budget of the cached results
+            ttl_seconds (float or None, optional): lifetime of an entry, None keeps entries until evicted
+        """
+
+        if max_bytes <= 0:
+            raise ValueError("max_bytes must be positive")
+
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+
+        # key -> (result, size in bytes, expiry time or None, normalized query)
+        self._entries = OrderedDict()
+        self._size_bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def normalize_query(query_str: str) -> str:
+        """
+        Params:
+            query_str (str): query text
+
+        Returns:
+            str: query with collapsed whitespace outside string literals and no trailing semicolon
+        """
+
+        # odd parts are string literals, kept as is
+        parts = QueryCache.STRING_LITERAL_PATTERN.split(query_str)
+        normalized_query = "".join(
+            part if i % 2 else QueryCache.WHITESPACE_PATTERN.sub(" ", part)
+            for i, part in enumerate(parts)
+        )
+        return normalized_query.strip().rstrip(";").strip()
+
+    @staticmethod
+    def _freeze(value: object) -> Hashable:
+        """
+        Params:
+            value (object): query parameter, ex: a list passed to ANY(%s)
+
+        Returns:
+            hashable: value with nested lists, tuples, sets and dicts made hashable. Lists and tuples
+                stay distinct, psycopg2 adapts them differently (ARRAY vs IN list)
+        """
+
+        if isinstance(value, dict):
+            return dict, tuple(sorted((key, QueryCache._freeze(item)) for key, item in value.items()))
+        if isinstance(value, list):
+            return list, tuple(QueryCache._freeze(item) for item in value)
+        if isinstance(value, tuple):
+            return tuple(QueryCache._freeze(item) for item in value)
+        if isinstance(value, (set, frozenset)):
+            return frozenset(QueryCache._freeze(item) for item in value)
+        return value
+
+    @staticmethod
+    def make_key(query_str: str, params: Union[tuple, list, dict, None] = None) -> Tuple[str, Hashable]:
+        """
+        Params:
+            query_str (str): query text
+            params (tuple, list, dict or None, optional): query parameters, may hold lists and dicts
+
+        Returns:
+            tuple: cache key
+        """
+
+        if isinstance(params, dict):
+            params = tuple(sorted((key, QueryCache._freeze(value)) for key, value in params.items()))
+        elif isinstance(params, (list, tuple)):
+            params = tuple(QueryCache._freeze(value) for value in params)
+
+        return QueryCache.normalize_query(query_str), params
+
+    @staticmethod
+    def _size_of(result: Union[str, bytes]) -> int:
+        """
+        Params:
+            result (str or bytes): cached result
+
+        Returns:
+            int: approximate size of the result in bytes
+        """
+
+        return len(result) if isinstance(result, bytes) else len(result.encode("utf-8"))
+
+    def _drop(self, key: Tuple[str, Hashable]):
+        """
+        Params:
+            key (tuple): key of the entry to drop, the lock must be held
+        """
+
+        _, size, _, _ = self._entries.pop(key)
+        self._size_bytes -= size
+
+    def get(self, key: Tuple[str, Hashable]) -> Union[str, bytes, None]:
+        """
+        Params:
+            key (tuple): cache key from make_key
+
+        Returns:
+            str, bytes or None: cached result, None on a miss
+        """
+
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is not None and entry[2] is not None and entry[2] <= time.monotonic():
+                self._drop(key)
+                self.expirations += 1
+                entry = None
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Tuple[str, Hashable], result: Union[str, bytes]):
+        """
+        Params:
+            key (tuple): cache key from make_key
+            result (str or bytes): serialized query result, results larger than the budget aren't cached
+        """
+
+        size = self._size_of(result)
+
+        if size > self.max_bytes:
+            return
+
+        expires_at = time.monotonic() + self.ttl_seconds if self.ttl_seconds is not None else None
+
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+
+            self._entries[key] = (result, size, expires_at, key[0])
+            self._size_bytes += size
+
+            while self._size_bytes > self.max_bytes:
+                oldest_key = next(iter(self._entries))
+                self._drop(oldest_key)
+                self.evictions += 1
+
+    def invalidate(self, table: Union[str, None] = None) -> int:
+        """
+        Drop cached results, fired by the loading pipeline whenever it writes
+
+        Params:
+            table (str or None, optional): drop only queries mentioning this table, None drops everything
+
+        Returns:
+            int: number of dropped entries
+        """
+
+        with self._lock:
+            if table is None:
+                stale_keys = list(self._entries)
+            else:
+                table_pattern = re.compile(rf"\b{re.escape(table)}\b", re.IGNORECASE)
+                stale_keys = [key for key, entry in self._entries.items() if table_pattern.search(entry[3])]
+
+            for key in stale_keys:
+                self._drop(key)
+
+            self.invalidations += len(stale_keys)
+            return len(stale_keys)
+
+    def stats(self) -> dict:
+        """
+        Returns:
+            dict: hit, miss, eviction counters and current size of the cache
+        """
+
+        with self._lock:
+            lookups = self.hits + self.misses
+
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+                "entries": len(self._entries),
+                "size_bytes": self._size_bytes,
+                "max_bytes": self.max_bytes,
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
+
+    def clear(self):
+        """
+        Drop every entry and reset the counters
+        """
+
+        with self._lock:
+            self._entries.clear()
+            self._size_bytes = 0
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+            self.expirations = 0
+            self.invalidations = 0
@@ -0,0 +1,296 @@
+from typing import Dict, List, Union
+
+from psycopg2 import extensions as PsycopgExtension
+from psycopg2 import sql
+
+from pipeline.constants import Constants
+
+class RollupManager:
+    """
+    Pre-aggregated rollup tables of a loans table, kept up to date by BulkLoader batch by batch
+
+    Each rollup is a table named <target table>_rollup_<rollup> holding one row per group with
+    additive measures only (counts and sums), so a batch is folded in by adding the aggregates of
+    its rows and subtracting those of the rows it replaces, in the same transaction as the merge.
+    Rates are derived from the measures at query time by DbService.fetch_rollup
+
+    Rollup tables use UNIQUE NULLS NOT DISTINCT, so null groups (ex: unknown state) are kept: Postgres 15+
+
+    Usage:
+        rollup_manager = RollupManager()
+        BulkLoader(rollup_manager=rollup_manager).load_csv(cleaned_csv_path, "loans")
+        DbService.fetch_rollup(cursor, "state", "loans")
+    """
+
+    APPEND = "append"
+    REPLACE = "replace"
+    SKIP = "skip"
+
+    # rollup -> group column -> SQL expression over a loans row
+    GROUP_EXPRESSIONS = {
+        "state": {"state": Constants.DEBTOR_ORIGIN_STATE},
+        "bank": {"bank": Constants.GUARANTOR_BANK_NAME, "bankstate": Constants.GUARANTOR_BANK_STATE},
+        "naics_sector": {
+            "naics_sector": f"CASE WHEN {Constants.NAICS_CODE} ~ '^[0-9]{{2}}' THEN left({Constants.NAICS_CODE}, 2) END"
+        },
+        "approval_fy": {"approvalfy": Constants.LOAN_APPROVAL_FY},
+        "nulls": {"column_name": "nulls.column_name"},
+    }
+
+    # measure -> SQL expression over a loans row, summed per group
+    MEASURE_EXPRESSIONS = {
+        "loans": "1",
+        "chgoff_loans": f"CASE WHEN {Constants.LOAN_STATUS} = '{Constants.CHARGED_OFF_STATUS}' THEN 1 ELSE 0 END",
+        "paid_in_full_loans": f"CASE WHEN {Constants.LOAN_STATUS} = '{Constants.PAID_IN_FULL_STATUS}' THEN 1 ELSE 0 END",
+        "needs_to_verify_loans": f"CASE WHEN {Constants.IS_DATA_VERIFICATION_NEEDED} THEN 1 ELSE 0 END",
+        "disbursement_gross_cents": f"coalesce({Constants.DISBURESEMENT_GROSS}, 0)",
+        "chgoff_principal_cents": f"coalesce({Constants.CREDIT_CHARGED_OFF_AMOUNT}, 0)",
+        "bank_approved_cents": f"coalesce({Constants.BANK_APPROVED_CREDIT_AMOUNT}, 0)",
+        "sba_approved_cents": f"coalesce({Constants.SBA_APPROVED_CREDIT_AMOUNT}, 0)",
+    }
+    NULLS_MEASURE_EXPRESSIONS = {
+        "loans": "1",
+        "null_loans": "CASE WHEN nulls.is_null THEN 1 ELSE 0 END",
+    }
+
+    # rates returned by DbService.fetch_rollup, numerator measure / loans
+    RATE_MEASURES = {
+        "chgoff_rate": "chgoff_loans",
+        "paid_in_full_rate": "paid_in_full_loans",
+        "needs_to_verify_rate": "needs_to_verify_loans",
+        "null_rate": "null_loans",
+    }
+
+    def __init__(self, rollups: Union[List[str], None] = None):
+        """
+        Params:
+            rollups (list of str or None, optional): rollups to maintain, defaults to every rollup in GROUP_EXPRESSIONS
+        """
+
+        rollups = rollups or list(self.GROUP_EXPRESSIONS)
+        unknown_rollups = [rollup for rollup in rollups if rollup not in self.GROUP_EXPRESSIONS]
+        if unknown_rollups:
+            raise ValueError(f"unknown rollups: {', '.join(unknown_rollups)}")
+
+        self.rollups = rollups
+
+    @staticmethod
+    def table_name(target_table: str, rollup: str) -> str:
+        """
+        Params:
+            target_table (str): loans table name
+            rollup (str): rollup name, ex: "state"
+
+        Returns:
+            str: rollup table name
+        """
+
+        return f"{target_table}_rollup_{rollup}"
+
+    @staticmethod
+    def measures(rollup: str) -> Dict[str, str]:
+        """
+        Params:
+            rollup (str): rollup name
+
+        Returns:
+            dict: measure -> SQL expression of the rollup
+        """
+
+        return RollupManager.NULLS_MEASURE_EXPRESSIONS if rollup == "nulls" else RollupManager.MEASURE_EXPRESSIONS
+
+    @staticmethod
+    def _source(table: sql.Composable, rollup: str) -> sql.Composable:
+        """
+        Params:
+            table (sql.Composable): loans table the rows are read from
+            rollup (str): rollup name
+
+        Returns:
+            sql.Composable: FROM clause, rows aliased loans_row. The nulls rollup reads one row per loan and column
+        """
+
+        source = sql.SQL("{} AS loans_row").format(table)
+        if rollup != "nulls":
+            return source
+
+        null_checks = sql.SQL(", ").join(
+            sql.SQL("({}, loans_row.{} IS NULL)").format(sql.Literal(column), sql.Identifier(column))
+            for column in Constants.COLUMNS
+        )
+        return sql.SQL("{} CROSS JOIN LATERAL (VALUES {}) AS nulls(column_name, is_null)").format(source, null_checks)
+
+    @staticmethod
+    def _select_rows(table: sql.Composable, rollup: str, sign: int = 1) -> sql.Composable:
+        """
+        Params:
+            table (sql.Composable): loans table the rows are read from
+            rollup (str): rollup name
+            sign (int, optional): -1 to negate the measures
+
+        Returns:
+            sql.Composable: SELECT of the group columns and measures of each row, without a WHERE clause
+        """
+
+        group_columns = [
+            sql.SQL("{} AS {}").format(sql.SQL(expression), sql.Identifier(column))
+            for column, expression in RollupManager.GROUP_EXPRESSIONS[rollup].items()
+        ]
+        measure_columns = [
+            sql.SQL("({})::bigint * {} AS {}").format(sql.SQL(expression), sql.Literal(sign), sql.Identifier(measure))
+            for measure, expression in RollupManager.measures(rollup).items()
+        ]
+
+        return sql.SQL("SELECT {} FROM {}").format(
+            sql.SQL(", ").join(group_columns + measure_columns),
+            RollupManager._source(table, rollup)
+        )
+
+    @staticmethod
+    def _aggregate(rows_query: sql.Composable, rollup: str) -> sql.Composable:
+        """
+        Params:
+            rows_query (sql.Composable): query returning the group columns and measures of each row
+            rollup (str): rollup name
+
+        Returns:
+            sql.Composable: group columns and summed measures of the rows, per group
+        """
+
+        group_columns = sql.SQL(", ").join(map(sql.Identifier, RollupManager.GROUP_EXPRESSIONS[rollup]))
+        summed_measures = sql.SQL(", ").join(
+            sql.SQL("sum({})::bigint AS {}").format(sql.Identifier(measure), sql.Identifier(measure))
+            for measure in RollupManager.measures(rollup)
+        )
+
+        return sql.SQL("SELECT {}, {} FROM ({}) AS rows_to_aggregate GROUP BY {}").format(
+            group_columns,
+            summed_measures,
+            rows_query,
+            group_columns
+        )
+
+    def create_tables(self, cursor: PsycopgExtension.cursor, target_table: str):
+        """
+        Create the missing rollup tables of the target table, empty
+
+        Params:
+            cursor (PsycopgCursor): psycopg2 cursor
+            target_table (str): loans table name
+        """
+
+        for rollup in self.rollups:
+            rollup_table = sql.Identifier(self.table_name(target_table, rollup))
+
+            # typed after the expressions, over no rows
+            cursor.execute(
+                sql.SQL("CREATE TABLE IF NOT EXISTS {} AS {} WITH NO DATA").format(
+                    rollup_table,
+                    self._aggregate(self._select_rows(sql.Identifier(target_table), rollup), rollup)
+                )
+            )
+            cursor.execute(
+                sql.SQL("CREATE UNIQUE INDEX IF NOT EXISTS {} ON {} ({}) NULLS NOT DISTINCT").format(
+                    sql.Identifier(f"{self.table_name(target_table, rollup)}_key"),
+                    rollup_table,
+                    sql.SQL(", ").join(map(sql.Identifier, self.GROUP_EXPRESSIONS[rollup]))
+                )
+            )
+
+    def rebuild(self, cursor: PsycopgExtension.cursor, target_table: str):
+        """
+        Recompute the rollup tables from the whole target table, ex: after loading without rollups
+
+        Params:
+            cursor (PsycopgCursor): psycopg2 cursor
+            target_table (str): loans table name
+        """
+
+        self.create_tables(cursor, target_table)
+
+        for rollup in self.rollups:
+            rollup_table = sql.Identifier(self.table_name(target_table, rollup))
+
+            cursor.execute(sql.SQL("TRUNCATE {}").format(rollup_table))
+            cursor.execute(
+                sql.SQL("INSERT INTO {} {}").format(
+                    rollup_table,
+                    self._aggregate(self._select_rows(sql.Identifier(target_table), rollup), rollup)
+                )
+            )
+
+    def apply_batch(
+        self,
+        cursor: PsycopgExtension.cursor,
+        target_table: str,
+        staging_table: str,
+        conflict_columns: List[str],
+        mode: str = REPLACE
+    ):
+        """
+        Fold a staged batch into the rollup tables, must run before the batch is merged into the target table
+
+        Params:
+            cursor (PsycopgCursor): psycopg2 cursor
+            target_table (str): loans table name
+            staging_table (str): staging table holding the batch
+            conflict_columns (list of str): unique key of the target table
+            mode (str, optional): how the batch is merged:
+                REPLACE, existing rows are overwritten (ON CONFLICT DO UPDATE), their aggregates are subtracted
+                SKIP, existing rows are kept (ON CONFLICT DO NOTHING), only new rows are added
+                APPEND, every row is inserted
+        """
+
+        if mode not in (self.APPEND, self.REPLACE, self.SKIP):
+            raise ValueError(f"unknown mode: {mode}")
+
+        target = sql.Identifier(target_table)
+        staging = sql.Identifier(staging_table)
+        matches_staging = sql.SQL("EXISTS (SELECT 1 FROM {} AS staged WHERE {})").format(
+            staging,
+            sql.SQL(" AND ").join(
+                sql.SQL("staged.{} = loans_row.{}").format(sql.Identifier(column), sql.Identifier(column))
+                for column in conflict_columns
+            )
+        )
+        matches_target = sql.SQL("EXISTS (SELECT 1 FROM {} AS existing WHERE {})").format(
+            target,
+            sql.SQL(" AND ").join(
+                sql.SQL("existing.{} = loans_row.{}").format(sql.Identifier(column), sql.Identifier(column))
+                for column in conflict_columns
+            )
+        )
+
+        for rollup in self.rollups:
+            rollup_table = sql.Identifier(self.table_name(target_table, rollup))
+            group_columns = list(self.GROUP_EXPRESSIONS[rollup])
+            measures = list(self.measures(rollup))
+
+            if mode == self.SKIP:
+                rows_query = sql.SQL("{} WHERE NOT {}").format(self._select_rows(staging, rollup), matches_target)
+            else:
+                rows_query = self._select_rows(staging, rollup)
+            if mode == self.REPLACE:
+                rows_query = sql.SQL("{} UNION ALL {} WHERE {}").format(
+                    rows_query,
+                    self._select_rows(target, rollup, sign=-1),
+                    matches_staging
+                )
+
+            cursor.execute(
+                sql.SQL("INSERT INTO {} AS rollup ({}) {} ON CONFLICT ({}) DO UPDATE SET {}").format(
+                    rollup_table,
+                    sql.SQL(", ").join(map(sql.Identifier, group_columns + measures)),
+                    self._aggregate(rows_query, rollup),
+                    sql.SQL(", ").join(map(sql.Identifier, group_columns)),
+                    sql.SQL(", ").join(
+                        sql.SQL("{} = rollup.{} + EXCLUDED.{}").format(
+                            sql.Identifier(measure), sql.Identifier(measure), sql.Identifier(measure)
+                        )
+                        for measure in measures
+                    )
+                )
+            )
+
+            # groups whose every loan was replaced by loans of another group
+            cursor.execute(sql.SQL("DELETE FROM {} WHERE loans = 0").format(rollup_table))
@@ -0,0 +1,205 @@
+import os
+from typing import Iterator, Union
+
+import polars as pl
+
+from pipeline.constants import Constants
+from pipeline.helpers.cleaning import DataCleaningService
+from pipeline.helpers.streaming import CsvStreamingService
+from pipeline.models.incremental_report import IncrementalCleaningReport
+
+class IncrementalCleaningService(CsvStreamingService):
+    """
+    Re-clean only the loans that changed since the previous run
+
+    A state file next to the cleaned CSV keeps one content hash per raw row, keyed on loannr_chkdgt.
+    A new run hashes the raw input, re-cleans the loans whose hashes differ (new, changed or
+    with a different number of rows) and merges them into the previous cleaned output.
+    Loans missing from the new input are dropped from the output.
+
+    Row hashes are only stable within one polars version, so the state records the polars version
+    and DataCleaningService.RULES_VERSION, and any mismatch triggers a full rebuild
+    """
+
+    HASH_COLUMN = "row_hash"
+    ROW_COUNT_COLUMN = "row_count"
+
+    def __init__(self, cleaning_service: Union[DataCleaningService, None] = None, memory_limit_mb: int = 256):
+        """
+        Params:
+            cleaning_service (DataCleaningService or None, optional): service running the cleaning rules
+            memory_limit_mb (int, optional): memory ceiling of one chunk, drives the chunk size
+        """
+
+        super().__init__(cleaning_service, memory_limit_mb)
+
+    def _state_metadata(self) -> dict:
+        """
+        Returns:
+            dict: parquet metadata a state must carry to be reused
+        """
+
+        return {
+            "polars_version": pl.__version__,
+            "rules_version": str(self.cleaning_service.RULES_VERSION),
+        }
+
+    def _hash_chunk(self, chunk: pl.DataFrame) -> pl.DataFrame:
+        """
+        Params:
+            chunk (pl.DataFrame): raw chunk
+
+        Returns:
+            pl.DataFrame: loannr_chkdgt and the content hash of each row
+        """
+
+        return pl.DataFrame({
+            Constants.LOAN_ID: chunk.get_column(Constants.LOAN_ID),
+            self.HASH_COLUMN: chunk.select(sorted(chunk.columns)).hash_rows(),
+        })
+
+    def _read_state(self, state_path: str) -> Union[pl.DataFrame, None]:
+        """
+        Params:
+            state_path (str): state parquet path
+
+        Returns:
+            pl.DataFrame or None: previous state, None if it is missing or was written by another version
+        """
+
+        if not os.path.exists(state_path):
+            return None
+
+        metadata = pl.read_parquet_metadata(state_path)
+        if any(metadata.get(key) != value for key, value in self._state_metadata().items()):
+            return None
+
+        return pl.read_parquet(state_path)
+
+    def build_state(self, source_path: str) -> pl.DataFrame:
+        """
+        Params:
+            source_path (str): raw CSV path
+
+        Returns:
+            pl.DataFrame: distinct (loannr_chkdgt, row_hash) pairs with their number of rows
+        """
+
+        hashes = [self._hash_chunk(chunk) for chunk in self.iter_chunks(source_path)]
+        hashes_df = pl.concat(hashes) if hashes else pl.DataFrame(
+            schema={Constants.LOAN_ID: pl.String, self.HASH_COLUMN: pl.UInt64}
+        )
+
+        return (
+            hashes_df
+                .group_by(Constants.LOAN_ID, self.HASH_COLUMN)
+                .agg(pl.len().alias(self.ROW_COUNT_COLUMN))
+                .sort(Constants.LOAN_ID, self.HASH_COLUMN, nulls_last=True)
+        )
+
+    def _changed_loan_ids(self, previous_state: pl.DataFrame, state: pl.DataFrame) -> pl.DataFrame:
+        """
+        Params:
+            previous_state (pl.DataFrame): state of the previous run
+            state (pl.DataFrame): state of the new input
+
+        Returns:
+            pl.DataFrame: loannr_chkdgt of loans added, changed or removed since the previous run
+        """
+
+        key_columns = [Constants.LOAN_ID, self.HASH_COLUMN, self.ROW_COUNT_COLUMN]
+
+        return pl.concat([
+            state.join(previous_state, on=key_columns, how="anti", nulls_equal=True),
+            previous_state.join(state, on=key_columns, how="anti", nulls_equal=True),
+        ]).select(Constants.LOAN_ID).unique()
+
+    def _filter_loans(self, chunks: Iterator[pl.DataFrame], loan_ids: pl.DataFrame) -> Iterator[pl.DataFrame]:
+        """
+        Params:
+            chunks (iterator of pl.DataFrame): raw chunks
+            loan_ids (pl.DataFrame): loannr_chkdgt to keep
+
+        Returns:
+            iterator of pl.DataFrame: rows of the given loans, in input order
+        """
+
+        for chunk in chunks:
+            changed_chunk = chunk.join(loan_ids, on=Constants.LOAN_ID, how="semi", nulls_equal=True)
+            if changed_chunk.height > 0:
+                yield changed_chunk
+
+    def clean_csv(
+        self,
+        source_path: str,
+        destination_path: str,
+        sort_by_loan_id: bool = False,
+        state_path: Union[str, None] = None
+    ) -> IncrementalCleaningReport:
+        """
+        Refresh the cleaned CSV at destination_path from the raw CSV, re-cleaning only changed loans.
+        Without a usable state or previous output, everything is cleaned
+
+        Params:
+            source_path (str): raw CSV path
+            destination_path (str): cleaned CSV path, holds the previous run's output if any
+            sort_by_loan_id (bool, optional): stable sort the cleaned rows by loannr_chkdgt,
+                otherwise reused rows keep their order and re-cleaned rows are appended
+            state_path (str or None, optional): state parquet path, defaults to <destination_path>.state.parquet
+
+        Returns:
+            IncrementalCleaningReport: number of re-cleaned and reused rows
+        """
+
+        state_path = state_path or f"{destination_path}.state.parquet"
+        previous_state = self._read_state(state_path) if os.path.exists(destination_path) else None
+        state = self.build_state(source_path)
+        input_rows = int(state.get_column(self.ROW_COUNT_COLUMN).sum())
+
+        if previous_state is None:
+            cleaned_rows = super().clean_csv(source_path, destination_path, sort_by_loan_id)
+            state.write_parquet(state_path, metadata=self._state_metadata())
+
+            return IncrementalCleaningReport(
+                input_rows=input_rows,
+                cleaned_rows=cleaned_rows,
+                reused_rows=0,
+                removed_loans=0,
+                full_rebuild=True
+            )
+
+        changed_loan_ids = self._changed_loan_ids(previous_state, state)
+        removed_loans = changed_loan_ids.join(state, on=Constants.LOAN_ID, how="anti", nulls_equal=True).height
+
+        changed_path = f"{destination_path}.changed"
+        merged_path = f"{destination_path}.merged"
+
+        with open(changed_path, "wb") as destination:
+            cleaned_rows = self.write_chunks(
+                self.clean_chunks(self._filter_loans(self.iter_chunks(source_path), changed_loan_ids)),
+                destination
+            )
+
+        reused_path = f"{destination_path}.reused"
+        (
+            pl.scan_csv(destination_path, infer_schema=False)
+                .join(changed_loan_ids.lazy(), on=Constants.LOAN_ID, how="anti", nulls_equal=True, maintain_order="left")
+                .sink_csv(reused_path)
+        )
+        reused_rows = input_rows - cleaned_rows
+
+        merged_paths = [reused_path, changed_path] if cleaned_rows > 0 else [reused_path]
+        self.merge_cleaned_csv(merged_paths, merged_path, sort_by_loan_id)
+        os.replace(merged_path, destination_path)
+        os.remove(reused_path)
+        os.remove(changed_path)
+
+        state.write_parquet(state_path, metadata=self._state_metadata())
+
+        return IncrementalCleaningReport(
+            input_rows=input_rows,
+            cleaned_rows=cleaned_rows,
+            reused_rows=reused_rows,
+            removed_loans=removed_loans,
+            full_rebuild=False
+        )
@@ -0,0 +1,301 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, List, Union
+
+import polars as pl
+
+from pipeline.constants import Constants
+from pipeline.helpers.parallel import ParallelCleaningService
+from pipeline.helpers.streaming import CsvStreamingService
+from pipeline.models.loan_id_report import LoanIdReport
+
+def _index_shard(source_path: str, start_offset: int, end_offset: int, memory_limit_mb: int) -> pl.DataFrame:
+    """
+    Process pool entry point, indexes one byte range of the raw CSV
+
+    Params:
+        source_path (str): raw CSV path
+        start_offset (int): row start offset of the shard
+        end_offset (int): row start offset right after the shard
+        memory_limit_mb (int): memory ceiling of one chunk
+
+    Returns:
+        pl.DataFrame: loan id index of the shard
+    """
+
+    loan_id_service = LoanIdService(memory_limit_mb=memory_limit_mb)
+    return loan_id_service.build_index(loan_id_service.iter_chunks(source_path, start_offset, end_offset))
+
+class LoanIdService(CsvStreamingService):
+    """
+    Check digit verification and duplicate detection of loannr_chkdgt, chunk by chunk
+
+    loannr_chkdgt is a 7 digit loan number followed by a 3 digit check value, 000 to 010. The SBA doesn't
+    publish the scheme, the default one is solved from the loan ids of the EDA notebook, all of which it fits:
+    with d_p the loan number digits from the right (p = 0 to 6), the check value is
+    sum(d_p * w_p) mod 11 with the weights w = 7, 3, 6, 2, 4, 8, 5. Use the constructor parameters
+    if another scheme turns out to fit better
+
+    Duplicates are found with a hash index of (loannr_chkdgt, row hash, rows) built from the chunks,
+    so memory grows with the number of distinct loans, not with the dataset. A loan id with one row hash
+    and several rows is an exact duplicate, one with several row hashes is a conflicting duplicate.
+    Indexes of separate shards (byte ranges of the CSV, or files) are combined with merge_indexes
+
+    Usage:
+        loan_id_service = LoanIdService()
+        report = loan_id_service.check_csv("notebook/dataset/SBAnational.csv", workers=4)
+        df.filter(loan_id_service.is_valid_check_digit(pl.col("loannr_chkdgt")).not_())
+    """
+
+    HASH_COLUMN = "row_hash"
+    ROW_COUNT_COLUMN = "row_count"
+    ROW_HASH_COUNT_COLUMN = "row_hashes"
+    INDEX_SCHEMA = {Constants.LOAN_ID: pl.String, HASH_COLUMN: pl.UInt64, ROW_COUNT_COLUMN: pl.UInt32}
+
+    LOAN_NUMBER_DIGITS = 7
+    CHECK_DIGITS = 3
+    CHECK_DIGIT_MODULUS = 11
+    # weight of each loan number digit, from the rightmost one
+    CHECK_DIGIT_WEIGHTS = (7, 3, 6, 2, 4, 8, 5)
+
+    def __init__(
+        self,
+        memory_limit_mb: int = 256,
+        check_digit_weights: Union[List[int], None] = None,
+        check_digit_modulus: int = CHECK_DIGIT_MODULUS
+    ):
+        """
+        Params:
+            memory_limit_mb (int, optional): memory ceiling of one chunk, drives the chunk size
+            check_digit_weights (list of int or None, optional): weight of each loan number digit,
+                from the rightmost one, defaults to CHECK_DIGIT_WEIGHTS
+            check_digit_modulus (int, optional): modulus of the weighted sum
+        """
+
+        super().__init__(memory_limit_mb=memory_limit_mb)
+        self.memory_limit_mb = memory_limit_mb
+
+        self.check_digit_weights = list(check_digit_weights or self.CHECK_DIGIT_WEIGHTS)
+        if len(self.check_digit_weights) != self.LOAN_NUMBER_DIGITS:
+            raise ValueError(f"check_digit_weights must hold {self.LOAN_NUMBER_DIGITS} weights")
+
+        self.check_digit_modulus = check_digit_modulus
+
+    def expected_check_digit(self, loan_id: pl.Expr) -> pl.Expr:
+        """
+        Params:
+            loan_id (pl.Expr): loan ids, strings or integers
+
+        Returns:
+            pl.Expr: check value the loan number should carry, null when the id isn't 10 digits
+        """
+
+        loan_id = loan_id.cast(pl.String).str.strip_chars()
+        weighted_sum = pl.sum_horizontal(
+            loan_id.str.slice(self.LOAN_NUMBER_DIGITS - 1 - position, 1).cast(pl.Int64, strict=False) * weight
+            for position, weight in enumerate(self.check_digit_weights)
+        )
+
+        return (
+            pl.when(loan_id.str.contains(rf"^[0-9]{{{self.LOAN_NUMBER_DIGITS + self.CHECK_DIGITS}}}$"))
+                .then(weighted_sum % self.check_digit_modulus)
+        )
+
+    def is_valid_check_digit(self, loan_id: pl.Expr) -> pl.Expr:
+        """
+        Params:
+            loan_id (pl.Expr): loan ids
+
+        Returns:
+            pl.Expr: True when the last 3 digits are the expected check value, null for null ids
+        """
+
+        check_digits = loan_id.cast(pl.String).str.strip_chars().str.slice(-self.CHECK_DIGITS).cast(pl.Int64, strict=False)
+
+        return (
+            pl.when(loan_id.is_not_null())
+                .then(check_digits.eq(self.expected_check_digit(loan_id)).fill_null(False))
+        )
+
+    def _index_chunk(self, chunk: pl.DataFrame) -> pl.DataFrame:
+        """
+        Params:
+            chunk (pl.DataFrame): raw chunk
+
+        Returns:
+            pl.DataFrame: distinct (loannr_chkdgt, row_hash) pairs of the chunk with their number of rows
+        """
+
+        return (
+            pl.DataFrame({
+                Constants.LOAN_ID: chunk.get_column(Constants.LOAN_ID),
+                # same hash as IncrementalCleaningService, column order doesn't matter
+                self.HASH_COLUMN: chunk.select(sorted(chunk.columns)).hash_rows(),
+            })
+                .group_by(Constants.LOAN_ID, self.HASH_COLUMN)
+                .agg(pl.len().cast(pl.UInt32).alias(self.ROW_COUNT_COLUMN))
+        )
+
+    def merge_indexes(self, indexes: List[pl.DataFrame]) -> pl.DataFrame:
+        """
+        Params:
+            indexes (list of pl.DataFrame): indexes of chunks or shards, a loan id may appear in several
+
+        Returns:
+            pl.DataFrame: one index with the row counts summed per (loannr_chkdgt, row_hash)
+        """
+
+        if not indexes:
+            return pl.DataFrame(schema=self.INDEX_SCHEMA)
+
+        return (
+            pl.concat(indexes)
+                .group_by(Constants.LOAN_ID, self.HASH_COLUMN)
+                .agg(pl.col(self.ROW_COUNT_COLUMN).sum())
+        )
+
+    def build_index(self, chunks: Iterator[pl.DataFrame]) -> pl.DataFrame:
+        """
+        Params:
+            chunks (iterator of pl.DataFrame): raw chunks
+
+        Returns:
+            pl.DataFrame: loannr_chkdgt, row_hash and row_count of every distinct row hash
+        """
+
+        index = pl.DataFrame(schema=self.INDEX_SCHEMA)
+        pending_indexes = []
+        pending_rows = 0
+
+        for chunk in chunks:
+            chunk_index = self._index_chunk(chunk)
+            pending_indexes.append(chunk_index)
+            pending_rows += chunk_index.height
+
+            # compact once the pending chunks outgrow the index, so merging stays linear overall
+            if pending_rows > index.height:
+                index = self.merge_indexes([index] + pending_indexes)
+                pending_indexes = []
+                pending_rows = 0
+
+        return self.merge_indexes([index] + pending_indexes)
+
+    def build_index_csv(self, source_path: str, workers: int = 1) -> pl.DataFrame:
+        """
+        Params:
+            source_path (str): raw CSV path
+            workers (int, optional): processes indexing byte ranges of the file
+
+        Returns:
+            pl.DataFrame: loan id index of the whole file
+        """
+
+        if workers <= 1:
+            return self.build_index(self.iter_chunks(source_path))
+
+        row_ranges = ParallelCleaningService(workers).split_row_ranges(source_path, workers)
+
+        # polars' thread pool doesn't survive fork, workers must be spawned
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+            futures = [
+                executor.submit(_index_shard, source_path, start_offset, end_offset, self.memory_limit_mb)
+                for start_offset, end_offset in row_ranges
+            ]
+            return self.merge_indexes([future.result() for future in futures])
+
+    def duplicates(self, index: pl.DataFrame) -> pl.DataFrame:
+        """
+        Params:
+            index (pl.DataFrame): loan id index
+
+        Returns:
+            pl.DataFrame: repeated loan ids with their row_count, number of distinct row_hashes
+                and whether the rows conflict
+        """
+
+        return (
+            index
+                .filter(pl.col(Constants.LOAN_ID).is_not_null())
+                .group_by(Constants.LOAN_ID)
+                .agg(
+                    pl.col(self.ROW_COUNT_COLUMN).sum(),
+                    pl.len().cast(pl.UInt32).alias(self.ROW_HASH_COUNT_COLUMN),
+                )
+                .filter(pl.col(self.ROW_COUNT_COLUMN).gt(1))
+                .with_columns(pl.col(self.ROW_HASH_COUNT_COLUMN).gt(1).alias("conflicting"))
+                .sort(Constants.LOAN_ID)
+        )
+
+    def report(self, index: pl.DataFrame) -> LoanIdReport:
+        """
+        Params:
+            index (pl.DataFrame): loan id index
+
+        Returns:
+            LoanIdReport: counts of missing, invalid and duplicated loan ids
+        """
+
+        duplicates = self.duplicates(index)
+        loan_id = pl.col(Constants.LOAN_ID)
+
+        counts = index.select(
+            pl.col(self.ROW_COUNT_COLUMN).sum().alias("rows"),
+            loan_id.drop_nulls().n_unique().alias("distinct_loan_ids"),
+            pl.col(self.ROW_COUNT_COLUMN).filter(loan_id.is_null()).sum().alias("missing_loan_ids"),
+            pl.col(self.ROW_COUNT_COLUMN).filter(self.is_valid_check_digit(loan_id).not_()).sum().alias("invalid_check_digits"),
+        ).row(0, named=True)
+
+        return LoanIdReport(
+            **counts,
+            exact_duplicate_ids=duplicates.filter(pl.col("conflicting").not_()).height,
+            conflicting_duplicate_ids=duplicates.filter(pl.col("conflicting")).height
+        )
+
+    def write_duplicate_rows(self, source_path: str, duplicates: pl.DataFrame, destination_path: str) -> int:
+        """
+        Stream the raw rows of the duplicated loan ids into a CSV, chunk by chunk
+
+        Params:
+            source_path (str): raw CSV path
+            duplicates (pl.DataFrame): output of duplicates, filter it to keep only the conflicting ids
+            destination_path (str): duplicate rows CSV path
+
+        Returns:
+            int: number of written rows
+        """
+
+        loan_ids = duplicates.select(Constants.LOAN_ID)
+        duplicate_chunks = (
+            chunk.join(loan_ids, on=Constants.LOAN_ID, how="semi") for chunk in self.iter_chunks(source_path)
+        )
+
+        with open(destination_path, "wb") as destination:
+            # most chunks hold no duplicate, only the header of the first written one is kept
+            return self.write_chunks((chunk for chunk in duplicate_chunks if chunk.height > 0), destination)
+
+    def check_csv(
+        self,
+        source_path: str,
+        workers: int = 1,
+        duplicates_path: Union[str, None] = None
+    ) -> LoanIdReport:
+        """
+        Params:
+            source_path (str): raw CSV path
+            workers (int, optional): processes indexing byte ranges of the file
+            duplicates_path (str or None, optional): CSV the rows of the conflicting loan ids are written to
+
+        Returns:
+            LoanIdReport: counts of missing, invalid and duplicated loan ids
+        """
+
+        index = self.build_index_csv(source_path, workers)
+
+        if duplicates_path is not None:
+            self.write_duplicate_rows(
+                source_path,
+                self.duplicates(index).filter(pl.col("conflicting")),
+                duplicates_path
+            )
+
+        return self.report(index)
@@ -0,0 +1,104 @@
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Tuple, Union
+
+from pipeline.helpers.streaming import CsvStreamingService
+
+def _clean_shard(source_path: str, start_offset: int, end_offset: int, shard_path: str, memory_limit_mb: int) -> int:
+    """
+    Process pool entry point, cleans one byte range of the raw CSV into its own shard file
+
+    Params:
+        source_path (str): raw CSV path
+        start_offset (int): row start offset of the shard
+        end_offset (int): row start offset right after the shard
+        shard_path (str): cleaned shard CSV path
+        memory_limit_mb (int): memory ceiling of one chunk
+
+    Returns:
+        int: number of cleaned rows
+    """
+
+    streaming_service = CsvStreamingService(memory_limit_mb=memory_limit_mb)
+    chunks = streaming_service.iter_chunks(source_path, start_offset, end_offset)
+
+    with open(shard_path, "wb") as destination:
+        return streaming_service.write_chunks(streaming_service.clean_chunks(chunks), destination)
+
+class ParallelCleaningService:
+    """
+    Clean a raw SBA loans CSV across cores: the file is split by byte range on row boundaries,
+    each shard is cleaned in a process pool and the shards are merged back
+    """
+
+    def __init__(self, workers: Union[int, None] = None, memory_limit_mb: int = 256):
+        """
+        Params:
+            workers (int or None, optional): number of worker processes, defaults to the cpu count
+            memory_limit_mb (int, optional): memory ceiling of one chunk, per worker
+        """
+
+        self.workers = workers or os.cpu_count() or 1
+        self.memory_limit_mb = memory_limit_mb
+
+    def split_row_ranges(self, source_path: str, shards: int) -> List[Tuple[int, int]]:
+        """
+        Params:
+            source_path (str): raw CSV path
+            shards (int): wanted number of shards
+
+        Returns:
+            list of (int, int): (start offset, end offset) of each shard, both aligned on row starts
+        """
+
+        with open(source_path, "rb") as source:
+            source.readline()
+            data_start = source.tell()
+            file_size = os.fstat(source.fileno()).st_size
+
+            boundaries = [data_start]
+            for i in range(1, shards):
+                offset = data_start + (file_size - data_start) * i // shards
+
+                # move the boundary to the start of the row holding offset - 1
+                source.seek(offset - 1)
+                source.readline()
+                boundaries.append(min(source.tell(), file_size))
+            boundaries.append(file_size)
+
+        boundaries = sorted(set(boundaries))
+        return list(zip(boundaries[:-1], boundaries[1:]))
+
+    def clean_csv(self, source_path: str, destination_path: str, sort_by_loan_id: bool = True) -> int:
+        """
+        Output matches CsvStreamingService.clean_csv run with the same sort_by_loan_id
+
+        Params:
+            source_path (str): raw CSV path
+            destination_path (str): cleaned CSV path
+            sort_by_loan_id (bool, optional): merge the shards in loannr_chkdgt order,
+                otherwise the shards are concatenated in input order
+
+        Returns:
+            int: number of cleaned rows
+        """
+
+        row_ranges = self.split_row_ranges(source_path, self.workers)
+        destination_dir = os.path.dirname(os.path.abspath(destination_path))
+
+        with tempfile.TemporaryDirectory(dir=destination_dir) as shard_dir:
+            shard_paths = [os.path.join(shard_dir, f"shard_{i}.csv") for i in range(len(row_ranges))]
+
+            # polars' thread pool doesn't survive fork, workers must be spawned
+            with ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+                futures = [
+                    executor.submit(_clean_shard, source_path, start_offset, end_offset, shard_path, self.memory_limit_mb)
+                    for (start_offset, end_offset), shard_path in zip(row_ranges, shard_paths)
+                ]
+                cleaned_rows = sum(future.result() for future in futures)
+
+            CsvStreamingService.merge_cleaned_csv(shard_paths, destination_path, sort_by_loan_id)
+
+        return cleaned_rows
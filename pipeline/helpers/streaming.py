@@ -0,0 +1,217 @@
+import io
+import os
+import shutil
+from typing import BinaryIO, Iterator, List, Tuple, Union
+
+import polars as pl
+
+from pipeline.constants import Constants
+from pipeline.helpers.cleaning import DataCleaningService
+
+class CsvStreamingService:
+    """
+    Clean a raw SBA loans CSV chunk by chunk, so memory stays bounded regardless of the file size
+
+    The file is split on line boundaries, so quoted values must not contain line breaks
+    """
+
+    # raw bytes of a chunk grow roughly this much once parsed, cleaned and serialized again
+    MEMORY_EXPANSION_FACTOR = 8
+
+    def __init__(self, cleaning_service: Union[DataCleaningService, None] = None, memory_limit_mb: int = 256):
+        """
+        Params:
+            cleaning_service (DataCleaningService or None, optional): service running the cleaning rules
+            memory_limit_mb (int, optional): memory ceiling of one chunk, drives the chunk size
+        """
+
+        if memory_limit_mb <= 0:
+            raise ValueError("memory_limit_mb must be positive")
+
+        self.cleaning_service = cleaning_service or DataCleaningService()
+        self.chunk_size_bytes = max(memory_limit_mb * 1024 * 1024 // self.MEMORY_EXPANSION_FACTOR, 1024)
+
+    def _read_header(self, source: BinaryIO) -> bytes:
+        """
+        Params:
+            source (BinaryIO): raw CSV file positioned at the start
+
+        Returns:
+            bytes: header line including its line break
+        """
+
+        header = source.readline()
+        if not header.endswith(b"\n"):
+            header += b"\n"
+        return header
+
+    def _iter_row_blocks(self, source: BinaryIO, start_offset: int, end_offset: int) -> Iterator[Tuple[int, bytes]]:
+        """
+        Params:
+            source (BinaryIO): raw CSV file
+            start_offset (int): offset of the first row to read, must be a row start
+            end_offset (int): offset right after the last row to read, must be a row start or the file size
+
+        Returns:
+            iterator of (int, bytes): byte offset of the block and the block holding whole rows only
+        """
+
+        source.seek(start_offset)
+        block_offset = start_offset
+        position = start_offset
+        remainder = b""
+
+        while position < end_offset:
+            data = source.read(min(self.chunk_size_bytes, end_offset - position))
+            if not data:
+                break
+            position += len(data)
+            data = remainder + data
+
+            cut = data.rfind(b"\n") + 1
+            if cut == 0:
+                remainder = data
+                continue
+
+            yield block_offset, data[:cut]
+            block_offset += cut
+            remainder = data[cut:]
+
+        if remainder:
+            yield block_offset, remainder
+
+    def _parse_block(self, header: bytes, block: bytes) -> pl.DataFrame:
+        """
+        Params:
+            header (bytes): header line of the CSV
+            block (bytes): whole rows of the CSV
+
+        Returns:
+            pl.DataFrame: rows as string columns named after Constants
+        """
+
+        df = pl.read_csv(io.BytesIO(header + block), infer_schema=False)
+        return df.rename({column: column.lower() for column in df.columns})
+
+    def iter_chunks(
+        self,
+        source_path: str,
+        start_offset: Union[int, None] = None,
+        end_offset: Union[int, None] = None
+    ) -> Iterator[pl.DataFrame]:
+        """
+        Params:
+            source_path (str): raw CSV path
+            start_offset (int or None, optional): row start offset to read from, defaults to the first row
+            end_offset (int or None, optional): row start offset to stop at, defaults to the end of the file
+
+        Returns:
+            iterator of pl.DataFrame: raw chunks with string columns named after Constants
+        """
+
+        with open(source_path, "rb") as source:
+            header = self._read_header(source)
+
+            if start_offset is None:
+                start_offset = source.tell()
+            if end_offset is None:
+                end_offset = source.seek(0, io.SEEK_END)
+
+            for _, block in self._iter_row_blocks(source, start_offset, end_offset):
+                yield self._parse_block(header, block)
+
+    def clean_chunks(self, chunks: Iterator[pl.DataFrame]) -> Iterator[pl.DataFrame]:
+        """
+        Params:
+            chunks (iterator of pl.DataFrame): raw chunks
+
+        Returns:
+            iterator of pl.DataFrame: cleaned chunks
+        """
+
+        for chunk in chunks:
+            yield self.cleaning_service.inspect_frame(chunk)
+
+    def write_chunks(self, chunks: Iterator[pl.DataFrame], destination: BinaryIO, include_header: bool = True) -> int:
+        """
+        Params:
+            chunks (iterator of pl.DataFrame): cleaned chunks
+            destination (BinaryIO): writable binary file
+            include_header (bool, optional): write the header before the first chunk
+
+        Returns:
+            int: number of written rows
+        """
+
+        written_rows = 0
+        # chunks can be empty (filtered, fully quarantined), so the row count can't tell if the header is out
+        header_written = not include_header
+        for chunk in chunks:
+            chunk.write_csv(destination, include_header=not header_written)
+            header_written = True
+            written_rows += chunk.height
+        return written_rows
+
+    @staticmethod
+    def merge_cleaned_csv(source_paths: List[str], destination_path: str, sort_by_loan_id: bool = False):
+        """
+        Merge cleaned CSV files written by write_chunks. A file is empty when write_chunks got no chunk,
+        ex: a shard without rows, otherwise it starts with the header
+
+        Params:
+            source_paths (list of str): cleaned CSV paths, in input order
+            destination_path (str): merged CSV path
+            sort_by_loan_id (bool, optional): stable sort the rows by loannr_chkdgt,
+                otherwise the files are concatenated as they are
+        """
+
+        source_paths = [source_path for source_path in source_paths if os.path.getsize(source_path) > 0]
+
+        if sort_by_loan_id and source_paths:
+            (
+                pl.scan_csv(source_paths, infer_schema=False)
+                    .sort(
+                        pl.col(Constants.LOAN_ID).cast(pl.Int64, strict=False),
+                        pl.col(Constants.LOAN_ID),
+                        nulls_last=True,
+                        maintain_order=True
+                    )
+                    .sink_csv(destination_path)
+            )
+            return
+
+        header = None
+        with open(destination_path, "wb") as destination:
+            for source_path in source_paths:
+                with open(source_path, "rb") as source:
+                    first_line = source.readline()
+                    if header is None:
+                        header = first_line
+                        destination.write(header)
+                    elif first_line != header:
+                        raise ValueError(f"{source_path} doesn't start with the header of {source_paths[0]}")
+                    shutil.copyfileobj(source, destination)
+
+    def clean_csv(self, source_path: str, destination_path: str, sort_by_loan_id: bool = False) -> int:
+        """
+        Stream the raw CSV through DataCleaningService.inspect_frame into a cleaned CSV
+
+        Params:
+            source_path (str): raw CSV path
+            destination_path (str): cleaned CSV path
+            sort_by_loan_id (bool, optional): stable sort the cleaned rows by loannr_chkdgt
+
+        Returns:
+            int: number of cleaned rows
+        """
+
+        unsorted_path = f"{destination_path}.unsorted" if sort_by_loan_id else destination_path
+
+        with open(unsorted_path, "wb") as destination:
+            cleaned_rows = self.write_chunks(self.clean_chunks(self.iter_chunks(source_path)), destination)
+
+        if sort_by_loan_id:
+            self.merge_cleaned_csv([unsorted_path], destination_path, sort_by_loan_id=True)
+            os.remove(unsorted_path)
+
+        return cleaned_rows
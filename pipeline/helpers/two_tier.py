@@ -0,0 +1,313 @@
+import csv
+import os
+from typing import BinaryIO, Iterator, List, Tuple, Union
+
+import polars as pl
+
+from pipeline.constants import Constants
+from pipeline.helpers.cleaning import DataCleaningService
+from pipeline.helpers.commons.utils import Utils
+from pipeline.helpers.streaming import CsvStreamingService
+
+class TwoTierCleaningService(CsvStreamingService):
+    """
+    Clean a raw SBA loans CSV in two tiers:
+    - fast tier: rows whose integer, date and amount values all pass a strict typed parse
+      go through DataCleaningService.inspect_frame
+    - slow tier: the remaining rows are coerced value by value and go through DataCleaningService.inspect_row
+
+    Rows failing both tiers are written to a quarantine CSV with their byte offset in the source file.
+    Each non-empty line is one row: empty lines are skipped and quoted line breaks aren't supported
+    """
+
+    ROW_INDEX_COLUMN = "__row_index"
+    QUARANTINE_COLUMNS = ["byte_offset", "error", "raw_row"]
+
+    def __init__(self, cleaning_service: Union[DataCleaningService, None] = None, memory_limit_mb: int = 256):
+        """
+        Params:
+            cleaning_service (DataCleaningService or None, optional): service running the cleaning rules
+            memory_limit_mb (int, optional): memory ceiling of one chunk, drives the chunk size
+        """
+
+        super().__init__(cleaning_service, memory_limit_mb)
+        self.fast_rows = 0
+        self.slow_rows = 0
+        self.quarantined_rows = 0
+
+    def _coerce_integer(self, value: Union[str, None]) -> Union[int, None]:
+        """
+        Params:
+            value (str or None): raw integer value, ex: "2" or "2.0"
+
+        Returns:
+            int or None: parsed value
+
+        Raises:
+            ValueError: the value isn't an integer
+        """
+
+        if value is None:
+            return None
+        try:
+            return int(value)
+        except ValueError:
+            number = float(value)
+            if not number.is_integer():
+                raise ValueError(f"invalid integer literal: {value!r}")
+            return int(number)
+
+    def _strict_failure_expr(self, schema: pl.Schema) -> pl.Expr:
+        """
+        Params:
+            schema (pl.Schema): schema of the raw string chunk
+
+        Returns:
+            pl.Expr: True for rows holding a value the strict typed parse rejects
+        """
+
+        failures = [pl.lit(False)]
+
+        for column in Constants.INTEGER_COLUMNS:
+            if column in schema:
+                failures.append(pl.col(column).is_not_null() & pl.col(column).str.to_integer(strict=False).is_null())
+
+        for column in Constants.DATE_COLUMNS:
+            if column in schema:
+                formatted_date = pl.col(column).map_batches(
+                    self.cleaning_service.date_normalizer.format_raw_date_series,
+                    return_dtype=pl.String
+                )
+                failures.append(pl.col(column).is_not_null() & formatted_date.is_null())
+
+        for column in Constants.AMOUNT_COLUMNS:
+            if column in schema:
+                failures.append(pl.col(column).is_not_null() & Utils.amount_to_cents_expr(column).is_null())
+
+        return pl.any_horizontal(failures)
+
+    def _row_offsets(self, block: bytes) -> List[int]:
+        """
+        Params:
+            block (bytes): whole rows of the CSV
+
+        Returns:
+            list of int: offset of each row start in the block, blank lines are skipped
+        """
+
+        row_offsets = []
+        position = 0
+        while position < len(block):
+            next_line_break = block.find(b"\n", position)
+            line_end = len(block) if next_line_break == -1 else next_line_break + 1
+
+            if block[position:line_end].strip(b"\r\n"):
+                row_offsets.append(position)
+            position = line_end
+        return row_offsets
+
+    @staticmethod
+    def _has_blank_lines(block: bytes) -> bool:
+        """
+        Params:
+            block (bytes): whole rows of the CSV
+
+        Returns:
+            bool: True when the block holds an empty line
+        """
+
+        return block.startswith((b"\n", b"\r\n")) or b"\n\n" in block or b"\n\r\n" in block
+
+    def _drop_blank_lines(self, block: bytes) -> bytes:
+        """
+        Params:
+            block (bytes): whole rows of the CSV
+
+        Returns:
+            bytes: the rows without the empty lines, so the n-th parsed row starts at _row_offsets(block)[n]
+        """
+
+        return b"".join(
+            block[row_offset:block.find(b"\n", row_offset) + 1 or len(block)]
+            for row_offset in self._row_offsets(block)
+        )
+
+    def _parse_block_by_row(
+        self,
+        header: bytes,
+        block: bytes,
+        block_offset: int
+    ) -> Tuple[pl.DataFrame, List[Tuple[int, str, bytes]]]:
+        """
+        Slow parse used when polars rejects the whole block, ex: a row with a wrong number of fields
+
+        Params:
+            header (bytes): header line of the CSV
+            block (bytes): whole rows of the CSV
+            block_offset (int): offset of the block in the source file
+
+        Returns:
+            tuple: (string chunk of the well formed rows, list of (byte offset, error, raw row) of the others)
+        """
+
+        columns = [column.lower() for column in next(csv.reader([header.decode("utf-8")]))]
+        rows = []
+        quarantined = []
+
+        for row_offset in self._row_offsets(block):
+            raw_row = block[row_offset:block.find(b"\n", row_offset) + 1 or len(block)]
+            try:
+                values = next(csv.reader([raw_row.decode("utf-8")], strict=True))
+            except (csv.Error, UnicodeDecodeError, StopIteration) as error:
+                quarantined.append((block_offset + row_offset, f"malformed row: {error}", raw_row))
+                continue
+
+            if len(values) != len(columns):
+                quarantined.append((
+                    block_offset + row_offset,
+                    f"expected {len(columns)} fields, got {len(values)}",
+                    raw_row
+                ))
+                continue
+            rows.append([value if value != "" else None for value in values])
+
+        chunk = pl.DataFrame(rows, schema={column: pl.String for column in columns}, orient="row")
+        return chunk, quarantined
+
+    def _clean_block(
+        self,
+        header: bytes,
+        block: bytes,
+        block_offset: int
+    ) -> Tuple[pl.DataFrame, List[Tuple[int, str, bytes]]]:
+        """
+        Params:
+            header (bytes): header line of the CSV
+            block (bytes): whole rows of the CSV
+            block_offset (int): offset of the block in the source file
+
+        Returns:
+            tuple: (cleaned chunk, list of (byte offset, error, raw row) of the quarantined rows)
+        """
+
+        # byte offsets assume one row per non-empty line: quoted line breaks aren't supported, as in
+        # CsvStreamingService, and empty lines are dropped here rather than left to the CSV reader
+        parsed_block = self._drop_blank_lines(block) if self._has_blank_lines(block) else block
+
+        try:
+            chunk = self._parse_block(header, parsed_block)
+            quarantined = []
+            row_offsets = None
+        except (pl.exceptions.ComputeError, pl.exceptions.ShapeError):
+            chunk, quarantined = self._parse_block_by_row(header, block, block_offset)
+            quarantined_offsets = {offset - block_offset for offset, _, _ in quarantined}
+            row_offsets = [offset for offset in self._row_offsets(block) if offset not in quarantined_offsets]
+
+        parsed_rows = chunk.height
+
+        chunk = chunk.with_row_index(self.ROW_INDEX_COLUMN)
+        is_strict_failure = self._strict_failure_expr(chunk.schema)
+
+        fast_chunk = (
+            chunk
+                .filter(is_strict_failure.not_())
+                .with_columns(
+                    pl.col(column).str.to_integer()
+                    for column in Constants.INTEGER_COLUMNS if column in chunk.schema
+                )
+        )
+        cleaned_chunk = self.cleaning_service.inspect_frame(fast_chunk)
+        self.fast_rows += fast_chunk.height
+
+        slow_rows = []
+        for row in chunk.filter(is_strict_failure).iter_rows(named=True):
+            try:
+                for column in Constants.INTEGER_COLUMNS:
+                    if column in row:
+                        row[column] = self._coerce_integer(row[column])
+                slow_rows.append(self.cleaning_service.inspect_row(row))
+            except (ValueError, TypeError, AttributeError) as error:
+                if row_offsets is None:
+                    row_offsets = self._row_offsets(block)
+                    if len(row_offsets) != parsed_rows:
+                        raise ValueError(
+                            f"block at byte {block_offset} has {len(row_offsets)} lines but {parsed_rows} rows, "
+                            "quoted line breaks aren't supported"
+                        )
+
+                row_offset = row_offsets[row[self.ROW_INDEX_COLUMN]]
+                raw_row = block[row_offset:block.find(b"\n", row_offset) + 1 or len(block)]
+                quarantined.append((block_offset + row_offset, f"{type(error).__name__}: {error}", raw_row))
+
+        if slow_rows:
+            self.slow_rows += len(slow_rows)
+            cleaned_chunk = (
+                pl.concat([
+                    cleaned_chunk,
+                    pl.DataFrame(slow_rows, schema=cleaned_chunk.schema, strict=False)
+                ])
+                .sort(self.ROW_INDEX_COLUMN)
+            )
+
+        self.quarantined_rows += len(quarantined)
+        return cleaned_chunk.drop(self.ROW_INDEX_COLUMN), quarantined
+
+    def _iter_cleaned_chunks(self, source: BinaryIO, quarantine_writer) -> Iterator[pl.DataFrame]:
+        """
+        Params:
+            source (BinaryIO): raw CSV file positioned at the start
+            quarantine_writer (csv.writer or None): writer of the quarantine CSV
+
+        Returns:
+            iterator of pl.DataFrame: cleaned chunks
+        """
+
+        header = self._read_header(source)
+        end_offset = os.fstat(source.fileno()).st_size
+
+        for block_offset, block in self._iter_row_blocks(source, source.tell(), end_offset):
+            cleaned_chunk, quarantined = self._clean_block(header, block, block_offset)
+
+            if quarantine_writer is not None:
+                for byte_offset, error, raw_row in quarantined:
+                    quarantine_writer.writerow([byte_offset, error, raw_row.decode("utf-8", errors="replace").rstrip("\r\n")])
+
+            yield cleaned_chunk
+
+    def clean_csv(
+        self,
+        source_path: str,
+        destination_path: str,
+        sort_by_loan_id: bool = False,
+        quarantine_path: Union[str, None] = None
+    ) -> int:
+        """
+        Params:
+            source_path (str): raw CSV path
+            destination_path (str): cleaned CSV path
+            sort_by_loan_id (bool, optional): stable sort the cleaned rows by loannr_chkdgt
+            quarantine_path (str or None, optional): quarantine CSV path,
+                defaults to the destination path with a .quarantine.csv suffix
+
+        Returns:
+            int: number of cleaned rows
+        """
+
+        if quarantine_path is None:
+            quarantine_path = f"{os.path.splitext(destination_path)[0]}.quarantine.csv"
+
+        unsorted_path = f"{destination_path}.unsorted" if sort_by_loan_id else destination_path
+
+        with open(source_path, "rb") as source, \
+                open(unsorted_path, "wb") as destination, \
+                open(quarantine_path, "w", newline="", encoding="utf-8") as quarantine:
+            quarantine_writer = csv.writer(quarantine)
+            quarantine_writer.writerow(self.QUARANTINE_COLUMNS)
+
+            cleaned_rows = self.write_chunks(self._iter_cleaned_chunks(source, quarantine_writer), destination)
+
+        if sort_by_loan_id:
+            self.merge_cleaned_csv([unsorted_path], destination_path, sort_by_loan_id=True)
+            os.remove(unsorted_path)
+
+        return cleaned_rows
@@ -0,0 +1,14 @@
+from pydantic import BaseModel
+
+class BankCanonicalizationReport(BaseModel):
+    """
+    Outcome of building a bank name lookup table
+    """
+
+    distinct_names: int
+    distinct_keys: int
+    clusters: int
+    candidate_pairs: int
+    matched_pairs: int
+    # comparisons an all pairs scan of the keys of each bankstate would have needed
+    all_pairs: int
@@ -0,0 +1,11 @@
+from pydantic import BaseModel
+
+class BulkLoadBatchReport(BaseModel):
+    """
+    Throughput report of one bulk loaded batch
+    """
+
+    batch_number: int
+    rows: int
+    seconds: float
+    rows_per_second: float
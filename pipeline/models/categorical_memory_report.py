@@ -0,0 +1,23 @@
+from typing import List
+
+from pydantic import BaseModel
+
+class ColumnMemoryModel(BaseModel):
+    """
+    Memory of one column as strings and dictionary encoded
+    """
+
+    column: str
+    categories: int
+    string_bytes: int
+    encoded_bytes: int
+
+class CategoricalMemoryReport(BaseModel):
+    """
+    Memory saved by dictionary encoding the categorical columns
+    """
+
+    rows: int
+    columns: List[ColumnMemoryModel]
+    string_bytes: int
+    encoded_bytes: int
@@ -0,0 +1,12 @@
+from pydantic import BaseModel
+
+class IncrementalCleaningReport(BaseModel):
+    """
+    Outcome of one incremental cleaning run
+    """
+
+    input_rows: int
+    cleaned_rows: int
+    reused_rows: int
+    removed_loans: int
+    full_rebuild: bool
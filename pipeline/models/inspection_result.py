@@ -1,5 +1,10 @@
+from array import array
 from pydantic import BaseModel
-from typing import Optional, Union
+from typing import Iterator, List, Optional, Union
+
+import polars as pl
+
+from pipeline.models.verify_reason import VerifyReasonRegistry
 
 class InspectionResultModel(BaseModel):
     """
@@ -7,6 +12,172 @@ class InspectionResultModel(BaseModel):
     """
 
     needs_to_verify: bool
-    actual_value: Union[str, int, float]
+    actual_value: Union[str, int, float, None]
     verify_reason: Optional[str] = None
-    value_to_assign: Union[str, int, None] = None
\ No newline at end of file
+    value_to_assign: Union[str, int, None] = None
+
+class InspectionResultRow:
+    """
+    Lightweight read only view of one row of InspectionResultBatch,
+    exposes the same fields as InspectionResultModel
+    """
+
+    __slots__ = ("_batch", "_index")
+
+    def __init__(self, batch: "InspectionResultBatch", index: int):
+        """
+        Params:
+            batch (InspectionResultBatch): batch holding the row
+            index (int): row index in the batch
+        """
+
+        self._batch = batch
+        self._index = index
+
+    @property
+    def column(self) -> str:
+        return self._batch.columns[self._index]
+
+    @property
+    def needs_to_verify(self) -> bool:
+        return bool(self._batch.needs_to_verify[self._index])
+
+    @property
+    def actual_value(self) -> Union[str, int, float, None]:
+        return self._batch.actual_values[self._index]
+
+    @property
+    def verify_reason(self) -> Optional[str]:
+        return self._batch.reason_of(self._index)
+
+    @property
+    def value_to_assign(self) -> Union[str, int, None]:
+        return self._batch.values_to_assign[self._index]
+
+    def to_model(self) -> InspectionResultModel:
+        """
+        Returns:
+            InspectionResultModel: inspection results model of the row
+        """
+
+        return InspectionResultModel(
+            needs_to_verify=self.needs_to_verify,
+            actual_value=self.actual_value,
+            verify_reason=self.verify_reason,
+            value_to_assign=self.value_to_assign
+        )
+
+class InspectionResultBatch:
+    """
+    Inspection results stored as struct of arrays, one entry per inspected value
+
+    columns holds the column each entry was inspected for, reason_codes the VerifyReasonRegistry
+    bitmask of each entry, 0 when there is no reason
+    """
+
+    __slots__ = ("columns", "needs_to_verify", "actual_values", "reason_codes", "values_to_assign")
+
+    SCHEMA = {
+        "column": pl.String,
+        "needs_to_verify": pl.Boolean,
+        "actual_value": pl.String,
+        "verify_reasons": pl.UInt64,
+        "value_to_assign": pl.String,
+    }
+
+    def __init__(self):
+        self.columns: List[str] = []
+        self.needs_to_verify = array("B")
+        self.actual_values: List[Union[str, int, float, None]] = []
+        self.reason_codes = array("Q")
+        self.values_to_assign: List[Union[str, int, None]] = []
+
+    def __len__(self) -> int:
+        return len(self.actual_values)
+
+    def __getitem__(self, index: int) -> InspectionResultRow:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("inspection result index out of range")
+        return InspectionResultRow(self, index)
+
+    def __iter__(self) -> Iterator[InspectionResultRow]:
+        for index in range(len(self)):
+            yield InspectionResultRow(self, index)
+
+    def append(
+        self,
+        column: str,
+        actual_value: Union[str, int, float, None],
+        verify_reason: Optional[str] = None,
+        value_to_assign: Union[str, int, None] = None
+    ) -> int:
+        """
+        Params:
+            column (str): column the value was inspected for
+            actual_value (str | int | float | None): actual value from the field
+            verify_reason (str or None): reason why further verification needed
+            value_to_assign (str | int | None): new value to assign
+
+        Returns:
+            int: index of the appended row
+        """
+
+        if verify_reason is None:
+            self.needs_to_verify.append(0)
+            self.reason_codes.append(0)
+        else:
+            self.needs_to_verify.append(1)
+            self.reason_codes.append(VerifyReasonRegistry.code(verify_reason))
+
+        self.columns.append(column)
+        self.actual_values.append(actual_value)
+        self.values_to_assign.append(value_to_assign)
+
+        return len(self.actual_values) - 1
+
+    def reason_of(self, index: int) -> Optional[str]:
+        """
+        Params:
+            index (int): row index
+
+        Returns:
+            str or None: reason text of the row
+        """
+
+        reasons = VerifyReasonRegistry.decode(self.reason_codes[index])
+        if not reasons:
+            return None
+        return reasons[0]
+
+    @staticmethod
+    def _as_strings(values: List[Union[str, int, float, None]]) -> List[Union[str, None]]:
+        """
+        Params:
+            values (list): values of several columns, of mixed types
+
+        Returns:
+            list of str or None: values rendered as strings, so no value is lost to a common dtype
+        """
+
+        return [None if value is None else str(value) for value in values]
+
+    def to_frame(self) -> pl.DataFrame:
+        """
+        Returns:
+            pl.DataFrame: batch as frame typed by SCHEMA, with the column, needs_to_verify, actual_value,
+                verify_reasons bitmask and value_to_assign of each entry. Values hold several columns,
+                so they are kept as strings
+        """
+
+        return pl.DataFrame(
+            {
+                "column": self.columns,
+                "needs_to_verify": [bool(flag) for flag in self.needs_to_verify],
+                "actual_value": self._as_strings(self.actual_values),
+                "verify_reasons": list(self.reason_codes),
+                "value_to_assign": self._as_strings(self.values_to_assign),
+            },
+            schema=self.SCHEMA
+        )
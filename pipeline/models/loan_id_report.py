@@ -0,0 +1,16 @@
+from pydantic import BaseModel
+
+class LoanIdReport(BaseModel):
+    """
+    Outcome of one loan id check over a raw CSV
+    """
+
+    rows: int
+    distinct_loan_ids: int
+    missing_loan_ids: int
+    # rows whose loannr_chkdgt doesn't end with the check value of its loan number
+    invalid_check_digits: int
+    # loan ids repeated with identical rows
+    exact_duplicate_ids: int
+    # loan ids repeated with rows that differ
+    conflicting_duplicate_ids: int
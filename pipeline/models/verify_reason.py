@@ -0,0 +1,168 @@
+import functools
+import operator
+from typing import Iterable, List, Tuple, Union
+
+import polars as pl
+
+from pipeline.constants import Constants
+
+class VerifyReasonRegistry:
+    """
+    Registry of every verify reason produced by DataCleaningService
+
+    Each reason owns one bit of the verify_reasons bitmask column, so a row's reasons
+    are stored as a single UInt64 and reason queries become a bitwise AND.
+    The registry is append only: new reasons must be added at the end to keep
+    the bits of already stored masks stable.
+    """
+
+    REASONS: List[str] = [
+        *[f"missing value on {column}" for column in Constants.COLUMNS],
+        f"invalid {Constants.DEBTOR_ORIGIN_CITY}",
+        f"invalid {Constants.DEBTOR_ORIGIN_ZIP_CODE}",
+        f"invalid {Constants.NAICS_CODE}",
+        f"invalid {Constants.LOAN_APPROVAL_DATE}",
+        f"has 0 {Constants.TERM_DURATION}",
+        f"doesn't have {Constants.DEBTOR_FRANCHISE_CODE}",
+        f"undefined {Constants.DEBTOR_URBAN_RURAL_INFO}",
+        f"invalid {Constants.REV_LINE_CREDIT}",
+        f"invalid {Constants.LOW_DOC_PROGRAM}",
+        f"invalid {Constants.CHARGED_OFF_DATE}",
+        f"invalid {Constants.DISBURSEMENT_DATE}",
+        f"invalid {Constants.DISBURESEMENT_GROSS}",
+        f"invalid {Constants.OUTSTANDING_BALANCE}",
+        f"invalid {Constants.CREDIT_CHARGED_OFF_AMOUNT}",
+        f"invalid {Constants.BANK_APPROVED_CREDIT_AMOUNT}",
+        f"invalid {Constants.SBA_APPROVED_CREDIT_AMOUNT}",
+        # cross-field consistency
+        f"{Constants.LOAN_APPROVAL_FY} doesn't match {Constants.LOAN_APPROVAL_DATE}",
+        f"{Constants.DISBURSEMENT_DATE} before {Constants.LOAN_APPROVAL_DATE}",
+        f"{Constants.CHARGED_OFF_DATE} without {Constants.CHARGED_OFF_STATUS} {Constants.LOAN_STATUS}",
+        f"{Constants.CREDIT_CHARGED_OFF_AMOUNT} without {Constants.CHARGED_OFF_STATUS} {Constants.LOAN_STATUS}",
+        f"{Constants.SBA_APPROVED_CREDIT_AMOUNT} exceeds {Constants.BANK_APPROVED_CREDIT_AMOUNT}",
+        # reference tables
+        f"unknown {Constants.DEBTOR_ORIGIN_STATE}",
+        f"unknown {Constants.GUARANTOR_BANK_STATE}",
+        f"unknown {Constants.NAICS_CODE}",
+        f"{Constants.DEBTOR_ORIGIN_ZIP_CODE} doesn't match {Constants.DEBTOR_ORIGIN_STATE}",
+    ]
+
+    _CODE_BY_REASON = {reason: 1 << i for i, reason in enumerate(REASONS)}
+
+    @classmethod
+    def code(cls, reason: str) -> int:
+        """
+        Params:
+            reason (str): verify reason, ex: "missing value on naics"
+
+        Returns:
+            int: bit of the reason in the verify_reasons bitmask
+        """
+
+        reason_code = cls._CODE_BY_REASON.get(reason)
+        if reason_code is None:
+            raise ValueError(f"unregistered verify reason: {reason}")
+        return reason_code
+
+    @classmethod
+    def encode(cls, reasons: Iterable[str]) -> int:
+        """
+        Params:
+            reasons (iterable of str): verify reasons
+
+        Returns:
+            int: verify_reasons bitmask
+        """
+
+        mask = 0
+        for reason in reasons:
+            mask |= cls.code(reason)
+        return mask
+
+    @classmethod
+    def mask_expr(cls, checks: Iterable[Tuple[pl.Expr, str]], base: Union[pl.Expr, None] = None) -> pl.Expr:
+        """
+        Columnar counterpart of encode, bits are OR-ed so a reason raised by several checks is set once
+
+        Params:
+            checks (iterable of (pl.Expr, str)): (condition, verify reason) pairs
+            base (pl.Expr or None, optional): bitmask the bits are added to, defaults to 0
+
+        Returns:
+            pl.Expr: UInt64 verify_reasons bitmask
+        """
+
+        bits = [
+            pl.when(condition)
+                .then(pl.lit(cls.code(reason), dtype=pl.UInt64))
+                .otherwise(pl.lit(0, dtype=pl.UInt64))
+            for condition, reason in checks
+        ]
+        initial_mask = pl.lit(0, dtype=pl.UInt64) if base is None else base.cast(pl.UInt64)
+
+        return functools.reduce(operator.or_, bits, initial_mask)
+
+    @classmethod
+    def decode(cls, mask: int) -> List[str]:
+        """
+        Params:
+            mask (int): verify_reasons bitmask
+
+        Returns:
+            list of str: verify reasons in registry order
+        """
+
+        return [reason for i, reason in enumerate(cls.REASONS) if mask >> i & 1]
+
+    @classmethod
+    def decode_series(cls, masks: pl.Series) -> pl.Series:
+        """
+        Decode a bitmask column into list of reasons, each distinct mask is decoded once
+
+        Params:
+            masks (pl.Series): verify_reasons bitmask series
+
+        Returns:
+            pl.Series: list of str series with the same name and order
+        """
+
+        distinct_masks = masks.drop_nulls().unique().to_list()
+        decoded_df = pl.DataFrame(
+            {"mask": distinct_masks, "reasons": [cls.decode(mask) for mask in distinct_masks]},
+            schema={"mask": pl.UInt64, "reasons": pl.List(pl.String)}
+        )
+
+        return (
+            masks.cast(pl.UInt64).to_frame("mask")
+                .join(decoded_df, on="mask", how="left", maintain_order="left")
+                .get_column("reasons")
+                .alias(masks.name)
+        )
+
+    @classmethod
+    def has_all(cls, *reasons: str, column: str = Constants.DATA_VERIFICATION_REASONS) -> pl.Expr:
+        """
+        Params:
+            reasons (str): verify reasons the rows must all be flagged for
+            column (str, optional): bitmask column name
+
+        Returns:
+            pl.Expr: boolean filter expression
+        """
+
+        mask = cls.encode(reasons)
+        return (pl.col(column) & pl.lit(mask, dtype=pl.UInt64)).eq(mask)
+
+    @classmethod
+    def has_any(cls, *reasons: str, column: str = Constants.DATA_VERIFICATION_REASONS) -> pl.Expr:
+        """
+        Params:
+            reasons (str): verify reasons the rows must be flagged for at least one of
+            column (str, optional): bitmask column name
+
+        Returns:
+            pl.Expr: boolean filter expression
+        """
+
+        mask = cls.encode(reasons)
+        return (pl.col(column) & pl.lit(mask, dtype=pl.UInt64)).ne(0)
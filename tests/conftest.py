@@ -0,0 +1,62 @@
+import os
+import uuid
+from typing import Iterator
+
+import psycopg2
+import pytest
+from psycopg2 import extensions as PsycopgExtension
+from psycopg2 import sql
+
+# database tests only run against a disposable database, never the one configured in .env
+TEST_DATABASE_DSN_VARIABLE = "TEST_DATABASE_DSN"
+
+@pytest.fixture
+def database_dsn() -> str:
+    """
+    libpq connection string of the test database, the test is skipped when it isn't set
+    """
+
+    dsn = os.getenv(TEST_DATABASE_DSN_VARIABLE)
+    if not dsn:
+        pytest.skip(f"{TEST_DATABASE_DSN_VARIABLE} is not set")
+    return dsn
+
+@pytest.fixture
+def database_schema(database_dsn: str) -> Iterator[str]:
+    """
+    Schema created for the test and dropped afterwards, connections opened with database_options use it
+    """
+
+    schema = f"test_{uuid.uuid4().hex}"
+
+    connection = psycopg2.connect(database_dsn)
+    connection.autocommit = True
+    with connection.cursor() as cursor:
+        cursor.execute(sql.SQL("CREATE SCHEMA {}").format(sql.Identifier(schema)))
+
+    try:
+        yield schema
+    finally:
+        with connection.cursor() as cursor:
+            cursor.execute(sql.SQL("DROP SCHEMA {} CASCADE").format(sql.Identifier(schema)))
+        connection.close()
+
+@pytest.fixture
+def database_options(database_schema: str) -> str:
+    """
+    libpq options putting the test schema first on the search_path
+    """
+
+    return f"-c search_path={database_schema}"
+
+@pytest.fixture
+def database_connection(database_dsn: str, database_options: str) -> Iterator[PsycopgExtension.connection]:
+    """
+    Connection to the test database, working in the test schema
+    """
+
+    connection = psycopg2.connect(database_dsn, options=database_options)
+    try:
+        yield connection
+    finally:
+        connection.close()
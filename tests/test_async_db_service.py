@@ -0,0 +1,83 @@
+import asyncio
+import json
+import time
+
+import psycopg2
+import pytest
+
+from pipeline.helpers.db.async_db_service import AsyncDbService
+from pipeline.helpers.db.connection import ConnectionPool
+
+@pytest.fixture
+def pool(database_dsn: str, database_options: str):
+    """
+    Single connection pool, a connection that isn't given back blocks every later query
+    """
+
+    pool = ConnectionPool(min_connections=1, max_connections=1, dsn=database_dsn, options=database_options)
+    yield pool
+    pool.close()
+
+def running_sleeps(database_dsn: str) -> int:
+    with psycopg2.connect(database_dsn) as connection, connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT count(*) FROM pg_stat_activity WHERE state = 'active' AND query LIKE 'SELECT pg_sleep(%%'"
+        )
+        return cursor.fetchone()[0]
+
+def test_timeout_cancels_the_query_on_the_server(database_dsn, pool):
+    async def run():
+        async with AsyncDbService(pool=pool) as db:
+            started_at = time.monotonic()
+            with pytest.raises(asyncio.TimeoutError):
+                await db.fetch_data("SELECT pg_sleep(30)", timeout_seconds=0.5)
+            assert time.monotonic() - started_at < 5
+
+            # the only connection was given back, the next query doesn't wait for the sleep
+            return await db.fetch_data("SELECT 1 AS answer", timeout_seconds=5)
+
+    assert json.loads(asyncio.run(run())) == [{"answer": 1}]
+    assert running_sleeps(database_dsn) == 0
+
+def test_cancelled_task_cancels_the_query_on_the_server(database_dsn, pool):
+    async def run():
+        async with AsyncDbService(pool=pool) as db:
+            task = asyncio.ensure_future(db.fetch_data("SELECT pg_sleep(30)"))
+            await asyncio.sleep(0.5)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+            return await db.fetch_data("SELECT 1 AS answer", timeout_seconds=5)
+
+    assert json.loads(asyncio.run(run())) == [{"answer": 1}]
+    assert running_sleeps(database_dsn) == 0
+
+def test_statement_timeout_is_local_to_the_query(pool):
+    async def run():
+        async with AsyncDbService(pool=pool) as db:
+            with_timeout = await db.fetch_data("SHOW statement_timeout", timeout_seconds=2)
+            # same pooled connection, the setting ended with the previous transaction
+            without_timeout = await db.fetch_data("SHOW statement_timeout")
+            return with_timeout, without_timeout
+
+    with_timeout, without_timeout = asyncio.run(run())
+
+    assert json.loads(with_timeout) == [{"statement_timeout": "2s"}]
+    assert json.loads(without_timeout) == [{"statement_timeout": "0"}]
+
+def test_failed_query_gives_the_connection_back(pool):
+    async def run():
+        async with AsyncDbService(pool=pool) as db:
+            with pytest.raises(psycopg2.errors.UndefinedTable):
+                await db.fetch_data("SELECT * FROM missing_table", timeout_seconds=5)
+
+            return await db.fetch_many(
+                {"first": "SELECT 1 AS answer", "second": "SELECT 2 AS answer"},
+                timeout_seconds=5
+            )
+
+    assert {name: json.loads(result) for name, result in asyncio.run(run()).items()} == {
+        "first": [{"answer": 1}],
+        "second": [{"answer": 2}],
+    }
@@ -0,0 +1,152 @@
+import random
+from itertools import combinations
+
+import polars as pl
+import pytest
+
+from benchmarks.synthetic import SyntheticLoanGenerator
+from pipeline.constants import Constants
+from pipeline.helpers.bank_canonicalizer import BankNameCanonicalizer
+
+def trigram_jaccard(key_a: str, key_b: str) -> float:
+    """
+    Reference similarity the prefix filtered build must reproduce
+    """
+
+    trigrams_a, trigrams_b = ({f" {key} "[i:i + 3] for i in range(len(key))} for key in (key_a, key_b))
+    return len(trigrams_a & trigrams_b) / len(trigrams_a | trigrams_b)
+
+def names_frame(names: list) -> pl.DataFrame:
+    """
+    Params:
+        names (list of tuple): (bankstate, bank, loans) rows
+    """
+
+    return pl.DataFrame(
+        names,
+        schema=[Constants.GUARANTOR_BANK_STATE, Constants.GUARANTOR_BANK_NAME, BankNameCanonicalizer.LOANS_COLUMN],
+        orient="row"
+    )
+
+def canonical_names(canonicalizer: BankNameCanonicalizer, names_df: pl.DataFrame) -> dict:
+    return dict(
+        canonicalizer.apply(names_df)
+            .select(Constants.GUARANTOR_BANK_NAME, Constants.GUARANTOR_BANK_CANONICAL_NAME)
+            .iter_rows()
+    )
+
+def test_normalize_expr():
+    names = ["WELLS FARGO BANK NATL ASSOC", "Wells Fargo Bank, N.A.", "THE WELLS FARGO BK", "1ST NATL BK & TR CO", " ", None]
+
+    keys = pl.DataFrame({"bank": names}).select(BankNameCanonicalizer.normalize_expr(pl.col("bank"))).to_series().to_list()
+
+    assert keys == ["WELLS FARGO BANK"] * 3 + ["FIRST NATIONAL BANK AND TRUST COMPANY", None, None]
+
+def test_near_duplicate_names_share_a_canonical_name():
+    names_df = names_frame([
+        ("OH", "WELLS FARGO BANK NATL ASSOC", 5),
+        ("OH", "Wells Fargo Bank, N.A.", 2),
+        ("OH", "GRANT COUNTY STATE BANK", 3),
+        ("OH", "GRANT COUNTY STATE BANKS", 1),
+        ("OH", "FIRST NATL BANK OF BROKEN", 1),
+        ("OH", "FIRST NATIONAL BANK OF BROKEN ARROW", 4),
+    ])
+    canonicalizer = BankNameCanonicalizer()
+
+    report = canonicalizer.build(names_df)
+
+    assert canonical_names(canonicalizer, names_df) == {
+        "WELLS FARGO BANK NATL ASSOC": "WELLS FARGO BANK NATL ASSOC",
+        "Wells Fargo Bank, N.A.": "WELLS FARGO BANK NATL ASSOC",
+        "GRANT COUNTY STATE BANK": "GRANT COUNTY STATE BANK",
+        "GRANT COUNTY STATE BANKS": "GRANT COUNTY STATE BANK",
+        "FIRST NATL BANK OF BROKEN": "FIRST NATIONAL BANK OF BROKEN ARROW",
+        "FIRST NATIONAL BANK OF BROKEN ARROW": "FIRST NATIONAL BANK OF BROKEN ARROW",
+    }
+    assert (report.distinct_names, report.distinct_keys, report.clusters, report.matched_pairs) == (6, 5, 3, 2)
+
+def test_names_below_the_threshold_stay_apart():
+    names_df = names_frame([
+        ("OH", "FIFTH THIRD BANK", 3),
+        ("OH", "FIFTH THRD BANK", 1),
+        ("OH", "FIRST NATIONAL BANK", 2),
+        ("OH", "FIRST STATE BANK", 1),
+        # same lender name in another bankstate
+        ("KY", "FIFTH THRD BANK", 1),
+    ])
+    assert trigram_jaccard("FIFTH THIRD BANK", "FIFTH THRD BANK") < 0.8
+
+    strict_canonicalizer = BankNameCanonicalizer(threshold=0.8)
+    strict_canonicalizer.build(names_df)
+    loose_canonicalizer = BankNameCanonicalizer(threshold=0.7)
+    loose_canonicalizer.build(names_df)
+
+    strict_names = strict_canonicalizer.apply(names_df).get_column(Constants.GUARANTOR_BANK_CANONICAL_NAME).to_list()
+    loose_names = loose_canonicalizer.apply(names_df).get_column(Constants.GUARANTOR_BANK_CANONICAL_NAME).to_list()
+
+    assert strict_names == names_df.get_column(Constants.GUARANTOR_BANK_NAME).to_list()
+    assert loose_names == ["FIFTH THIRD BANK", "FIFTH THIRD BANK", "FIRST NATIONAL BANK", "FIRST STATE BANK", "FIFTH THRD BANK"]
+
+def test_apply_keeps_unknown_names():
+    canonicalizer = BankNameCanonicalizer()
+    canonicalizer.build(names_frame([("OH", "GRANT COUNTY STATE BANK", 3), ("OH", "GRANT COUNTY STATE BANKS", 1)]))
+
+    df = names_frame([("OH", "GRANT CNTY STATE BANK", 1), ("OH", "FIFTH THIRD BANK", 1), ("KY", "GRANT COUNTY STATE BANK", 1)])
+
+    assert canonicalizer.apply(df).get_column(Constants.GUARANTOR_BANK_CANONICAL_NAME).to_list() == [
+        "GRANT COUNTY STATE BANK", "FIFTH THIRD BANK", "GRANT COUNTY STATE BANK"
+    ]
+
+def misspelled_keys(seed: int, variants: int) -> list:
+    """
+    Returns:
+        list of str: keys of the synthetic banks and of random one to three letter edits of them
+    """
+
+    rng = random.Random(seed)
+    base_keys = (
+        pl.DataFrame({"bank": SyntheticLoanGenerator.BANKS})
+            .select(BankNameCanonicalizer.normalize_expr(pl.col("bank")))
+            .to_series()
+            .to_list()
+    )
+    keys = set(base_keys)
+    for _ in range(variants):
+        key = list(rng.choice(base_keys))
+        for _ in range(rng.randint(1, 3)):
+            position = rng.randrange(len(key))
+            edit = rng.choice(["delete", "replace", "insert"])
+            if edit == "delete" and len(key) > 3:
+                del key[position]
+            elif edit == "replace":
+                key[position] = rng.choice("ABCDEFGHIJKLMNOPQRSTUVWXYZ")
+            else:
+                key.insert(position, rng.choice("ABCDEFGHIJKLMNOPQRSTUVWXYZ "))
+        keys.add(" ".join("".join(key).split()))
+    return sorted(keys)
+
+@pytest.mark.parametrize("threshold", [0.3, 0.5, 0.7, 0.8, 0.85])
+def test_prefix_filter_finds_every_pair_of_the_all_pairs_scan(threshold: float):
+    keys = misspelled_keys(seed=7, variants=60)
+    keys_df = pl.DataFrame({
+        Constants.GUARANTOR_BANK_STATE: ["OH"] * len(keys) + ["KY"] * len(keys),
+        BankNameCanonicalizer.KEY_COLUMN: keys * 2,
+    }).with_row_index("node")
+    canonicalizer = BankNameCanonicalizer(threshold=threshold)
+
+    trigrams_df = canonicalizer._trigrams(keys_df)
+    candidates_df = canonicalizer._candidate_pairs(trigrams_df)
+    matched_df = canonicalizer._matched_pairs(trigrams_df, candidates_df)
+
+    expected_pairs = {
+        (node_a, node_b)
+        for (node_a, state_a, key_a), (node_b, state_b, key_b) in combinations(keys_df.rows(), 2)
+        if state_a == state_b and trigram_jaccard(key_a, key_b) >= threshold
+    }
+    candidate_pairs = set(candidates_df.iter_rows())
+
+    assert expected_pairs
+    assert set(matched_df.iter_rows()) == expected_pairs
+    assert expected_pairs <= candidate_pairs
+    # the prefix filter is what keeps the scan below all pairs
+    assert len(candidate_pairs) < len(keys) * (len(keys) - 1) // 2 * 2
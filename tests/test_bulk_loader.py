@@ -0,0 +1,64 @@
+import polars as pl
+import pytest
+from psycopg2 import extensions as PsycopgExtension
+
+from pipeline.helpers.db.bulk_loader import BulkLoader
+from pipeline.helpers.db.rollups import RollupManager
+
+@pytest.fixture
+def loans_table(database_connection: PsycopgExtension.connection) -> str:
+    """
+    Loans table with the columns read by the rollup measures and one loan already loaded
+    """
+
+    with database_connection.cursor() as cursor:
+        cursor.execute(
+            """
+            CREATE TABLE loans (
+                loannr_chkdgt text PRIMARY KEY, state text, mis_status text, needs_to_verify boolean,
+                disbursementgross bigint, chgoffpringr bigint, grappv bigint, sba_appv bigint
+            )
+            """
+        )
+        cursor.execute("INSERT INTO loans (loannr_chkdgt, state, mis_status) VALUES ('1000014003', 'IN', 'CHGOFF')")
+    database_connection.commit()
+    return "loans"
+
+@pytest.fixture
+def batch() -> pl.DataFrame:
+    return pl.DataFrame({
+        "loannr_chkdgt": ["1000014003", "1000024006", "1000014003", "1000024006"],
+        "state": ["OK", "TX", "NY", "CA"],
+        "mis_status": ["PIF", "PIF", "PIF", "CHGOFF"],
+    })
+
+def fetch_all(connection: PsycopgExtension.connection, query_str: str) -> list:
+    with connection.cursor() as cursor:
+        cursor.execute(query_str)
+        return cursor.fetchall()
+
+def test_upsert_keeps_the_last_row_of_a_repeated_key(database_connection, loans_table, batch):
+    rollup_manager = RollupManager(rollups=["state"])
+    with database_connection.cursor() as cursor:
+        rollup_manager.rebuild(cursor, loans_table)
+    database_connection.commit()
+
+    BulkLoader(database_connection, rollup_manager=rollup_manager).load_frames([batch], loans_table)
+
+    assert fetch_all(database_connection, "SELECT loannr_chkdgt, state, mis_status FROM loans ORDER BY 1") == [
+        ("1000014003", "NY", "PIF"),
+        ("1000024006", "CA", "CHGOFF"),
+    ]
+    # the IN loan moved to NY, each loan is counted once
+    assert fetch_all(database_connection, "SELECT state, loans, chgoff_loans FROM loans_rollup_state ORDER BY 1") == [
+        ("CA", 1, 1),
+        ("NY", 1, 0),
+    ]
+
+def test_upsert_of_a_repeated_key_without_updated_columns(database_connection, loans_table, batch):
+    BulkLoader(database_connection).load_frames([batch.select("loannr_chkdgt")], loans_table)
+
+    assert fetch_all(database_connection, "SELECT loannr_chkdgt, state FROM loans ORDER BY 1") == [
+        ("1000014003", "IN"),
+        ("1000024006", None),
+    ]
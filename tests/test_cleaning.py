@@ -0,0 +1,125 @@
+import polars as pl
+import pytest
+
+from benchmarks.synthetic import SyntheticLoanGenerator
+from pipeline.constants import Constants
+from pipeline.helpers.cleaning import DataCleaningService
+from pipeline.models.verify_reason import VerifyReasonRegistry
+
+@pytest.fixture(scope="module")
+def raw_df() -> pl.DataFrame:
+    """
+    Synthetic raw loans with integer columns parsed, the input inspect_row expects
+    """
+
+    df = SyntheticLoanGenerator(seed=7).generate_frame(5_000)
+    return df.rename({column: column.lower() for column in df.columns}).with_columns(
+        pl.col(Constants.INTEGER_COLUMNS).str.to_integer(strict=False)
+    )
+
+def test_inspect_frame_matches_inspect_row(raw_df: pl.DataFrame):
+    cleaning_service = DataCleaningService()
+
+    frame_df = cleaning_service.inspect_frame(raw_df)
+    row_df = pl.DataFrame(
+        [cleaning_service.inspect_row(row) for row in raw_df.iter_rows(named=True)],
+        infer_schema_length=None
+    )
+
+    assert frame_df.columns == row_df.columns
+
+    mismatched_reasons = [
+        (frame_mask, row_mask)
+        for frame_mask, row_mask in zip(
+            frame_df.get_column(Constants.DATA_VERIFICATION_REASONS).to_list(),
+            row_df.get_column(Constants.DATA_VERIFICATION_REASONS).to_list()
+        )
+        if frame_mask != row_mask
+    ]
+    assert not mismatched_reasons, (
+        f"{len(mismatched_reasons)} rows differ, first one on: "
+        f"{VerifyReasonRegistry.decode(mismatched_reasons[0][0] ^ mismatched_reasons[0][1])}"
+    )
+
+    for column in frame_df.columns:
+        frame_values = frame_df.get_column(column).cast(pl.String)
+        row_values = row_df.get_column(column).cast(pl.String)
+        assert frame_values.eq_missing(row_values).all(), f"cleaned values of {column} differ"
+
+def test_inspect_frame_flags_rows(raw_df: pl.DataFrame):
+    cleaned_df = DataCleaningService().inspect_frame(raw_df)
+
+    assert cleaned_df.get_column(Constants.IS_DATA_VERIFICATION_NEEDED).eq(
+        cleaned_df.get_column(Constants.DATA_VERIFICATION_REASONS).gt(0)
+    ).all()
+    assert cleaned_df.get_column(Constants.LOAN_STATUS).drop_nulls().is_in(["PIF", Constants.CHARGED_OFF_STATUS]).all()
+
+CROSS_FIELD_REASONS = [
+    f"{Constants.LOAN_APPROVAL_FY} doesn't match {Constants.LOAN_APPROVAL_DATE}",
+    f"{Constants.DISBURSEMENT_DATE} before {Constants.LOAN_APPROVAL_DATE}",
+    f"{Constants.CHARGED_OFF_DATE} without {Constants.CHARGED_OFF_STATUS} {Constants.LOAN_STATUS}",
+    f"{Constants.CREDIT_CHARGED_OFF_AMOUNT} without {Constants.CHARGED_OFF_STATUS} {Constants.LOAN_STATUS}",
+    f"{Constants.SBA_APPROVED_CREDIT_AMOUNT} exceeds {Constants.BANK_APPROVED_CREDIT_AMOUNT}",
+]
+
+# paid in full loan approved in February 1997, fiscal year 1997, that breaks no cross-field rule
+CONSISTENT_ROW = {
+    Constants.LOAN_ID: "1000014003",
+    Constants.DEBTOR_NAME: "ABC HOBBYCRAFT",
+    Constants.DEBTOR_ORIGIN_CITY: "EVANSVILLE",
+    Constants.DEBTOR_ORIGIN_STATE: "IN",
+    Constants.DEBTOR_ORIGIN_ZIP_CODE: "47711",
+    Constants.GUARANTOR_BANK_NAME: "FIFTH THIRD BANK",
+    Constants.GUARANTOR_BANK_STATE: "OH",
+    Constants.NAICS_CODE: "451120",
+    Constants.LOAN_APPROVAL_DATE: "28-Feb-97",
+    Constants.LOAN_APPROVAL_FY: "1997",
+    Constants.TERM_DURATION: "84",
+    Constants.DEBTOR_EMPLOYEE_NUMBER: "4",
+    Constants.DEBTOR_NEW_OR_EXIST: "2",
+    Constants.NUMBER_NEW_JOB_CREATED: "0",
+    Constants.NUMBER_JOB_RETAINED: "0",
+    Constants.DEBTOR_FRANCHISE_CODE: "1",
+    Constants.DEBTOR_URBAN_RURAL_INFO: "0",
+    Constants.REV_LINE_CREDIT: "N",
+    Constants.LOW_DOC_PROGRAM: "Y",
+    Constants.CHARGED_OFF_DATE: None,
+    Constants.DISBURSEMENT_DATE: "28-Feb-99",
+    Constants.DISBURESEMENT_GROSS: "$60,000.00 ",
+    Constants.OUTSTANDING_BALANCE: "$0.00 ",
+    Constants.LOAN_STATUS: "P I F",
+    Constants.CREDIT_CHARGED_OFF_AMOUNT: "$0.00 ",
+    Constants.BANK_APPROVED_CREDIT_AMOUNT: "$60,000.00 ",
+    Constants.SBA_APPROVED_CREDIT_AMOUNT: "$48,000.00 ",
+}
+
+@pytest.mark.parametrize("changes, expected_reasons", [
+    ({}, []),
+    # October starts the next fiscal year
+    ({Constants.LOAN_APPROVAL_DATE: "1-Oct-96", Constants.LOAN_APPROVAL_FY: "1996", Constants.DISBURSEMENT_DATE: "1-Oct-96"}, [CROSS_FIELD_REASONS[0]]),
+    ({Constants.LOAN_APPROVAL_DATE: "1-Oct-96", Constants.LOAN_APPROVAL_FY: "1997", Constants.DISBURSEMENT_DATE: "1-Oct-96"}, []),
+    ({Constants.LOAN_APPROVAL_FY: "1998"}, [CROSS_FIELD_REASONS[0]]),
+    ({Constants.DISBURSEMENT_DATE: "27-Feb-97"}, [CROSS_FIELD_REASONS[1]]),
+    ({Constants.DISBURSEMENT_DATE: "28-Feb-97"}, []),
+    ({Constants.CHARGED_OFF_DATE: "16-Oct-05"}, [CROSS_FIELD_REASONS[2]]),
+    ({Constants.CHARGED_OFF_DATE: "16-Oct-05", Constants.LOAN_STATUS: "CHGOFF", Constants.CREDIT_CHARGED_OFF_AMOUNT: "$1,000.00 "}, []),
+    ({Constants.CREDIT_CHARGED_OFF_AMOUNT: "$1,000.00 "}, [CROSS_FIELD_REASONS[3]]),
+    ({Constants.SBA_APPROVED_CREDIT_AMOUNT: "$60,000.01 "}, [CROSS_FIELD_REASONS[4]]),
+    ({Constants.SBA_APPROVED_CREDIT_AMOUNT: "$60,000.00 "}, []),
+    # rules are skipped when one of their values is missing or invalid
+    ({Constants.DISBURSEMENT_DATE: "not a date"}, []),
+    ({Constants.LOAN_APPROVAL_DATE: None}, []),
+    ({Constants.LOAN_STATUS: None, Constants.CHARGED_OFF_DATE: "16-Oct-05"}, []),
+    ({Constants.BANK_APPROVED_CREDIT_AMOUNT: None}, []),
+])
+def test_cross_field_rules_match_between_frame_and_row(changes: dict, expected_reasons: list):
+    cleaning_service = DataCleaningService()
+    raw_df = pl.DataFrame([{**CONSISTENT_ROW, **changes}], schema={column: pl.String for column in CONSISTENT_ROW})
+
+    frame_mask = cleaning_service.inspect_frame(raw_df).get_column(Constants.DATA_VERIFICATION_REASONS).item()
+    row = raw_df.with_columns(pl.col(Constants.INTEGER_COLUMNS).str.to_integer(strict=False)).row(0, named=True)
+    row_mask = cleaning_service.inspect_row(row)[Constants.DATA_VERIFICATION_REASONS]
+
+    assert VerifyReasonRegistry.decode(frame_mask) == VerifyReasonRegistry.decode(row_mask)
+    cross_field_reasons = [reason for reason in VerifyReasonRegistry.decode(frame_mask) if reason in CROSS_FIELD_REASONS]
+    assert cross_field_reasons == expected_reasons
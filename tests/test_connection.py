@@ -0,0 +1,73 @@
+import threading
+import time
+
+import psycopg2
+import pytest
+
+from pipeline.helpers.db.connection import ConnectionPool
+
+def test_connect_retries_back_off(tmp_path):
+    # no server listens on this socket directory, every connect fails
+    pool = ConnectionPool(min_connections=0, max_connections=1, max_retries=2, retry_backoff_seconds=0.1, host=str(tmp_path))
+
+    started_at = time.monotonic()
+    with pytest.raises(psycopg2.OperationalError):
+        with pool.connection():
+            pass
+
+    # 0.1 then 0.2 seconds between the 3 attempts
+    assert time.monotonic() - started_at >= 0.3
+
+def test_borrowers_wait_for_a_free_connection(database_dsn, database_options):
+    pool = ConnectionPool(min_connections=0, max_connections=2, dsn=database_dsn, options=database_options)
+    borrowed = threading.Semaphore(0)
+    release = threading.Event()
+
+    def hold_connection():
+        with pool.connection():
+            borrowed.release()
+            release.wait()
+
+    holders = [threading.Thread(target=hold_connection) for _ in range(2)]
+    for holder in holders:
+        holder.start()
+    for _ in holders:
+        borrowed.acquire()
+
+    third_borrowed = threading.Event()
+
+    def borrow_third():
+        with pool.connection():
+            third_borrowed.set()
+
+    third = threading.Thread(target=borrow_third)
+    third.start()
+
+    assert not third_borrowed.wait(0.3)
+    release.set()
+    assert third_borrowed.wait(5)
+
+    for thread in holders + [third]:
+        thread.join()
+    pool.close()
+
+def test_stale_connections_are_replaced_without_retries(database_dsn, database_options):
+    pool = ConnectionPool(
+        min_connections=3,
+        max_connections=3,
+        health_check_interval_seconds=0,
+        max_retries=0,
+        dsn=database_dsn,
+        options=database_options,
+        application_name="stale_pool_test"
+    )
+
+    # every pooled connection dies, as after a server restart
+    with psycopg2.connect(database_dsn) as admin_connection, admin_connection.cursor() as cursor:
+        cursor.execute("SELECT count(pg_terminate_backend(pid)) FROM pg_stat_activity WHERE application_name = 'stale_pool_test'")
+        assert cursor.fetchone() == (3,)
+
+    with pool.cursor() as cursor:
+        cursor.execute("SELECT 1")
+        assert cursor.fetchone() == (1,)
+    pool.close()
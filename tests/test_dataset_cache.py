@@ -0,0 +1,77 @@
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import polars as pl
+
+from benchmarks.synthetic import SyntheticLoanGenerator
+from pipeline.constants import Constants
+from pipeline.helpers.categorical_encoder import CategoricalEncoder
+from pipeline.helpers.dataset_cache import DatasetCache
+
+def build_cache(cache_dir: str, source_path: str) -> str:
+    return DatasetCache(cache_dir).build(source_path)
+
+def test_concurrent_builds_keep_every_category(tmp_path):
+    raw_df = SyntheticLoanGenerator(seed=13).generate_frame(500)
+    cache_dir = str(tmp_path / "cache")
+
+    # every source holds bank names no other source has
+    source_paths = []
+    for source_number in range(6):
+        source_path = str(tmp_path / f"source_{source_number}.csv")
+        raw_df.with_columns(
+            pl.format("BANK {} {}", pl.lit(source_number), pl.int_range(pl.len()) % 50).alias(Constants.GUARANTOR_BANK_NAME)
+        ).write_csv(source_path)
+        source_paths.append(source_path)
+
+    # polars' thread pool doesn't survive fork, workers must be spawned
+    with ProcessPoolExecutor(max_workers=len(source_paths), mp_context=multiprocessing.get_context("spawn")) as executor:
+        cache_paths = list(executor.map(build_cache, [cache_dir] * len(source_paths), source_paths))
+
+    with open(f"{cache_dir}/{DatasetCache.DICTIONARY_FILE_NAME}") as dictionary_file:
+        bank_names = json.load(dictionary_file)[Constants.GUARANTOR_BANK_NAME]
+
+    assert len(bank_names) == len(set(bank_names)) == 6 * 50
+
+    # each cache kept the codes of the shared dictionary at the time it was built
+    shared_dtype = pl.Enum(bank_names)
+    for cache_path in cache_paths:
+        banks = pl.read_ipc(cache_path).get_column(Constants.GUARANTOR_BANK_NAME)
+        assert banks.dtype.categories.to_list() == bank_names[:len(banks.dtype.categories)]
+        assert banks.cast(shared_dtype).to_physical().equals(banks.to_physical())
+
+def test_reload_appends_own_values_after_the_saved_ones(tmp_path):
+    dictionary_path = str(tmp_path / "categories.json")
+    first_encoder = CategoricalEncoder([Constants.DEBTOR_ORIGIN_STATE], dictionary_path)
+    second_encoder = CategoricalEncoder([Constants.DEBTOR_ORIGIN_STATE], dictionary_path)
+
+    with first_encoder.locked():
+        first_encoder.update(pl.DataFrame({Constants.DEBTOR_ORIGIN_STATE: ["OK", "IN"]}))
+        first_encoder.save()
+    second_encoder.update(pl.DataFrame({Constants.DEBTOR_ORIGIN_STATE: ["TX", "IN"]}))
+    with second_encoder.locked():
+        second_encoder.save()
+
+    assert CategoricalEncoder(dictionary_path=dictionary_path).dictionaries[Constants.DEBTOR_ORIGIN_STATE] == ["IN", "OK", "TX"]
+
+def test_build_keeps_the_caches_of_sibling_sources(tmp_path):
+    raw_df = SyntheticLoanGenerator(seed=19).generate_frame(100)
+    cache_dir = tmp_path / "cache"
+    dataset_cache = DatasetCache(str(cache_dir))
+
+    source_paths = [str(tmp_path / f"{name}.csv") for name in ("loans", "loans-2021", "loans-ca")]
+    for source_path in source_paths:
+        raw_df.write_csv(source_path)
+    sibling_cache_paths = [dataset_cache.build(source_path) for source_path in source_paths[1:]]
+    first_cache_path = dataset_cache.build(source_paths[0])
+
+    # a changed source replaces its own cache only
+    raw_df.head(50).write_csv(source_paths[0])
+    second_cache_path = dataset_cache.build(source_paths[0])
+
+    assert second_cache_path != first_cache_path
+    assert sorted(path.name for path in cache_dir.glob("*.arrow")) == sorted(
+        os.path.basename(path) for path in sibling_cache_paths + [second_cache_path]
+    )
@@ -0,0 +1,30 @@
+import polars as pl
+import pytest
+
+from pipeline.helpers.commons.date_normalizer import DateNormalizer
+
+@pytest.mark.parametrize("raw_date, clean_date", [
+    ("16-Oct-29", "2029-10-16"),
+    ("31-Dec-30", "2030-12-31"),
+    # %y parses 31 to 2031, past Constants.RAW_DATE_CENTURY_PIVOT
+    ("16-Oct-31", "1931-10-16"),
+    ("28-Feb-68", "1968-02-28"),
+    ("1-Jan-69", "1969-01-01"),
+    ("29-Feb-00", "2000-02-29"),
+    ("29-Feb-36", "1936-02-29"),
+    ("31-Feb-97", None),
+    ("1997-02-28", None),
+])
+def test_format_raw_date_century(raw_date: str, clean_date: str):
+    date_normalizer = DateNormalizer()
+
+    assert date_normalizer.format_raw_date(raw_date) == clean_date
+    assert date_normalizer.format_raw_date_series(pl.Series([raw_date, None])).to_list() == [clean_date, None]
+
+@pytest.mark.parametrize("clean_date, fiscal_year", [
+    ("1931-09-30", 1931),
+    ("1931-10-01", 1932),
+    ("2029-10-16", 2030),
+])
+def test_fiscal_year(clean_date: str, fiscal_year: int):
+    assert DateNormalizer().fiscal_year(clean_date) == fiscal_year
@@ -0,0 +1,31 @@
+import datetime
+from decimal import Decimal
+
+import polars as pl
+
+from pipeline.helpers.db.db_service import DbService
+
+def test_fetch_frame_types_the_columns(database_connection):
+    query_str = """
+        SELECT
+            true AS is_true, 1::int2 AS small, 2::int4 AS regular, 3::int8 AS big,
+            1.5::float4 AS single, 2.5::float8 AS double, 12.34::numeric(10, 2) AS amount,
+            1.5::numeric AS unconstrained, DATE '2006-02-28' AS day, 'IN'::text AS state
+    """
+
+    with database_connection.cursor() as cursor:
+        fetched_df = DbService.fetch_frame(cursor, query_str)
+
+    assert fetched_df.schema == pl.Schema({
+        "is_true": pl.Boolean,
+        "small": pl.Int16,
+        "regular": pl.Int32,
+        "big": pl.Int64,
+        "single": pl.Float32,
+        "double": pl.Float64,
+        "amount": pl.Decimal(10, 2),
+        "unconstrained": pl.Float64,
+        "day": pl.Date,
+        "state": pl.String,
+    })
+    assert fetched_df.row(0) == (True, 1, 2, 3, 1.5, 2.5, Decimal("12.34"), 1.5, datetime.date(2006, 2, 28), "IN")
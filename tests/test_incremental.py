@@ -0,0 +1,77 @@
+import polars as pl
+import pytest
+
+from benchmarks.synthetic import SyntheticLoanGenerator
+from pipeline.constants import Constants
+from pipeline.helpers.cleaning import DataCleaningService
+from pipeline.helpers.incremental import IncrementalCleaningService
+from pipeline.helpers.streaming import CsvStreamingService
+
+@pytest.fixture(scope="module")
+def raw_df() -> pl.DataFrame:
+    return SyntheticLoanGenerator(seed=11).generate_frame(310)
+
+@pytest.fixture
+def raw_paths(tmp_path, raw_df: pl.DataFrame):
+    """
+    Raw CSV of a first run, and of a second run with changed, removed and added loans
+    """
+
+    first_path = tmp_path / "first.csv"
+    raw_df.head(300).write_csv(first_path)
+
+    row_number = pl.int_range(pl.len())
+    city = pl.col(Constants.DEBTOR_ORIGIN_CITY)
+    second_df = (
+        raw_df
+            .with_columns(
+                pl.when(row_number.is_in([3, 150])).then(pl.lit("SPRINGFIELD")).otherwise(city).alias(Constants.DEBTOR_ORIGIN_CITY),
+                # now fails the term rule
+                pl.when(row_number.eq(299)).then(pl.lit("0")).otherwise(pl.col(Constants.TERM_DURATION)).alias(Constants.TERM_DURATION),
+            )
+            .filter(row_number.is_in([10, 200]).not_())
+    )
+    second_path = tmp_path / "second.csv"
+    second_df.write_csv(second_path)
+
+    return str(first_path), str(second_path)
+
+def test_incremental_run_matches_a_full_clean(tmp_path, raw_paths):
+    first_path, second_path = raw_paths
+    cleaned_path = str(tmp_path / "cleaned.csv")
+    incremental_service = IncrementalCleaningService()
+
+    first_report = incremental_service.clean_csv(first_path, cleaned_path, sort_by_loan_id=True)
+    second_report = incremental_service.clean_csv(second_path, cleaned_path, sort_by_loan_id=True)
+
+    assert first_report.full_rebuild
+    assert not second_report.full_rebuild
+    # 3 changed and 10 added loans
+    assert (second_report.cleaned_rows, second_report.reused_rows, second_report.removed_loans) == (13, 295, 2)
+
+    full_path = tmp_path / "full.csv"
+    CsvStreamingService().clean_csv(second_path, str(full_path), sort_by_loan_id=True)
+
+    assert open(cleaned_path, "rb").read() == full_path.read_bytes()
+
+def test_unchanged_input_reuses_every_row(tmp_path, raw_paths):
+    first_path, _ = raw_paths
+    cleaned_path = str(tmp_path / "cleaned.csv")
+    incremental_service = IncrementalCleaningService()
+
+    incremental_service.clean_csv(first_path, cleaned_path)
+    cleaned_csv = open(cleaned_path, "rb").read()
+    report = incremental_service.clean_csv(first_path, cleaned_path)
+
+    assert (report.full_rebuild, report.cleaned_rows, report.reused_rows) == (False, 0, 300)
+    assert open(cleaned_path, "rb").read() == cleaned_csv
+
+def test_new_rules_version_rebuilds_everything(tmp_path, raw_paths, monkeypatch):
+    first_path, _ = raw_paths
+    cleaned_path = str(tmp_path / "cleaned.csv")
+
+    IncrementalCleaningService().clean_csv(first_path, cleaned_path)
+    monkeypatch.setattr(DataCleaningService, "RULES_VERSION", DataCleaningService.RULES_VERSION + 1)
+    report = IncrementalCleaningService().clean_csv(first_path, cleaned_path)
+
+    assert (report.full_rebuild, report.cleaned_rows, report.reused_rows) == (True, 300, 0)
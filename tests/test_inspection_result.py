@@ -0,0 +1,54 @@
+import polars as pl
+
+from pipeline.constants import Constants
+from pipeline.helpers.cleaning import DataCleaningService
+from pipeline.models.inspection_result import InspectionResultBatch
+from pipeline.models.verify_reason import VerifyReasonRegistry
+
+def test_batch_rows_match_the_models():
+    model_service = DataCleaningService()
+    batch = InspectionResultBatch()
+    batch_service = DataCleaningService(result_batch=batch)
+
+    inspections = [
+        ("inspect_debtor_state", "IN"),
+        ("inspect_debtor_state", "ZZ"),
+        ("inspect_term_period", 0),
+        ("inspect_approval_date", "28-Feb-97"),
+        ("inspect_disbursement_gross", None),
+    ]
+    for method, value in inspections:
+        expected = getattr(model_service, method)(value)
+        row = getattr(batch_service, method)(value)
+        assert row.to_model() == expected
+
+    assert batch.columns == [
+        Constants.DEBTOR_ORIGIN_STATE,
+        Constants.DEBTOR_ORIGIN_STATE,
+        Constants.TERM_DURATION,
+        Constants.LOAN_APPROVAL_DATE,
+        Constants.DISBURESEMENT_GROSS,
+    ]
+    assert [row.column for row in batch] == batch.columns
+
+def test_to_frame_keeps_mixed_values():
+    batch = InspectionResultBatch()
+    batch.append(Constants.DEBTOR_ORIGIN_STATE, "IN")
+    batch.append(Constants.TERM_DURATION, 0, f"has 0 {Constants.TERM_DURATION}")
+    batch.append(Constants.DISBURESEMENT_GROSS, 1.5)
+    batch.append(Constants.LOAN_APPROVAL_DATE, "28-Feb-97", value_to_assign="1997-02-28")
+    batch.append(Constants.DEBTOR_NAME, None, f"missing value on {Constants.DEBTOR_NAME}")
+
+    batch_df = batch.to_frame()
+
+    assert batch_df.schema == pl.Schema(InspectionResultBatch.SCHEMA)
+    assert batch_df.rows() == [
+        (Constants.DEBTOR_ORIGIN_STATE, False, "IN", 0, None),
+        (Constants.TERM_DURATION, True, "0", VerifyReasonRegistry.code(f"has 0 {Constants.TERM_DURATION}"), None),
+        (Constants.DISBURESEMENT_GROSS, False, "1.5", 0, None),
+        (Constants.LOAN_APPROVAL_DATE, False, "28-Feb-97", 0, "1997-02-28"),
+        (Constants.DEBTOR_NAME, True, None, VerifyReasonRegistry.code(f"missing value on {Constants.DEBTOR_NAME}"), None),
+    ]
+
+def test_empty_batch_to_frame():
+    assert InspectionResultBatch().to_frame().schema == pl.Schema(InspectionResultBatch.SCHEMA)
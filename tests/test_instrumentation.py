@@ -0,0 +1,45 @@
+import json
+
+import pytest
+
+from pipeline.__main__ import main
+from pipeline.helpers.commons.instrumentation import Instrumentation
+from pipeline.helpers.db.db_service import DbService
+from pipeline.helpers.db.query_cache import QueryCache
+
+@pytest.fixture
+def instrumentation():
+    instrumentation = Instrumentation()
+    instrumentation.reset()
+    instrumentation.enable()
+    yield instrumentation
+    instrumentation.disable()
+    instrumentation.reset()
+
+def test_fetch_data_counts_the_fetched_rows_only(database_connection, instrumentation):
+    cache = QueryCache()
+    query_str = "SELECT generate_series(1, 3) AS answer"
+
+    with database_connection.cursor() as cursor:
+        DbService.fetch_data(cursor, query_str, cache=cache)
+        DbService.fetch_data(cursor, "SELECT generate_series(1, 100) AS answer")
+        # served from the cache, the cursor still holds the 100 rows query
+        DbService.fetch_data(cursor, query_str, cache=cache)
+
+    fetch_metric = instrumentation.snapshot()["stage"]["fetch_data"]
+    assert (fetch_metric["calls"], fetch_metric["rows"]) == (2, 103)
+    assert cache.stats()["hits"] == 1
+
+def test_metrics_flag_prints_the_metrics(tmp_path, capsys):
+    source_path = tmp_path / "raw.csv"
+    source_path.write_text("LoanNr_ChkDgt,State\n1000014003,IN\n1000024006,OK\n")
+    Instrumentation().reset()
+
+    assert main(["--metrics", "json", "clean", str(source_path), str(tmp_path / "cleaned.csv")]) == 0
+
+    stderr_lines = capsys.readouterr().err.splitlines()
+    metrics = json.loads("\n".join(stderr_lines[1:]))
+    assert metrics["stage"]["parse"]["rows"] == 2
+    assert metrics["stage"]["clean"]["rows"] == 2
+    assert not Instrumentation().enabled
+    Instrumentation().reset()
@@ -0,0 +1,140 @@
+import polars as pl
+import pytest
+
+from benchmarks.synthetic import SyntheticLoanGenerator
+from pipeline.constants import Constants
+from pipeline.helpers.loan_ids import LoanIdService
+
+# every loannr_chkdgt printed in notebook/EDA.ipynb
+NOTEBOOK_LOAN_IDS = [
+    "1000014003", "1000024006", "1000034009", "1000044001", "1000054004", "1270833006", "1380800010",
+    "2392194003", "2392384001", "2396634001", "2850643009", "3113583009", "3280213000", "3664443009",
+    "3714383003", "3808405000", "3854945010", "3856405005", "3857955008", "3858915009", "4540125002",
+    "4553585010", "4820745005", "4957935004", "6080335003", "9390913007", "9416233003", "9690723000",
+    "9994033004", "9994273006", "9994303002", "9994483010", "9995213001", "9995603000", "9995613003",
+    "9995973006", "9996003010",
+]
+
+def is_valid_check_digit(loan_ids: list) -> list:
+    return (
+        pl.DataFrame({Constants.LOAN_ID: loan_ids}, schema={Constants.LOAN_ID: pl.String})
+            .select(LoanIdService().is_valid_check_digit(pl.col(Constants.LOAN_ID)))
+            .to_series()
+            .to_list()
+    )
+
+def test_notebook_loan_ids_have_valid_check_digits():
+    assert is_valid_check_digit(NOTEBOOK_LOAN_IDS) == [True] * len(NOTEBOOK_LOAN_IDS)
+
+def test_altered_loan_ids_have_invalid_check_digits():
+    # each loan number digit changed, adjacent digits swapped, check value changed
+    changed_digits = [
+        loan_id[:position] + str((int(loan_id[position]) + 1) % 10) + loan_id[position + 1:]
+        for loan_id in NOTEBOOK_LOAN_IDS for position in range(LoanIdService.LOAN_NUMBER_DIGITS)
+    ]
+    swapped_digits = [
+        loan_id[:position] + loan_id[position + 1] + loan_id[position] + loan_id[position + 2:]
+        for loan_id in NOTEBOOK_LOAN_IDS for position in range(LoanIdService.LOAN_NUMBER_DIGITS - 1)
+        if loan_id[position] != loan_id[position + 1]
+    ]
+    changed_check_values = ["1000014004", "1000014013", "1000014103"]
+
+    assert not any(is_valid_check_digit(changed_digits + swapped_digits + changed_check_values))
+
+@pytest.mark.parametrize("loan_id, is_valid", [
+    (" 1000014003 ", True),
+    ("100001403", False),
+    ("10000140030", False),
+    ("100001400A", False),
+    (None, None),
+])
+def test_is_valid_check_digit_of_malformed_ids(loan_id: str, is_valid: bool):
+    assert is_valid_check_digit([loan_id]) == [is_valid]
+
+def test_synthetic_loan_ids_have_valid_check_digits():
+    raw_df = SyntheticLoanGenerator(seed=9).generate_frame(1_000)
+
+    assert all(is_valid_check_digit(raw_df.get_column(Constants.LOAN_ID).to_list()))
+
+def loans_frame(rows: list) -> pl.DataFrame:
+    return pl.DataFrame(rows, schema=[Constants.LOAN_ID, Constants.DEBTOR_ORIGIN_CITY], orient="row")
+
+def test_duplicates_and_report():
+    loan_id_service = LoanIdService()
+    index = loan_id_service.build_index(iter([loans_frame([
+        ("1000014003", "EVANSVILLE"),
+        ("1000014003", "EVANSVILLE"),
+        ("1000024006", "NEW PARIS"),
+        ("1000024006", "SPRINGFIELD"),
+        ("1000024006", "SPRINGFIELD"),
+        ("1000034009", "BLOOMINGTON"),
+        ("1000034008", "BROKEN ARROW"),
+        (None, "ORLANDO"),
+        (None, "ORLANDO"),
+    ])]))
+
+    assert loan_id_service.duplicates(index).rows() == [("1000014003", 2, 1, False), ("1000024006", 3, 2, True)]
+    assert loan_id_service.report(index).model_dump() == {
+        "rows": 9,
+        "distinct_loan_ids": 4,
+        "missing_loan_ids": 2,
+        "invalid_check_digits": 1,
+        "exact_duplicate_ids": 1,
+        "conflicting_duplicate_ids": 1,
+    }
+
+def test_merge_indexes_finds_duplicates_across_chunks():
+    loan_id_service = LoanIdService()
+    chunks = [
+        loans_frame([("1000014003", "EVANSVILLE"), ("1000024006", "NEW PARIS")]),
+        loans_frame([("1000034009", "BLOOMINGTON")]),
+        loans_frame([("1000014003", "EVANSVILLE"), ("1000024006", "SPRINGFIELD")]),
+    ]
+    single_chunk_index = loan_id_service.build_index(iter([pl.concat(chunks)]))
+
+    chunk_indexes = [loan_id_service.build_index(iter([chunk])) for chunk in chunks]
+    merged_index = loan_id_service.merge_indexes(chunk_indexes)
+
+    assert loan_id_service.duplicates(merged_index).rows() == [("1000014003", 2, 1, False), ("1000024006", 2, 2, True)]
+    assert merged_index.sort(merged_index.columns).equals(single_chunk_index.sort(single_chunk_index.columns))
+    assert loan_id_service.build_index(iter(chunks)).sort(merged_index.columns).equals(merged_index.sort(merged_index.columns))
+    assert loan_id_service.merge_indexes([]).schema == pl.Schema(LoanIdService.INDEX_SCHEMA)
+
+def test_check_csv_matches_between_serial_and_parallel(tmp_path):
+    raw_df = SyntheticLoanGenerator(seed=9).generate_frame(3_000)
+    raw_df = pl.concat([
+        raw_df,
+        raw_df.slice(10, 2),
+        raw_df.slice(2_500, 1).with_columns(pl.lit("SPRINGFIELD").alias(Constants.DEBTOR_ORIGIN_CITY)),
+    ])
+    source_path = str(tmp_path / "raw.csv")
+    raw_df.write_csv(source_path)
+
+    serial_report = LoanIdService().check_csv(source_path)
+    parallel_report = LoanIdService().check_csv(source_path, workers=3)
+
+    assert parallel_report == serial_report
+    assert (serial_report.rows, serial_report.exact_duplicate_ids, serial_report.conflicting_duplicate_ids) == (3_003, 2, 1)
+    assert serial_report.invalid_check_digits == 0
+
+def test_write_duplicate_rows_writes_one_header(tmp_path):
+    raw_df = SyntheticLoanGenerator(seed=9).generate_frame(2_000)
+    # one exact and one conflicting duplicate, far apart so they land in different chunks
+    raw_df = pl.concat([
+        raw_df,
+        raw_df.slice(10, 1),
+        raw_df.slice(1_500, 1).with_columns(pl.lit("SPRINGFIELD").alias(Constants.DEBTOR_ORIGIN_CITY)),
+    ])
+    source_path = str(tmp_path / "raw.csv")
+    raw_df.write_csv(source_path)
+    duplicates_path = tmp_path / "duplicates.csv"
+
+    loan_id_service = LoanIdService(memory_limit_mb=1)
+    loan_id_service.chunk_size_bytes = 16 * 1024
+    index = loan_id_service.build_index(loan_id_service.iter_chunks(source_path))
+    written_rows = loan_id_service.write_duplicate_rows(source_path, loan_id_service.duplicates(index), str(duplicates_path))
+
+    lines = duplicates_path.read_text().splitlines()
+    assert written_rows == 4
+    assert len(lines) == 5
+    assert lines[0] == ",".join(Constants.COLUMNS)
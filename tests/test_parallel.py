@@ -0,0 +1,47 @@
+import pytest
+
+from benchmarks.synthetic import SyntheticLoanGenerator
+from pipeline.helpers.parallel import ParallelCleaningService
+from pipeline.helpers.streaming import CsvStreamingService
+
+@pytest.fixture(scope="module")
+def source_path(tmp_path_factory) -> str:
+    source_path = str(tmp_path_factory.mktemp("raw") / "raw.csv")
+    SyntheticLoanGenerator(seed=17).write_csv(source_path, 3_000)
+    return source_path
+
+@pytest.mark.parametrize("sort_by_loan_id", [False, True])
+def test_parallel_output_matches_serial_output(tmp_path, source_path, sort_by_loan_id):
+    serial_path = tmp_path / "serial.csv"
+    parallel_path = tmp_path / "parallel.csv"
+    parallel_service = ParallelCleaningService(workers=3, memory_limit_mb=1)
+
+    # an empty shard first, so the merged header has to come from a later shard
+    start_offset, first_boundary = parallel_service.split_row_ranges(source_path, 2)[0]
+    row_ranges = [(start_offset, start_offset), (start_offset, first_boundary), (first_boundary, first_boundary)]
+    row_ranges += parallel_service.split_row_ranges(source_path, 2)[1:]
+    parallel_service.split_row_ranges = lambda path, shards: row_ranges
+
+    serial_rows = CsvStreamingService(memory_limit_mb=1).clean_csv(source_path, str(serial_path), sort_by_loan_id)
+    parallel_rows = parallel_service.clean_csv(source_path, str(parallel_path), sort_by_loan_id)
+
+    assert serial_rows == parallel_rows == 3_000
+    assert parallel_path.read_bytes() == serial_path.read_bytes()
+
+def test_merge_skips_empty_files(tmp_path):
+    empty_path = tmp_path / "empty.csv"
+    empty_path.write_bytes(b"")
+    first_path = tmp_path / "first.csv"
+    first_path.write_bytes(b"loannr_chkdgt,state\n1000024006,OK\n")
+    second_path = tmp_path / "second.csv"
+    second_path.write_bytes(b"loannr_chkdgt,state\n1000014003,IN\n")
+    merged_path = tmp_path / "merged.csv"
+
+    CsvStreamingService.merge_cleaned_csv([str(empty_path), str(first_path), str(empty_path), str(second_path)], str(merged_path))
+    assert merged_path.read_bytes() == b"loannr_chkdgt,state\n1000024006,OK\n1000014003,IN\n"
+
+    CsvStreamingService.merge_cleaned_csv([str(empty_path), str(second_path), str(first_path)], str(merged_path), sort_by_loan_id=True)
+    assert merged_path.read_bytes() == b"loannr_chkdgt,state\n1000014003,IN\n1000024006,OK\n"
+
+    CsvStreamingService.merge_cleaned_csv([str(empty_path)], str(merged_path), sort_by_loan_id=True)
+    assert merged_path.read_bytes() == b""
@@ -0,0 +1,73 @@
+import time
+
+from pipeline.helpers.db.query_cache import QueryCache
+
+def test_make_key_accepts_nested_parameters():
+    cache = QueryCache()
+    query_str = "SELECT * FROM loans WHERE state = ANY(%(states)s) AND term > %(term)s"
+    key = QueryCache.make_key(query_str, {"states": ["IN", "OK"], "term": 12})
+
+    assert cache.get(key) is None
+    cache.put(key, "[]")
+
+    assert cache.get(QueryCache.make_key(query_str, {"term": 12, "states": ["IN", "OK"]})) == "[]"
+    assert cache.get(QueryCache.make_key(query_str, {"states": ["OK", "IN"], "term": 12})) is None
+
+def test_make_key_tells_lists_from_tuples():
+    query_str = "SELECT %s"
+
+    assert QueryCache.make_key(query_str, [("IN", "OK")]) != QueryCache.make_key(query_str, [["IN", "OK"]])
+    assert QueryCache.make_key(query_str, [["IN", "OK"]]) == QueryCache.make_key(query_str, (["IN", "OK"],))
+
+def test_make_key_normalizes_whitespace_outside_literals():
+    assert QueryCache.make_key("SELECT  *\n FROM loans;") == QueryCache.make_key("SELECT * FROM loans")
+    assert QueryCache.make_key("SELECT 'a  b'") != QueryCache.make_key("SELECT 'a b'")
+
+def test_least_recently_used_entries_are_evicted_over_the_byte_budget():
+    cache = QueryCache(max_bytes=10, ttl_seconds=None)
+
+    cache.put(QueryCache.make_key("SELECT 1"), "aaaa")
+    cache.put(QueryCache.make_key("SELECT 2"), "bbbb")
+    cache.get(QueryCache.make_key("SELECT 1"))
+    cache.put(QueryCache.make_key("SELECT 3"), "cccc")
+
+    assert cache.get(QueryCache.make_key("SELECT 2")) is None
+    assert cache.get(QueryCache.make_key("SELECT 1")) == "aaaa"
+    assert cache.get(QueryCache.make_key("SELECT 3")) == "cccc"
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["size_bytes"] == 8
+
+    # larger than the whole budget, not cached and nothing evicted
+    cache.put(QueryCache.make_key("SELECT 4"), "d" * 11)
+    assert cache.stats()["entries"] == 2
+
+def test_entries_expire_after_the_ttl():
+    cache = QueryCache(ttl_seconds=0.05)
+    key = QueryCache.make_key("SELECT 1")
+
+    cache.put(key, "[]")
+    assert cache.get(key) == "[]"
+    time.sleep(0.1)
+
+    assert cache.get(key) is None
+    assert cache.stats()["expirations"] == 1
+    assert cache.stats()["size_bytes"] == 0
+
+def test_invalidate_drops_only_the_queries_of_the_table():
+    cache = QueryCache()
+    queries = [
+        "SELECT count(*) FROM loans",
+        "SELECT * FROM public.loans WHERE state = 'IN'",
+        "SELECT * FROM loans_rollup_state",
+        "SELECT * FROM loans_staging",
+        "SELECT * FROM bank_loans",
+    ]
+    for query_str in queries:
+        cache.put(QueryCache.make_key(query_str), "[]")
+
+    assert cache.invalidate("loans") == 2
+    assert [cache.get(QueryCache.make_key(query_str)) for query_str in queries] == [None, None, "[]", "[]", "[]"]
+
+    assert cache.invalidate("loans_rollup_state") == 1
+    assert cache.invalidate() == 2
+    assert cache.stats()["entries"] == 0
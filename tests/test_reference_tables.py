@@ -0,0 +1,72 @@
+import warnings
+
+import polars as pl
+
+from pipeline.constants import Constants
+from pipeline.helpers.cleaning import DataCleaningService
+from pipeline.helpers.commons.reference_tables import ReferenceTables
+
+def test_is_known_state():
+    reference_tables = ReferenceTables()
+    states = ["NY", "DC", "PR", "ZZ", "ny", None]
+
+    known = pl.DataFrame({"state": states}).select(reference_tables.is_known_state(pl.col("state"))).to_series().to_list()
+
+    assert known == [True, True, True, False, False, None]
+    assert [state in reference_tables.state_code_set for state in states[:-1]] == known[:-1]
+
+def test_is_known_naics():
+    reference_tables = ReferenceTables()
+    # 335212 only exists in the 2007 edition
+    codes = ["451120", "335212", "999999", None]
+
+    known = pl.DataFrame({"naics": codes}).select(reference_tables.is_known_naics(pl.col("naics"))).to_series().to_list()
+    recent_known = (
+        pl.DataFrame({"naics": codes})
+            .select(ReferenceTables(naics_editions=[2017, 2022]).is_known_naics(pl.col("naics")))
+            .to_series()
+            .to_list()
+    )
+
+    assert known == [True, True, False, None]
+    assert recent_known == [True, False, False, None]
+    assert [code in reference_tables.naics_code_set for code in codes[:-1]] == known[:-1]
+
+def test_is_zip_in_state():
+    reference_tables = ReferenceTables()
+    df = pl.DataFrame({
+        # 100 is a NY prefix, 063 is shared by CT and NY, 4 digit zips lost their leading zero
+        "zip": ["10001", "10001", "06390", "06390", "6390", "2108", "2108", None],
+        "state": ["NY", "CA", "CT", "NY", "CT", "MA", "NY", "NY"],
+    })
+
+    in_state = df.select(reference_tables.is_zip_in_state(pl.col("zip"), pl.col("state"))).to_series().to_list()
+
+    assert in_state == [True, False, True, True, True, True, False, None]
+    assert [
+        reference_tables.is_zip_prefix_state(zip_code, state) for zip_code, state in df.rows()[:-1]
+    ] == in_state[:-1]
+
+def test_is_zip_in_state_pads_integer_zips():
+    reference_tables = ReferenceTables()
+    df = pl.DataFrame({"zip": [2108, 2108, 10001], "state": ["MA", "NY", "NY"]})
+
+    in_state = df.select(reference_tables.is_zip_in_state(pl.col("zip"), pl.col("state"))).to_series().to_list()
+
+    assert in_state == [True, False, True]
+    assert reference_tables.is_zip_prefix_state(2108, "MA")
+
+def test_reference_checks_raise_no_deprecation_warning():
+    raw_df = pl.DataFrame({
+        Constants.DEBTOR_ORIGIN_STATE: ["NY", "ZZ", "CA"],
+        Constants.DEBTOR_ORIGIN_ZIP_CODE: ["10001", "10001", "10001"],
+        Constants.GUARANTOR_BANK_STATE: ["NY", "NY", "ZZ"],
+        Constants.NAICS_CODE: ["451120", "999999", None],
+    })
+
+    # the warning is raised while the query runs, where polars doesn't turn it into an error
+    with warnings.catch_warnings(record=True) as caught_warnings:
+        warnings.simplefilter("always")
+        DataCleaningService().inspect_frame(raw_df)
+
+    assert [warning for warning in caught_warnings if issubclass(warning.category, DeprecationWarning)] == []
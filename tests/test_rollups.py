@@ -0,0 +1,63 @@
+import json
+
+import polars as pl
+import pytest
+from psycopg2 import extensions as PsycopgExtension
+from psycopg2 import sql
+
+from benchmarks.synthetic import SyntheticLoanGenerator
+from pipeline.constants import Constants
+from pipeline.helpers.cleaning import DataCleaningService
+from pipeline.helpers.db.bulk_loader import BulkLoader
+from pipeline.helpers.db.db_service import DbService
+from pipeline.helpers.db.rollups import RollupManager
+
+@pytest.fixture
+def cleaned_df() -> pl.DataFrame:
+    return DataCleaningService().inspect_frame(SyntheticLoanGenerator(seed=5).generate_frame(300))
+
+@pytest.fixture
+def loans_table(database_connection: PsycopgExtension.connection, cleaned_df: pl.DataFrame) -> str:
+    """
+    Loans table typed after the cleaned frame
+    """
+
+    sql_types = {pl.Int64: "bigint", pl.UInt64: "bigint", pl.Boolean: "boolean"}
+
+    with database_connection.cursor() as cursor:
+        cursor.execute(
+            sql.SQL("CREATE TABLE loans ({})").format(
+                sql.SQL(", ").join(
+                    sql.SQL("{} {}").format(sql.Identifier(column), sql.SQL(sql_types.get(dtype, "text")))
+                    for column, dtype in cleaned_df.schema.items()
+                )
+            )
+        )
+    database_connection.commit()
+    return "loans"
+
+def test_state_rollup_counts_the_cleaned_statuses(database_connection, loans_table, cleaned_df):
+    BulkLoader(database_connection, batch_size=100, rollup_manager=RollupManager(["state"])).load_frames(
+        [cleaned_df], loans_table, upsert=False
+    )
+
+    with database_connection.cursor() as cursor:
+        rollup = json.loads(DbService.fetch_rollup(cursor, "state", loans_table))
+
+    loan_status = pl.col(Constants.LOAN_STATUS)
+    expected_df = (
+        cleaned_df
+            .group_by(Constants.DEBTOR_ORIGIN_STATE)
+            .agg(
+                pl.len().alias("loans"),
+                loan_status.eq(Constants.CHARGED_OFF_STATUS).sum().alias("chgoff_loans"),
+                loan_status.eq(Constants.PAID_IN_FULL_STATUS).sum().alias("paid_in_full_loans"),
+            )
+    )
+    rollup_df = pl.DataFrame(rollup).select(expected_df.columns)
+
+    assert expected_df.get_column("paid_in_full_loans").sum() > 0
+    assert expected_df.get_column("chgoff_loans").sum() > 0
+    assert rollup_df.sort(Constants.DEBTOR_ORIGIN_STATE).equals(
+        expected_df.sort(Constants.DEBTOR_ORIGIN_STATE).cast(rollup_df.schema)
+    )
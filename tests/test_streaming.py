@@ -0,0 +1,26 @@
+import io
+
+import polars as pl
+
+from pipeline.helpers.streaming import CsvStreamingService
+
+def test_write_chunks_writes_the_header_once_after_empty_chunks():
+    chunk = pl.DataFrame({"loannr_chkdgt": ["1000014003", "1000024006"], "state": ["IN", "OK"]})
+    destination = io.BytesIO()
+
+    written_rows = CsvStreamingService().write_chunks(iter([chunk.clear(), chunk.clear(), chunk]), destination)
+
+    assert written_rows == 2
+    assert destination.getvalue().decode().splitlines() == [
+        "loannr_chkdgt,state",
+        "1000014003,IN",
+        "1000024006,OK",
+    ]
+
+def test_write_chunks_without_header():
+    chunk = pl.DataFrame({"loannr_chkdgt": ["1000014003"], "state": ["IN"]})
+    destination = io.BytesIO()
+
+    CsvStreamingService().write_chunks(iter([chunk.clear(), chunk]), destination, include_header=False)
+
+    assert destination.getvalue().decode().splitlines() == ["1000014003,IN"]
@@ -0,0 +1,47 @@
+import csv
+
+import polars as pl
+import pytest
+
+from benchmarks.synthetic import SyntheticLoanGenerator
+from pipeline.constants import Constants
+from pipeline.helpers.two_tier import TwoTierCleaningService
+
+@pytest.fixture
+def raw_csv(tmp_path) -> bytes:
+    """
+    Synthetic raw CSV with empty lines, a row failing both tiers and a row with an extra field
+    """
+
+    raw_df = SyntheticLoanGenerator(seed=3).generate_frame(200)
+    raw_df = raw_df.with_columns(
+        pl.when(pl.int_range(pl.len()).eq(100)).then(pl.lit("abc")).otherwise(pl.col(Constants.TERM_DURATION)).alias(Constants.TERM_DURATION)
+    )
+    lines = raw_df.write_csv().splitlines(keepends=True)
+
+    # one field too many, the block falls back to the row by row parse
+    extra_field_row = next(csv.reader([lines[151]])) + ["extra"]
+    lines[151] = ",".join(f'"{value}"' for value in extra_field_row) + "\n"
+
+    lines.insert(50, "\n")
+    lines.insert(80, "\r\n")
+    lines.insert(1, "\n")
+    return "".join(lines).encode()
+
+@pytest.mark.parametrize("memory_limit_mb", [256, 1])
+def test_quarantine_offsets_point_at_the_rows(tmp_path, raw_csv: bytes, memory_limit_mb: int):
+    source_path = tmp_path / "raw.csv"
+    source_path.write_bytes(raw_csv)
+    quarantine_path = tmp_path / "quarantine.csv"
+
+    cleaning_service = TwoTierCleaningService(memory_limit_mb=memory_limit_mb)
+    cleaning_service.chunk_size_bytes = 4096
+    cleaned_rows = cleaning_service.clean_csv(str(source_path), str(tmp_path / "cleaned.csv"), quarantine_path=str(quarantine_path))
+
+    quarantine_df = pl.read_csv(quarantine_path, infer_schema=False)
+    assert quarantine_df.height == 2
+    assert cleaned_rows == 198
+
+    for byte_offset, raw_row in quarantine_df.select("byte_offset", "raw_row").iter_rows():
+        row_start = int(byte_offset)
+        assert raw_csv[row_start:raw_csv.index(b"\n", row_start)].decode().rstrip("\r") == raw_row
@@ -0,0 +1,29 @@
+import polars as pl
+
+from pipeline.models.verify_reason import VerifyReasonRegistry
+
+def test_mask_expr_sets_a_repeated_reason_once():
+    first_reason, second_reason = VerifyReasonRegistry.REASONS[:2]
+    df = pl.DataFrame({"flagged": [True, False]})
+
+    masks = df.select(
+        VerifyReasonRegistry.mask_expr([
+            (pl.col("flagged"), first_reason),
+            (pl.col("flagged"), first_reason),
+        ]).alias("mask")
+    ).get_column("mask").to_list()
+
+    assert masks == [VerifyReasonRegistry.code(first_reason), 0]
+    assert VerifyReasonRegistry.decode(masks[0]) == [first_reason]
+    assert second_reason not in VerifyReasonRegistry.decode(masks[0])
+
+def test_mask_expr_keeps_the_base_bits():
+    first_reason, second_reason = VerifyReasonRegistry.REASONS[:2]
+    base = VerifyReasonRegistry.encode([first_reason, second_reason])
+    df = pl.DataFrame({"mask": [base]}, schema={"mask": pl.UInt64})
+
+    mask = df.select(
+        VerifyReasonRegistry.mask_expr([(pl.lit(True), first_reason)], base=pl.col("mask"))
+    ).item()
+
+    assert mask == base